@@ -1,8 +1,11 @@
 import os
 import sys
 
-# Switch to Qt-based UI for v1.15
-from mumu_adb_controller.ui_qt.app_qt import launch as launch_qt_app
+# 启动计时尽量靠前：之后的导入（Qt/UI）都会计入报告
+from mumu_adb_controller.common import startup
+
+if startup.report_requested():
+    startup.install_import_timer()
 
 
 # ---- Windows: hide console by default ----
@@ -23,6 +26,9 @@ def _hide_console_by_default() -> None:
 
 
 def _launch_main_app() -> None:
+    # Switch to Qt-based UI for v1.15（延迟导入：--launch-tool 无需加载主界面）
+    from mumu_adb_controller.ui_qt.app_qt import launch as launch_qt_app
+    startup.mark("导入界面")
     launch_qt_app()
 
 
@@ -38,7 +44,7 @@ def main() -> None:
     # Hide console early (Windows)
     _hide_console_by_default()
 
-    args = [a for a in sys.argv[1:] if a != "--show-console"]
+    args = [a for a in sys.argv[1:] if a not in ("--show-console", "--startup-report")]
     if len(args) >= 2 and args[0] == "--launch-tool":
         _launch_tool(args[1])
         return
@@ -0,0 +1,227 @@
+# mumu_adb_controller/common/cancel.py
+"""
+协作式取消（“停止所有”不再重启进程）：
+- 每个任务一个 CancelToken，内部就是任务原来的停止 Event（should_stop 照旧读它）；
+- 任务线程执行期间通过 scope(token) 绑定为“当前令牌”，经 cancel.run / track 启动的
+  子进程（adb 截图、shell、设备端连点等）登记在令牌上；
+- token.cancel() 置位停止事件并立即 kill 这些子进程，阻塞在 adb 调用里的任务马上返回；
+- cancel_all(timeout) 取消全部登记的令牌，并在限定时间内等待任务收尾，返回仍未结束的任务名；
+  DeviceWorker 为每个任务登记一个外层令牌，任务自身的令牌在其内层绑定时记为子令牌，统计时只算最内层；
+- bind(fn) 把当前令牌带进辅助线程（线程池检测/修复等），其中启动的子进程同样会被结束；
+- deadline(sec) 为一段代码设定截止时间，其中每次 cancel.run 的超时取“单次超时”与“剩余时间”的较小值。
+
+进程、模板缓存、设备连接与 DeviceWorker 都保持不变，停止后可立即重新开始任务。
+"""
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+
+class Cancelled(Exception):
+    """当前任务已被取消（子进程被结束或尚未启动即取消）。"""
+
+
+class CancelToken:
+    def __init__(self, name: str = "", event: Optional[threading.Event] = None):
+        self.name = name
+        self.event = event if event is not None else threading.Event()
+        self.done = threading.Event()
+        self.parent: Optional["CancelToken"] = None
+        self._procs = set()
+        self._lock = threading.Lock()
+
+    def cancelled(self) -> bool:
+        return self.event.is_set()
+
+    def cancel(self) -> int:
+        """置位停止事件并结束登记的子进程，返回结束的进程数。"""
+        self.event.set()
+        with self._lock:
+            procs = list(self._procs)
+        for p in procs:
+            _kill(p)
+        return len(procs)
+
+    def track(self, proc) -> None:
+        with self._lock:
+            self._procs.add(proc)
+        if self.event.is_set():
+            _kill(proc)
+
+    def untrack(self, proc) -> None:
+        with self._lock:
+            self._procs.discard(proc)
+
+    def finish(self) -> None:
+        self.done.set()
+
+
+def _kill(proc) -> None:
+    try:
+        if proc.poll() is None:
+            proc.kill()
+    except Exception:
+        pass
+
+
+_tls = threading.local()
+
+
+def current() -> Optional[CancelToken]:
+    """当前线程绑定的令牌（不在任务中返回 None）。"""
+    return getattr(_tls, "token", None)
+
+
+@contextmanager
+def scope(token: Optional[CancelToken]):
+    """在 with 块内把 token 绑定为当前线程的令牌。"""
+    prev = current()
+    if token is not None and prev is not None and token is not prev and token.parent is None:
+        token.parent = prev
+    _tls.token = token
+    try:
+        yield token
+    finally:
+        _tls.token = prev
+
+
+def bind(fn):
+    """返回在当前令牌（提交时所在线程的令牌）下执行 fn 的包装，用于提交到其他线程。"""
+    token = current()
+    if token is None:
+        return fn
+
+    def _bound(*args, **kwargs):
+        with scope(token):
+            return fn(*args, **kwargs)
+    return _bound
+
+
+@contextmanager
+def deadline(seconds: Optional[float]):
+    """在 with 块内限定总耗时：块内的 cancel.run 超时不会超过剩余时间（可嵌套，取更早者）。"""
+    prev = getattr(_tls, "deadline", None)
+    if seconds is not None:
+        end = time.monotonic() + max(0.0, float(seconds))
+        _tls.deadline = end if prev is None else min(prev, end)
+    try:
+        yield
+    finally:
+        _tls.deadline = prev
+
+
+def remaining(timeout: Optional[float] = None) -> Optional[float]:
+    """单次调用的有效超时：timeout 与当前 deadline 剩余时间中较小者（都没有时为 None）。"""
+    end = getattr(_tls, "deadline", None)
+    if end is None:
+        return timeout
+    left = max(0.0, end - time.monotonic())
+    return left if timeout is None else min(float(timeout), left)
+
+
+# ---------------- 登记表 ----------------
+_tokens: Dict[int, CancelToken] = {}
+_reg_lock = threading.Lock()
+
+
+def register(token: CancelToken) -> CancelToken:
+    with _reg_lock:
+        _tokens[id(token)] = token
+    return token
+
+
+def unregister(token: CancelToken) -> None:
+    token.finish()
+    with _reg_lock:
+        _tokens.pop(id(token), None)
+
+
+def active() -> List[CancelToken]:
+    with _reg_lock:
+        return list(_tokens.values())
+
+
+def cancel_all(timeout: float = 1.0) -> Tuple[int, List[str]]:
+    """
+    取消全部登记的任务并最多等待 timeout 秒让它们收尾。
+    返回 (取消的任务数, 超时仍未结束的任务名列表)；嵌套的令牌只计最内层。
+    """
+    tokens = active()
+    for t in tokens:
+        t.cancel()
+    end = time.monotonic() + max(0.0, timeout)
+    pending = []
+    for t in tokens:
+        if not t.done.wait(max(0.0, end - time.monotonic())):
+            pending.append(t)
+    parents = {id(t.parent) for t in tokens if t.parent is not None}
+    waiting_parents = {id(t.parent) for t in pending if t.parent is not None}
+    left = [t.name for t in pending if id(t) not in waiting_parents]
+    return sum(1 for t in tokens if id(t) not in parents), left
+
+
+# ---------------- 可取消的子进程 ----------------
+_POLL = 0.2  # 任务线程内等待子进程时检查取消的间隔（秒）
+
+
+def _drain(proc) -> None:
+    """结束后的收尾：短暂读取剩余输出，不等待仍占用管道的孙进程。"""
+    try:
+        proc.communicate(timeout=0.2)
+    except Exception:
+        pass
+
+
+def run(cmd, timeout: Optional[float] = None, **popen_kw) -> subprocess.CompletedProcess:
+    """
+    与 subprocess.run(cmd, timeout=..., stdout=PIPE, ...) 相同，但子进程登记到当前令牌：
+    任务被取消时子进程立即被结束并抛出 Cancelled；超时（含 deadline 已到）抛 subprocess.TimeoutExpired。
+    """
+    token = current()
+    if token is not None and token.cancelled():
+        raise Cancelled(token.name)
+    timeout = remaining(timeout)
+    if timeout is not None and timeout <= 0:
+        raise subprocess.TimeoutExpired(cmd, 0)
+    p = subprocess.Popen(cmd, **popen_kw)
+    if token is not None:
+        token.track(p)
+    end = None if timeout is None else time.monotonic() + timeout
+    try:
+        while True:
+            # 分段等待：子进程派生的孙进程可能在被 kill 后仍占着管道，不能无限等 EOF
+            left = None if end is None else max(0.0, end - time.monotonic())
+            step = left if token is None else (_POLL if left is None else min(_POLL, left))
+            try:
+                out, err = p.communicate(timeout=step)
+                break
+            except subprocess.TimeoutExpired:
+                if token is not None and token.cancelled():
+                    _kill(p)
+                    _drain(p)
+                    raise Cancelled(token.name)
+                if end is not None and time.monotonic() >= end:
+                    _kill(p)
+                    _drain(p)
+                    raise subprocess.TimeoutExpired(cmd, timeout)
+    finally:
+        if token is not None:
+            token.untrack(p)
+    if token is not None and token.cancelled() and p.returncode != 0:
+        raise Cancelled(token.name)
+    return subprocess.CompletedProcess(cmd, p.returncode, out, err)
+
+
+def track(proc) -> None:
+    """把自行启动的长时间子进程登记到当前令牌（如设备端连点）。"""
+    token = current()
+    if token is not None:
+        token.track(proc)
+
+
+def untrack(proc) -> None:
+    token = current()
+    if token is not None:
+        token.untrack(proc)
@@ -1,6 +1,9 @@
 import json
 import os
-from typing import Dict, Any, Optional
+import time
+import atexit
+import threading
+from typing import Dict, Any, Optional, Set
 
 # 集中式路径工具（请确保存在）
 try:
@@ -39,11 +42,28 @@ class AppConfig:
     2) 否则使用用户数据目录：%APPDATA%/MuMuADBController/config.json
 
     注意：保存时采用原子写入，避免损坏。
+
+    写入合并（debounce）：save(cfg) 只登记待写并唤醒后台线程，距最后一次 save 满
+    debounce_sec 秒（或首次登记后满 max_delay_sec 秒）才真正落盘一次；
+    落盘前按顶层键与上次写入的内容比对，未变化则跳过。进程退出时自动 flush。
+    需要立即落盘时调用 flush()。
     """
 
-    def __init__(self, app_name: str = "MuMuADBController", filename: str = "config.json"):
+    def __init__(self, app_name: str = "MuMuADBController", filename: str = "config.json",
+                 debounce_sec: float = 0.5, max_delay_sec: float = 3.0):
         self.app_name = app_name
         self.filename = filename
+        self.debounce_sec = max(0.0, float(debounce_sec))
+        self.max_delay_sec = max(self.debounce_sec, float(max_delay_sec))
+        self._cond = threading.Condition()
+        self._pending: Optional[Dict[str, Any]] = None
+        self._first_ts = 0.0
+        self._last_ts = 0.0
+        self._written: Dict[str, str] = {}  # 顶层键 -> 上次落盘的 JSON 片段
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.last_dirty_keys: Set[str] = set()
 
         # 便携模式探测：程序目录下已有 config.json 就用它
         portable_path = res_path(self.filename)
@@ -77,12 +97,95 @@ class AppConfig:
             with open(self._file, "r", encoding="utf-8") as f:
                 data = json.load(f)
                 if isinstance(data, dict):
+                    self._written = self._fragments(data) or {}
                     return data
                 return {}
         except Exception:
             return {}
 
     def save(self, cfg: Dict[str, Any]) -> bool:
+        """
+        登记一次保存（不阻塞调用线程）；由后台线程合并后写盘。
+        """
+        if self._closed:
+            return self._write(cfg)
+        with self._cond:
+            now = time.monotonic()
+            if self._pending is None:
+                self._first_ts = now
+            self._pending = cfg
+            self._last_ts = now
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="ConfigWriter", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+            self._cond.notify_all()
+        return True
+
+    def flush(self) -> bool:
+        """立即写入待保存的配置（若有）。"""
+        with self._cond:
+            cfg, self._pending = self._pending, None
+        return self._write(cfg) if cfg is not None else True
+
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        停止后台线程并写入剩余配置；之后的 save 改为同步写入。
+        先等后台线程退出（它可能已取走待写配置、正在写盘），再写入剩余部分，保证退出前最后一次保存落盘。
+        """
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+        self.flush()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                now = time.monotonic()
+                due = min(self._last_ts + self.debounce_sec, self._first_ts + self.max_delay_sec)
+                if now < due:
+                    self._cond.wait(due - now)
+                    continue
+                cfg, self._pending = self._pending, None
+            self._write(cfg)
+
+    @staticmethod
+    def _fragments(cfg: Dict[str, Any]) -> Optional[Dict[str, str]]:
+        """按顶层键序列化；cfg 正被其他线程修改时重试，仍失败返回 None。"""
+        for _ in range(3):
+            try:
+                return {str(k): json.dumps(v, ensure_ascii=False) for k, v in list(cfg.items())}
+            except RuntimeError:
+                time.sleep(0.01)
+            except Exception:
+                return None
+        return None
+
+    def _write(self, cfg: Dict[str, Any]) -> bool:
+        with self._write_lock:
+            frags = self._fragments(cfg or {})
+            if frags is None:
+                return False
+            dirty = {k for k in frags.keys() | self._written.keys() if frags.get(k) != self._written.get(k)}
+            if not dirty and os.path.isfile(self._file):
+                return True
+            self.last_dirty_keys = dirty
+            data = {k: json.loads(v) for k, v in frags.items()}
+            if self._atomic_write(data):
+                self._written = frags
+                return True
+            return False
+
+    def _atomic_write(self, cfg: Dict[str, Any]) -> bool:
         """
         原子写入保存配置：写临时文件后 os.replace 到目标，避免部分写入。
         """
@@ -0,0 +1,248 @@
+# mumu_adb_controller/common/executor.py
+"""
+多设备共享线程池（替代“每台设备一个常驻轮询线程”）：
+- 每个设备（或任意键，如 "preview:<serial>"）一条通道（lane），通道内任务严格按提交顺序、
+  同一时刻最多一个在执行（与原 DeviceWorker 的串行语义一致）；
+- 有待执行任务的通道进入就绪队列，由池线程轮流取出执行，每次执行一个任务后重新排到队尾；
+- 线程按需创建：任务本身是长时间阻塞循环时，同时运行的任务数即所需线程数，
+  设备池默认不限运行线程数（max_threads=0），新就绪的设备总能立即拿到线程、不会被别的长循环饿死；
+- 只限制空闲线程：空闲超过 idle_sec 自动退出，且最多保留 max_idle 个空闲线程，没有任务的设备不占线程；
+- 设了上限的池（如 ui_pool）线程已满时新就绪的通道只能排队：submit 返回 False 并写一条警告（限频）；
+- 统计：当前/峰值线程数、忙线程数、排队任务数、排队耗时（提交→开始）分位数。
+
+预览、手动连接等短时 UI 操作使用独立的小线程池 ui_pool()，不会被占满设备池的长任务挡住。
+"""
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+DEFAULT_MAX_THREADS = 0   # 0 = 不限运行线程数
+DEFAULT_MAX_IDLE = 8      # 最多保留的空闲线程数
+DEFAULT_IDLE_SEC = 30.0
+UI_MAX_THREADS = 4
+SATURATION_WARN_SEC = 10.0  # 线程已满警告的最短间隔
+
+
+def _pct(xs, q: float) -> float:
+    s = sorted(xs)
+    if not s:
+        return 0.0
+    return s[min(len(s) - 1, max(0, int(round(q * (len(s) - 1)))))]
+
+
+class _Lane:
+    __slots__ = ("key", "jobs", "running", "ready")
+
+    def __init__(self, key: str):
+        self.key = key
+        self.jobs: Deque[Tuple[Callable[[], None], float]] = deque()
+        self.running = False   # 正有池线程在执行该通道的任务
+        self.ready = False     # 已在就绪队列中
+
+
+class DevicePool:
+    def __init__(self, max_threads: int = DEFAULT_MAX_THREADS, idle_sec: float = DEFAULT_IDLE_SEC,
+                 logger=None, name: str = "DevicePool", max_idle: int = DEFAULT_MAX_IDLE):
+        self.max_threads = max(0, int(max_threads))
+        self.max_idle = max(0, int(max_idle))
+        self.idle_sec = float(idle_sec)
+        self.logger = logger
+        self.name = name
+        self._last_warn = 0.0
+        self._lanes: Dict[str, _Lane] = {}
+        self._ready: Deque[_Lane] = deque()
+        self._cond = threading.Condition()
+        self._threads = 0
+        self._idle = 0
+        self._busy = 0
+        self._peak = 0
+        self._ids = itertools.count(1)
+        self._waits: Deque[float] = deque(maxlen=500)
+        self._done = 0
+
+    def set_max_threads(self, n: int) -> None:
+        """运行线程上限，0 表示不限。"""
+        with self._cond:
+            self.max_threads = max(0, int(n))
+            self._grow()
+
+    def set_max_idle(self, n: int) -> None:
+        with self._cond:
+            self.max_idle = max(0, int(n))
+            self._cond.notify_all()
+
+    def _capped(self) -> bool:
+        return 0 < self.max_threads <= self._threads
+
+    # ---------------- 提交 ----------------
+    def submit(self, key: str, fn: Callable[[], None]) -> bool:
+        """
+        把 fn 追加到通道 key；同一通道的任务串行执行。
+        返回 False 表示线程已满、该通道需等其他通道的任务结束才能开始。
+        """
+        warn = None
+        with self._cond:
+            lane = self._lanes.get(key)
+            if lane is None:
+                lane = _Lane(key)
+                self._lanes[key] = lane
+            lane.jobs.append((fn, time.perf_counter()))
+            if lane.running or lane.ready:
+                return True
+            lane.ready = True
+            self._ready.append(lane)
+            self._grow()
+            self._cond.notify()
+            if len(self._ready) <= self._idle:
+                return True
+            now = time.monotonic()
+            if now - self._last_warn >= SATURATION_WARN_SEC:
+                self._last_warn = now
+                warn = (f"[POOL] {self.name} 线程已满（{self._threads}/{self.max_threads} 忙），"
+                        f"{key} 排队等待，当前共 {len(self._ready)} 个通道在等")
+        if warn and self.logger:
+            self.logger.warn(warn)
+        return False
+
+    def saturated(self) -> bool:
+        """线程已达上限且全部在忙（不限线程数的池永远为 False）。"""
+        with self._cond:
+            return self._capped() and self._idle == 0
+
+    def drop(self, key: str) -> List[Callable[[], None]]:
+        """丢弃通道中尚未开始的任务（正在执行的不受影响），返回被丢弃的任务。"""
+        with self._cond:
+            lane = self._lanes.get(key)
+            if lane is None:
+                return []
+            dropped = [fn for fn, _ in lane.jobs]
+            lane.jobs.clear()
+            if lane.ready:
+                lane.ready = False
+                try:
+                    self._ready.remove(lane)
+                except ValueError:
+                    pass
+            if not lane.running:
+                self._lanes.pop(key, None)
+            return dropped
+
+    def queued(self, key: str) -> int:
+        """通道中尚未开始的任务数。"""
+        with self._cond:
+            lane = self._lanes.get(key)
+            return len(lane.jobs) if lane is not None else 0
+
+    def busy(self, key: str) -> bool:
+        """通道是否有任务在执行或排队。"""
+        with self._cond:
+            lane = self._lanes.get(key)
+            return lane is not None and (lane.running or bool(lane.jobs))
+
+    # ---------------- 池线程 ----------------
+    def _grow(self) -> None:
+        """在锁内调用：就绪通道多于空闲线程且未到上限（或不限）时新建线程。"""
+        while len(self._ready) > self._idle and not self._capped():
+            self._threads += 1
+            self._idle += 1
+            self._peak = max(self._peak, self._threads)
+            t = threading.Thread(target=self._loop, name=f"{self.name}-{next(self._ids)}", daemon=True)
+            t.start()
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.idle_sec
+                while not self._ready:
+                    remain = deadline - time.monotonic()
+                    # 超时或空闲线程多于 max_idle 时退出
+                    if remain <= 0 or self._idle > self.max_idle:
+                        self._idle -= 1
+                        self._threads -= 1
+                        return
+                    self._cond.wait(remain)
+                lane = self._ready.popleft()
+                lane.ready = False
+                if not lane.jobs:
+                    continue
+                fn, t_sub = lane.jobs.popleft()
+                lane.running = True
+                self._idle -= 1
+                self._busy += 1
+                self._waits.append(time.perf_counter() - t_sub)
+            try:
+                fn()
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"[{lane.key}] 任务错误：{e}")
+            finally:
+                with self._cond:
+                    lane.running = False
+                    self._busy -= 1
+                    self._idle += 1
+                    self._done += 1
+                    if lane.jobs:
+                        # 通道还有任务：排到队尾，与其他设备轮流
+                        lane.ready = True
+                        self._ready.append(lane)
+                        self._grow()
+                        self._cond.notify()
+                    elif self._lanes.get(lane.key) is lane:
+                        self._lanes.pop(lane.key, None)
+
+    # ---------------- 统计 ----------------
+    def stats(self) -> dict:
+        with self._cond:
+            waits = list(self._waits)
+            queued = sum(len(l.jobs) for l in self._lanes.values())
+            return {
+                "threads": self._threads,
+                "peak_threads": self._peak,
+                "busy": self._busy,
+                "idle": self._idle,
+                "max_threads": self.max_threads,
+                "lanes": len(self._lanes),
+                "queued": queued,
+                "done": self._done,
+                "wait_p50_ms": _pct(waits, 0.5) * 1000.0,
+                "wait_p90_ms": _pct(waits, 0.9) * 1000.0,
+                "wait_max_ms": (max(waits) if waits else 0.0) * 1000.0,
+                "process_threads": threading.active_count(),
+            }
+
+    def report(self, log: Optional[Callable[[str], None]] = None) -> dict:
+        st = self.stats()
+        out = log or (self.logger.info if self.logger else None)
+        if out:
+            out(f"[POOL] {self.name} 线程 {st['threads']}/{st['max_threads']}（峰值 {st['peak_threads']}，忙 {st['busy']}），"
+                f"排队 {st['queued']}，排队耗时 P50 {st['wait_p50_ms']:.0f}ms/P90 {st['wait_p90_ms']:.0f}ms，"
+                f"进程线程总数 {st['process_threads']}")
+        return st
+
+
+_pool: Optional[DevicePool] = None
+_ui_pool: Optional[DevicePool] = None
+_pool_lock = threading.Lock()
+
+
+def default_pool() -> DevicePool:
+    """进程内共享的设备线程池（DeviceWorker 默认使用）。"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = DevicePool()
+    return _pool
+
+
+def ui_pool() -> DevicePool:
+    """短时 UI 操作（预览截图、手动连接）专用的小线程池，与设备任务互不阻塞。"""
+    global _ui_pool
+    if _ui_pool is None:
+        with _pool_lock:
+            if _ui_pool is None:
+                _ui_pool = DevicePool(max_threads=UI_MAX_THREADS, idle_sec=10.0, name="UiPool",
+                                      max_idle=UI_MAX_THREADS)
+    return _ui_pool
@@ -0,0 +1,308 @@
+# mumu_adb_controller/common/jobqueue.py
+"""
+多设备共享任务队列（空闲设备“偷”任务）：
+- post(fn, name, eligible=...) 只投递一次，不绑定设备；fn(serial, should_stop) 在领取它的设备的
+  DeviceWorker 线程里执行；eligible 为允许执行的设备集合（None=任意设备），实现设备亲和约束；
+- 投递时给每台可执行的设备工作线程各塞一张“领取票”（每台最多一张），票在该设备手头任务结束后才会
+  轮到执行：每张票只领取并执行一个任务，做完若还有可领的任务就把新票排到该设备通道队尾；
+  因此忙的设备不会抢任务，先空出来的设备先领，按钮提交到设备的任务与共享任务按提交顺序交替执行；
+- claim_next 供运行中的任务就地接续同一批的下一个任务（如打资源的流水线导航跨段不中断），
+  设备通道中有其他排队任务时不接续；
+- prefer 为任务的首选设备（如多设备打资源的规划结果）：设备优先领取自己的任务，其次是无首选的任务，
+  最后从队尾“偷”其他设备的任务（对方近期要执行的队首任务不受影响）；
+- 每个任务记录等待耗时（投递→开始）与执行耗时，stats() 给出吞吐（个/分钟）与分位数。
+"""
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional
+
+from . import cancel
+
+JobFn = Callable[[str, Callable[[], bool]], None]
+
+
+def _pct(xs, q: float) -> float:
+    s = sorted(xs)
+    if not s:
+        return 0.0
+    return s[min(len(s) - 1, max(0, int(round(q * (len(s) - 1)))))]
+
+
+class Job:
+    __slots__ = ("id", "name", "fn", "eligible", "prefer", "posted", "started", "finished",
+                 "serial", "error", "stop_event", "done")
+
+    def __init__(self, jid: int, name: str, fn: JobFn, eligible: Optional[Iterable[str]],
+                 prefer: Optional[str] = None):
+        self.id = jid
+        self.name = name or f"job{jid}"
+        self.fn = fn
+        self.eligible = set(eligible) if eligible is not None else None
+        self.prefer = prefer
+        self.posted = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.serial: Optional[str] = None
+        self.error: Optional[str] = None
+        self.stop_event = threading.Event()
+        self.done = threading.Event()
+
+    def allows(self, serial: str) -> bool:
+        return self.eligible is None or serial in self.eligible
+
+    @property
+    def wait_sec(self) -> Optional[float]:
+        return None if self.started is None else self.started - self.posted
+
+    @property
+    def run_sec(self) -> Optional[float]:
+        return None if self.finished is None or self.started is None else self.finished - self.started
+
+
+class FleetQueue:
+    """
+    workers：serial -> DeviceWorker 的字典（直接引用 app.workers，设备增减自动生效）；
+    available(serial)：可选，返回 False 的设备不领取任务（如健康度为无响应）。
+    """
+
+    def __init__(self, workers: Dict[str, object], logger=None,
+                 available: Optional[Callable[[str], bool]] = None, history: int = 500):
+        self.workers = workers
+        self.logger = logger
+        self.available = available
+        self._pending: Deque[Job] = deque()
+        self._tickets: set = set()      # 已塞领取票、尚未结束的设备
+        self._running: Dict[int, Job] = {}
+        self._history: Deque[Job] = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.t0 = time.time()
+
+    # ---------------- 投递 ----------------
+    def post(self, fn: JobFn, name: str = "", eligible: Optional[Iterable[str]] = None,
+             prefer: Optional[str] = None) -> Job:
+        job = Job(next(self._ids), name, fn, eligible, prefer)
+        with self._lock:
+            self._pending.append(job)
+        self._dispatch(job.eligible)
+        return job
+
+    def post_many(self, items: Iterable[tuple], eligible: Optional[Iterable[str]] = None) -> List[Job]:
+        """items: [(name, fn), ...] 或 [(name, fn, prefer), ...]，共用同一亲和约束。"""
+        elig = set(eligible) if eligible is not None else None
+        jobs = [Job(next(self._ids), it[0], it[1], elig, it[2] if len(it) > 2 else None) for it in items]
+        with self._lock:
+            self._pending.extend(jobs)
+        self._dispatch(elig)
+        return jobs
+
+    def kick(self, serial: Optional[str] = None) -> None:
+        """新设备上线或设备恢复后调用：若有它可执行的排队任务则塞领取票（serial=None 为全部设备）。"""
+        with self._lock:
+            jobs = list(self._pending)
+        if not jobs:
+            return
+        if serial is None:
+            self._dispatch(None)
+        elif any(j.allows(serial) for j in jobs):
+            self._dispatch({serial})
+
+    def forget(self, serial: str) -> None:
+        """设备离线（工作线程已停止、领取票不会再执行）时调用，重新上线后可再次派票。"""
+        with self._lock:
+            self._tickets.discard(serial)
+
+    def _dispatch(self, eligible: Optional[set]) -> None:
+        """给可执行的设备各塞一张领取票（已有未结束的票则跳过）。"""
+        serials = [s for s in list(self.workers) if eligible is None or s in eligible]
+        for s in serials:
+            with self._lock:
+                if s in self._tickets:
+                    continue
+                self._tickets.add(s)
+            self._submit_ticket(s)
+
+    def _submit_ticket(self, serial: str) -> None:
+        """在调用方已把 serial 记入 _tickets 后，把领取票提交到该设备通道队尾。"""
+        w = self.workers.get(serial)
+        if w is None:
+            with self._lock:
+                self._tickets.discard(serial)
+            return
+        # 票被“停止所有”丢弃时释放登记，之后可重新派票
+        w.submit(lambda s=serial: self._ticket(s), on_drop=lambda s=serial: self.forget(s))
+
+    # ---------------- 领取与执行（设备工作线程内） ----------------
+    def _claim(self, serial: str, only: Optional[set] = None) -> Optional[Job]:
+        """
+        在锁内调用：首选本设备的任务 > 无首选的任务（先进先出）> 从队尾偷其他设备的任务。
+        only 为任务 id 集合时只在其中领取。
+        """
+        pick = None
+        for job in self._pending:
+            if not job.allows(serial) or (only is not None and job.id not in only):
+                continue
+            if job.prefer == serial:
+                pick = job
+                break
+            if job.prefer is None and (pick is None or pick.prefer is not None):
+                pick = job
+            elif pick is None or pick.prefer is not None:
+                pick = job  # 偷取：遍历到最后保留最靠队尾的一个
+        if pick is not None:
+            self._pending.remove(pick)
+        return pick
+
+    def _start(self, job: Job, serial: str) -> None:
+        """在锁内调用：标记任务由 serial 开始执行。"""
+        job.serial = serial
+        job.started = time.time()
+        self._running[job.id] = job
+
+    def _ticket(self, serial: str) -> None:
+        """领取并执行一个任务；还有可领的任务时重新排一张票到通道队尾，让按钮任务能插在中间。"""
+        with self._lock:
+            ok = self.available is None or self._safe_available(serial)
+            job = self._claim(serial) if ok else None
+            if job is None:
+                self._tickets.discard(serial)
+                return
+            self._start(job, serial)
+        try:
+            self._execute(job)
+        finally:
+            with self._lock:
+                again = any(j.allows(serial) for j in self._pending)
+                if not again:
+                    self._tickets.discard(serial)
+            if again:
+                self._submit_ticket(serial)
+
+    def claim_next(self, serial: str, among: Iterable[Job]) -> Optional[Job]:
+        """
+        运行中的任务就地接续：从 among（同一批任务）中按领取优先级为 serial 再领一个。
+        领到的任务 fn 不会被调用，由调用方直接续做，结束后须调用 finish(job)。
+        设备通道里还有其他排队任务（按钮提交等）或设备不可用时不接续，返回 None。
+        """
+        w = self.workers.get(serial)
+        if w is None or getattr(w, "pending", 0):
+            return None
+        ids = {j.id for j in among}
+        with self._lock:
+            if self.available is not None and not self._safe_available(serial):
+                return None
+            job = self._claim(serial, ids)
+            if job is None:
+                return None
+            self._start(job, serial)
+        return job
+
+    def finish(self, job: Job, error: Optional[str] = None) -> None:
+        """结束 claim_next 接续的任务（记录耗时并通知等待者）。"""
+        job.error = error
+        self._finish(job)
+
+    def _safe_available(self, serial: str) -> bool:
+        try:
+            return bool(self.available(serial))
+        except Exception:
+            return True
+
+    def _execute(self, job: Job) -> None:
+        serial = job.serial
+        token = cancel.register(cancel.CancelToken(f"{serial}:job:{job.name}", job.stop_event))
+        try:
+            with cancel.scope(token):
+                job.fn(serial, job.stop_event.is_set)
+        except Exception as e:
+            job.error = str(e)
+            if self.logger:
+                self.logger.error(f"[{serial}] 共享任务 {job.name} 出错：{e}")
+        finally:
+            cancel.unregister(token)
+            self._finish(job)
+
+    def _finish(self, job: Job) -> None:
+        job.finished = time.time()
+        with self._lock:
+            self._running.pop(job.id, None)
+            self._history.append(job)
+        job.done.set()
+        if self.logger:
+            self.logger.info(f"[{job.serial}] 共享任务 {job.name} 完成：等待 {job.wait_sec:.1f}s，执行 {job.run_sec:.1f}s")
+
+    # ---------------- 控制与统计 ----------------
+    def cancel_pending(self) -> int:
+        """丢弃尚未开始的任务，返回丢弃数。"""
+        with self._lock:
+            jobs = list(self._pending)
+            self._pending.clear()
+        for j in jobs:
+            j.stop_event.set()
+            j.done.set()
+        return len(jobs)
+
+    def cancel(self, jobs: Iterable[Job]) -> int:
+        """取消指定的一批任务：未开始的移出队列，运行中的通知停止；返回受影响的任务数。"""
+        jobs = list(jobs)
+        ids = {j.id for j in jobs}
+        with self._lock:
+            dropped = [j for j in self._pending if j.id in ids]
+            for j in dropped:
+                self._pending.remove(j)
+            running = [j for j in self._running.values() if j.id in ids]
+        for j in dropped:
+            j.stop_event.set()
+            j.done.set()
+        for j in running:
+            j.stop_event.set()
+        return len(dropped) + len(running)
+
+    def stop_all(self) -> int:
+        """丢弃未开始的任务并通知运行中的任务停止，返回受影响的任务数。"""
+        n = self.cancel_pending()
+        with self._lock:
+            running = list(self._running.values())
+        for j in running:
+            j.stop_event.set()
+        return n + len(running)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def stats(self) -> dict:
+        """等待/执行耗时分位数（秒）与吞吐（个/分钟，按最近完成记录统计）。"""
+        with self._lock:
+            hist = list(self._history)
+            pending = len(self._pending)
+            running = len(self._running)
+        waits = [j.wait_sec for j in hist]
+        runs = [j.run_sec for j in hist]
+        span = (hist[-1].finished - min(j.started for j in hist)) if hist else 0.0
+        per_serial: Dict[str, int] = {}
+        for j in hist:
+            per_serial[j.serial] = per_serial.get(j.serial, 0) + 1
+        return {
+            "done": len(hist),
+            "failed": sum(1 for j in hist if j.error),
+            "pending": pending,
+            "running": running,
+            "wait_p50": _pct(waits, 0.5),
+            "wait_p90": _pct(waits, 0.9),
+            "run_p50": _pct(runs, 0.5),
+            "run_p90": _pct(runs, 0.9),
+            "per_min": len(hist) * 60.0 / span if span > 0 else 0.0,
+            "per_serial": per_serial,
+        }
+
+    def report(self, log: Optional[Callable[[str], None]] = None) -> dict:
+        st = self.stats()
+        out = log or (self.logger.info if self.logger else None)
+        if out:
+            out(f"[JOBQ] 已完成 {st['done']}（失败 {st['failed']}），排队 {st['pending']}，运行中 {st['running']}；"
+                f"等待 P50 {st['wait_p50']:.1f}s/P90 {st['wait_p90']:.1f}s，执行 P50 {st['run_p50']:.1f}s，"
+                f"吞吐 {st['per_min']:.1f} 个/分钟")
+        return st
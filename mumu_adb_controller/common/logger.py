@@ -1,21 +1,280 @@
+import os
+import re
+import json
 import time
-from typing import Callable, Optional
+import queue
+import atexit
+import threading
+from typing import Any, Callable, Dict, IO, List, Optional
+
+# 级别：数值越大越重要；队列拥塞时优先丢弃 DEBUG
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARN": 30, "ERROR": 40}
+
+_TASK_TAG = re.compile(r"^\[([A-Za-z0-9_\-]+)\]")
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.\-]+")
+
+
+class LogRecord:
+    """结构化日志记录：时间戳、设备、任务、级别、消息及附加字段。"""
+    __slots__ = ("ts", "level", "msg", "serial", "task", "fields")
+
+    def __init__(self, level: str, msg: str, serial: Optional[str] = None,
+                 task: Optional[str] = None, fields: Optional[Dict[str, Any]] = None):
+        self.ts = time.time()
+        self.level = level
+        self.msg = msg
+        self.serial = serial
+        self.task = task
+        self.fields = fields or None
+
+    def line(self) -> str:
+        """与旧版一致的单行文本：[HH:MM:SS] LEVEL: msg。"""
+        return f"[{time.strftime('%H:%M:%S', time.localtime(self.ts))}] {self.level}: {self.msg}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = {"ts": round(self.ts, 3), "level": self.level, "msg": self.msg}
+        if self.serial:
+            d["serial"] = self.serial
+        if self.task:
+            d["task"] = self.task
+        if self.fields:
+            d["fields"] = self.fields
+        return d
+
+
+class _RotatingFile:
+    """按大小轮转的追加写文件：path, path.1 ... path.N。"""
+
+    def __init__(self, path: str, max_bytes: int, backups: int):
+        self.path = path
+        self.max_bytes = max(1024, int(max_bytes))
+        self.backups = max(0, int(backups))
+        self._fp: Optional[IO[str]] = None
+        self._size = 0
+
+    def _open(self):
+        self._fp = open(self.path, "a", encoding="utf-8")
+        self._size = self._fp.tell()
+
+    def _rotate(self):
+        self.close()
+        if self.backups > 0:
+            for i in range(self.backups - 1, 0, -1):
+                src = f"{self.path}.{i}"
+                if os.path.exists(src):
+                    os.replace(src, f"{self.path}.{i + 1}")
+            if os.path.exists(self.path):
+                os.replace(self.path, f"{self.path}.1")
+        else:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def write(self, text: str):
+        if self._fp is None:
+            self._open()
+        data = text + "\n"
+        n = len(data.encode("utf-8"))
+        if self._size and self._size + n > self.max_bytes:
+            self._rotate()
+            self._open()
+        self._fp.write(data)
+        self._size += n
+
+    def flush(self):
+        if self._fp is not None:
+            self._fp.flush()
+
+    def close(self):
+        if self._fp is not None:
+            try:
+                self._fp.close()
+            except Exception:
+                pass
+            self._fp = None
+
 
 class Logger:
-    def __init__(self):
+    """
+    非阻塞日志：调用线程只把 LogRecord 放进有界队列，后台线程统一分发到
+    - 文本 sink（set_sink，与旧版一致，接收一行字符串；设备记录不走此 sink）；
+    - 记录 sink（add_record_sink，接收 LogRecord，如 Qt 日志缓冲）；
+    - 可选文件（enable_files）：main.log + 每设备 <serial>.log（按大小轮转），及 events.jsonl。
+
+    队列拥塞时：DEBUG 在占用超过 80% 后即丢弃，其余级别在队列满时丢弃，均计数（dropped），从不阻塞。
+    未设置任何 sink 且未启用文件时打印到控制台（旧行为）。
+    """
+
+    def __init__(self, max_queue: int = 10000):
         self._sink: Optional[Callable[[str], None]] = None
+        self._record_sinks: List[Callable[[LogRecord], None]] = []
+        self._q: "queue.Queue[Optional[LogRecord]]" = queue.Queue(maxsize=max(100, int(max_queue)))
+        self._debug_limit = int(self._q.maxsize * 0.8)
+        self._dropped = {"DEBUG": 0, "OTHER": 0}
+        self._reported_drops = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        # 文件输出
+        self._log_dir: Optional[str] = None
+        self._max_bytes = 2 * 1024 * 1024
+        self._backups = 3
+        self._jsonl = False
+        self._files: Dict[str, _RotatingFile] = {}
 
+    # ---------------- 配置 ----------------
     def set_sink(self, sink: Callable[[str], None]):
         self._sink = sink
 
+    def add_record_sink(self, sink: Callable[[LogRecord], None]):
+        self._record_sinks.append(sink)
+
+    def enable_files(self, log_dir: str, max_bytes: int = 2 * 1024 * 1024, backups: int = 3,
+                     jsonl: bool = False) -> bool:
+        """启用文件日志；目录不可写返回 False（仅保留 UI 输出）。"""
+        try:
+            os.makedirs(log_dir, exist_ok=True)
+        except Exception:
+            return False
+        with self._lock:
+            self._log_dir = log_dir
+            self._max_bytes = int(max_bytes)
+            self._backups = int(backups)
+            self._jsonl = bool(jsonl)
+        return True
+
+    @property
+    def dropped(self) -> Dict[str, int]:
+        """因队列拥塞丢弃的记录数：{"DEBUG": n, "OTHER": m}。"""
+        return dict(self._dropped)
+
+    # ---------------- 写入（任意线程，非阻塞） ----------------
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name="LoggerWriter", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def log(self, level: str, msg: str, serial: Optional[str] = None, task: Optional[str] = None,
+            **fields: Any):
+        if self._closed:
+            return
+        rec = LogRecord(level, str(msg), serial, task, fields)
+        if level == "DEBUG" and self._q.qsize() >= self._debug_limit:
+            self._dropped["DEBUG"] += 1
+            return
+        try:
+            self._q.put_nowait(rec)
+        except queue.Full:
+            self._dropped["DEBUG" if level == "DEBUG" else "OTHER"] += 1
+            return
+        self._ensure_thread()
+
     def _emit(self, level: str, msg: str):
-        line = f"[{time.strftime('%H:%M:%S')}] {level}: {msg}"
-        if self._sink:
-            try: self._sink(line)
-            except Exception: pass
-        else:
-            print(line)
+        self.log(level, msg)
+
+    def debug(self, msg: str, **kw): self.log("DEBUG", msg, **kw)
+    def info(self, msg: str, **kw): self.log("INFO", msg, **kw)
+    def warn(self, msg: str, **kw): self.log("WARN", msg, **kw)
+    def error(self, msg: str, **kw): self.log("ERROR", msg, **kw)
+
+    def device(self, serial: str, msg: str, level: str = "INFO", **fields: Any):
+        """设备日志：任务名取自消息开头的 [TAG]（如 "[BEAR] ..."）。"""
+        m = _TASK_TAG.match(msg or "")
+        self.log(level, msg, serial=serial, task=(m.group(1) if m else None), **fields)
+
+    # ---------------- 后台分发 ----------------
+    def _file(self, name: str) -> _RotatingFile:
+        f = self._files.get(name)
+        if f is None:
+            f = _RotatingFile(os.path.join(self._log_dir, name), self._max_bytes, self._backups)
+            self._files[name] = f
+        return f
+
+    def _dispatch(self, rec: LogRecord):
+        line = rec.line()
+        if rec.serial is None:
+            if self._sink:
+                try:
+                    self._sink(line)
+                except Exception:
+                    pass
+            elif not self._record_sinks and not self._log_dir:
+                print(line)
+        for sink in self._record_sinks:
+            try:
+                sink(rec)
+            except Exception:
+                pass
+        if self._log_dir:
+            try:
+                if rec.serial:
+                    self._file(_UNSAFE.sub("_", rec.serial) + ".log").write(line)
+                else:
+                    self._file("main.log").write(line)
+                if self._jsonl:
+                    self._file("events.jsonl").write(json.dumps(rec.to_dict(), ensure_ascii=False))
+            except Exception:
+                pass
+
+    def _report_drops(self):
+        total = self._dropped["DEBUG"] + self._dropped["OTHER"]
+        if total > self._reported_drops:
+            n = total - self._reported_drops
+            self._reported_drops = total
+            self._dispatch(LogRecord("WARN", f"日志队列拥塞，已丢弃 {n} 条（累计 DEBUG {self._dropped['DEBUG']}，"
+                                             f"其他 {self._dropped['OTHER']}）"))
+
+    def _run(self):
+        while True:
+            try:
+                rec = self._q.get(timeout=1.0)
+            except queue.Empty:
+                self._report_drops()
+                for f in self._files.values():
+                    f.flush()
+                continue
+            batch = [rec]
+            # 一次取尽积压，批量写文件后统一 flush
+            while len(batch) < 512:
+                try:
+                    batch.append(self._q.get_nowait())
+                except queue.Empty:
+                    break
+            stop = False
+            for r in batch:
+                if r is None:
+                    stop = True
+                    continue
+                self._dispatch(r)
+            self._report_drops()
+            for f in self._files.values():
+                f.flush()
+            if stop:
+                break
+
+    def flush(self, timeout: float = 2.0):
+        """等待队列排空（用于退出前）。"""
+        end = time.time() + timeout
+        while self._thread is not None and not self._q.empty() and time.time() < end:
+            time.sleep(0.01)
 
-    def info(self, msg: str): self._emit("INFO", msg)
-    def warn(self, msg: str): self._emit("WARN", msg)
-    def error(self, msg: str): self._emit("ERROR", msg)
+    def close(self, timeout: float = 2.0):
+        """写完积压记录并关闭文件；之后的日志被忽略。"""
+        if self._closed:
+            return
+        self._closed = True
+        thr = self._thread
+        if thr is not None:
+            try:
+                self._q.put(None, timeout=timeout)
+            except Exception:
+                pass
+            thr.join(timeout)
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
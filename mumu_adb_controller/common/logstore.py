@@ -0,0 +1,94 @@
+# mumu_adb_controller/common/logstore.py
+"""
+日志环形缓冲（与 UI 解耦，任意线程可写）：
+- 每个通道（"main"、"devices"）一个定长 deque，超出上限丢弃最旧行；
+- 每行带通道内递增序号，视图记住已渲染到的序号，用 since() 增量取新行；
+- 视图落后超过缓冲容量（期间被挤掉的行已无法补齐）时 since() 返回 reset=True，视图整体重绘。
+
+写入只做一次加锁 append，UI 线程按定时器批量取出渲染，避免每行一次 appendPlainText。
+"""
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+DEFAULT_MAX_LINES = 5000
+MAIN = "main"
+DEVICES = "devices"
+
+
+class _Channel:
+    __slots__ = ("lines", "seq")
+
+    def __init__(self, cap: int):
+        self.lines: Deque[str] = deque(maxlen=cap)
+        self.seq = 0  # 已写入的总行数（最后一行的序号）
+
+
+class LogStore:
+    def __init__(self, max_lines: int = DEFAULT_MAX_LINES):
+        self._cap = max(100, int(max_lines))
+        self._channels: Dict[str, _Channel] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def max_lines(self) -> int:
+        return self._cap
+
+    def set_max_lines(self, max_lines: int) -> None:
+        """调整上限（保留最新的行）。"""
+        cap = max(100, int(max_lines))
+        with self._lock:
+            self._cap = cap
+            for ch in self._channels.values():
+                ch.lines = deque(ch.lines, maxlen=cap)
+
+    def _channel(self, key: str) -> _Channel:
+        ch = self._channels.get(key)
+        if ch is None:
+            ch = _Channel(self._cap)
+            self._channels[key] = ch
+        return ch
+
+    def append(self, key: str, line: str) -> None:
+        with self._lock:
+            ch = self._channel(key)
+            ch.lines.append(line)
+            ch.seq += 1
+
+    def append_device(self, serial: str, line: str) -> None:
+        """设备日志：写入汇总通道（行带 [serial] 前缀；界面只渲染汇总视图，不再按设备另存一份）。"""
+        with self._lock:
+            ch = self._channel(DEVICES)
+            ch.lines.append(f"[{serial}] {line}")
+            ch.seq += 1
+
+    def seq(self, key: str) -> int:
+        with self._lock:
+            ch = self._channels.get(key)
+            return ch.seq if ch else 0
+
+    def since(self, key: str, seq: int) -> Tuple[List[str], int, bool]:
+        """
+        取序号 seq 之后的新行，返回 (lines, 新序号, reset)。
+        reset=True 表示部分新行已被挤出缓冲，lines 为缓冲内全部行，视图应清空后重绘。
+        """
+        with self._lock:
+            ch = self._channels.get(key)
+            if ch is None or ch.seq <= seq:
+                return [], (ch.seq if ch else seq), False
+            pending = ch.seq - seq
+            if seq < 0 or pending > len(ch.lines):
+                return list(ch.lines), ch.seq, True
+            n = len(ch.lines)
+            return [ch.lines[i] for i in range(n - pending, n)], ch.seq, False
+
+    def lines(self, key: str) -> List[str]:
+        with self._lock:
+            ch = self._channels.get(key)
+            return list(ch.lines) if ch else []
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            ch = self._channels.get(key)
+            if ch is not None:
+                ch.lines.clear()
@@ -0,0 +1,161 @@
+# mumu_adb_controller/common/startup.py
+"""
+启动耗时统计：
+- mark(stage)：记录启动阶段时间点（相对进程内首次导入本模块的时刻）；
+- install_import_timer()：可选，统计每个模块导入的累计/自身耗时（需 --startup-report 或环境变量 MUMU_STARTUP_REPORT=1）；
+- report_lines()：生成可读的报告行，供主日志输出。
+
+注意：冻结环境下控制台默认隐藏，报告通过 Logger 写入“全局日志”。
+"""
+import os
+import sys
+import time
+import threading
+import importlib.abc
+from typing import Dict, List, Optional, Tuple
+
+_T0 = time.perf_counter()
+_MARKS: List[Tuple[str, float]] = []
+_LOCK = threading.Lock()
+
+# 模块导入耗时：name -> (cumulative, self)
+_IMPORTS: Dict[str, Tuple[float, float]] = {}
+_TIMER: Optional["_ImportTimer"] = None
+
+
+def report_requested(argv: Optional[List[str]] = None) -> bool:
+    """是否请求输出导入耗时明细（命令行 --startup-report 或环境变量）。"""
+    args = sys.argv[1:] if argv is None else argv
+    return "--startup-report" in args or bool(os.environ.get("MUMU_STARTUP_REPORT"))
+
+
+def mark(stage: str) -> float:
+    """记录一个阶段点，返回距启动的毫秒数。"""
+    ms = (time.perf_counter() - _T0) * 1000.0
+    with _LOCK:
+        _MARKS.append((stage, ms))
+    return ms
+
+
+def marks() -> List[Tuple[str, float]]:
+    with _LOCK:
+        return list(_MARKS)
+
+
+class _TimedLoader:
+    """包装原 loader，仅在 exec_module 前后计时，其余属性透传。"""
+
+    def __init__(self, loader, fullname: str, timer: "_ImportTimer"):
+        self._loader = loader
+        self._fullname = fullname
+        self._timer = timer
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._timer._enter()
+        t = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._timer._leave(self._fullname, time.perf_counter() - t)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    """插在 sys.meta_path 首位，委托其余 finder 查找，再包装 loader 计时。"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _stack(self) -> List[float]:
+        st = getattr(self._local, "stack", None)
+        if st is None:
+            st = []
+            self._local.stack = st
+        return st
+
+    def _enter(self) -> None:
+        self._stack().append(0.0)
+
+    def _leave(self, fullname: str, elapsed: float) -> None:
+        st = self._stack()
+        children = st.pop() if st else 0.0
+        if st:
+            st[-1] += elapsed
+        with _LOCK:
+            _IMPORTS[fullname] = (elapsed, max(0.0, elapsed - children))
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self:
+                continue
+            find = getattr(finder, "find_spec", None)
+            if find is None:
+                continue
+            try:
+                spec = find(fullname, path, target)
+            except Exception:
+                spec = None
+            if spec is None:
+                continue
+            loader = spec.loader
+            if loader is not None and hasattr(loader, "exec_module"):
+                spec.loader = _TimedLoader(loader, fullname, self)
+            return spec
+        return None
+
+
+def install_import_timer() -> bool:
+    """安装导入计时器（幂等）。返回是否已安装。"""
+    global _TIMER
+    if _TIMER is not None:
+        return True
+    try:
+        _TIMER = _ImportTimer()
+        sys.meta_path.insert(0, _TIMER)
+        return True
+    except Exception:
+        _TIMER = None
+        return False
+
+
+def uninstall_import_timer() -> None:
+    """移除导入计时器；已记录的数据保留。"""
+    global _TIMER
+    if _TIMER is None:
+        return
+    try:
+        sys.meta_path.remove(_TIMER)
+    except ValueError:
+        pass
+    _TIMER = None
+
+
+def slowest_imports(top: int = 15) -> List[Tuple[str, float, float]]:
+    """按自身耗时排序的最慢导入：[(模块名, 累计ms, 自身ms)]。"""
+    with _LOCK:
+        items = [(n, c * 1000.0, s * 1000.0) for n, (c, s) in _IMPORTS.items()]
+    items.sort(key=lambda x: x[2], reverse=True)
+    return items[:max(0, int(top))]
+
+
+def report_lines(top: int = 15) -> List[str]:
+    """阶段耗时 + （若启用）最慢导入明细。"""
+    lines: List[str] = []
+    prev = 0.0
+    parts = []
+    for stage, ms in marks():
+        parts.append(f"{stage} +{ms - prev:.0f}ms")
+        prev = ms
+    if parts:
+        lines.append(f"[启动] 总计 {prev:.0f}ms：" + "，".join(parts))
+    slow = slowest_imports(top)
+    if slow:
+        lines.append(f"[启动] 最慢导入（自身/累计，共 {len(_IMPORTS)} 个模块）：")
+        for name, cum, own in slow:
+            lines.append(f"    {name}: {own:.1f}ms / {cum:.1f}ms")
+    return lines
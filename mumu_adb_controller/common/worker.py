@@ -1,39 +1,85 @@
-import threading, queue
-from typing import Callable
+import threading
+from typing import Callable, Optional
+
+from . import cancel
+from .executor import DevicePool, default_pool
 
 class DeviceWorker:
-    def __init__(self, serial: str, adb, logger):
+    """
+    单设备任务串行执行器。不再独占线程：任务提交到共享线程池（common/executor.py）中
+    以 serial 为键的通道，同一设备的任务仍按提交顺序逐个执行，空闲设备不占线程。
+    每个任务执行时登记一个取消令牌（任务自身登记的令牌嵌套在其内），
+    未带停止标志直接提交的任务也能被“停止所有”结束子进程并统计。
+    """
+    def __init__(self, serial: str, adb, logger, pool: Optional[DevicePool] = None):
         self.serial = serial
         self.adb = adb
         self.logger = logger
-        self._q: "queue.Queue[Callable[[], None]]" = queue.Queue()
-        self._thr = threading.Thread(target=self._run, name=f"Worker-{serial}", daemon=True)
+        self.pool = pool or default_pool()
         self._stop = threading.Event()
-        self.idle = True
+        self._running = 0
+
+    @property
+    def idle(self) -> bool:
+        return self._running == 0
+
+    @property
+    def pending(self) -> int:
+        """已提交、尚未开始的任务数。"""
+        try: return self.pool.queued(self.serial)
+        except Exception: return 0
 
     def start(self):
-        if not self._thr.is_alive():
-            self._thr.start()
+        # 兼容旧接口：线程由线程池按需创建
+        self._stop.clear()
 
     def stop(self):
+        # 丢弃尚未开始的任务；正在执行的任务由其自身的停止标志/取消令牌结束
         self._stop.set()
-        try: self._q.put_nowait(lambda: None)
-        except Exception: pass
+        self.clear()
 
-    def submit(self, fn: Callable[[], None]):
-        try: self._q.put_nowait(fn)
+    def clear(self) -> int:
+        """丢弃尚未开始的任务（“停止所有”用），之后仍可继续提交，返回丢弃数。"""
+        try: dropped = self.pool.drop(self.serial)
+        except Exception: return 0
+        for task in dropped:
+            on_drop = getattr(task, "on_drop", None)
+            if on_drop is None:
+                continue
+            try: on_drop()
+            except Exception as e: self.logger.error(f"[{self.serial}] 任务清理错误：{e}")
+        return len(dropped)
+
+    def submit(self, fn: Callable[[], None], on_drop: Optional[Callable[[], None]] = None) -> bool:
+        """
+        提交任务；on_drop 在任务未开始就被丢弃时调用（用于释放令牌、恢复按钮等）。
+        返回 False 表示线程池已达上限、任务在排队（可提示用户）。
+        """
+        if self._stop.is_set():
+            if on_drop is not None:
+                on_drop()
+            return True
+
+        def task():
+            self._call(fn)
+        task.on_drop = on_drop
+        try: return self.pool.submit(self.serial, task)
         except Exception: self.logger.error(f"[{self.serial}] 提交任务失败")
+        return True
 
-    def _run(self):
-        while not self._stop.is_set():
-            try:
-                fn = self._q.get(timeout=0.5)
-            except queue.Empty:
-                continue
-            try:
-                self.idle = False
+    def _call(self, fn: Callable[[], None]):
+        if self._stop.is_set():
+            return
+        name = getattr(fn, "__name__", "") or "task"
+        token = cancel.register(cancel.CancelToken(f"{self.serial}:{name}"))
+        try:
+            self._running += 1
+            with cancel.scope(token):
                 fn()
-            except Exception as e:
-                self.logger.error(f"[{self.serial}] 任务错误：{e}")
-            finally:
-                self.idle = True
+        except cancel.Cancelled:
+            pass
+        except Exception as e:
+            self.logger.error(f"[{self.serial}] 任务错误：{e}")
+        finally:
+            self._running -= 1
+            cancel.unregister(token)
@@ -1,9 +1,18 @@
 # mumu_adb_controller/core/adb.py
 import os
+import re
+import itertools
+import math
 import sys
+import time
+import threading
 import subprocess
-from typing import List, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional
+from ..common import cancel
 from ..common.logger import Logger
+from . import health
+from .breaker import BreakerBoard
+from .profile import DeviceProfile, parse_wm_density, parse_wm_size
 
 # ---- 冻结安全 res_path：优先用集中管理的 pathutil，失败则本地兜底 ----
 try:
@@ -17,16 +26,47 @@ except Exception:
         return os.path.join(_app_base_dir(), *parts)
 
 
+class DeviceUnavailable(Exception):
+    """设备处于熔断中，调用被直接拒绝。"""
+
+
 class AdbClient:
     """
     简易 ADB 封装（冻结安全路径）。
     - 默认 adb 路径使用 res_path('adb','adb.exe')；
     - 若不存在则回退到系统 PATH 中的 adb/adb.exe；
     - 通过 set_adb_path 可随时覆盖。
+
+    超时与取消：
+    - 每次调用可传 timeout（秒）；在 cancel.deadline(...) 块内不会超过剩余时间；
+    - 在任务线程（cancel.scope）内调用时，任务停止会立即结束 adb 子进程；
+    - 同一设备连续超时会触发熔断（见 core/breaker.py），熔断期间该设备的调用立即失败，
+      后台探测恢复后自动解除。
+
+    分辨率归一化（set_normalize(True)，默认关闭）：
+    - 截图在截取时缩放到 720x1280 逻辑尺寸；input_tap/input_swipe/tap_burst 的坐标按逻辑坐标
+      映射到设备物理坐标（见 core/profile.py）；设备本身为 720x1280 时不做任何处理。
     """
+    DEFAULT_TIMEOUT = 30     # 通用命令
+    INPUT_TIMEOUT = 10       # input tap/keyevent/text
+    SCREENCAP_TIMEOUT = 10   # 截图
+    PROBE_TIMEOUT = 3        # 熔断探测（shell true）
+    _BREAKER_MIN_TIMEOUT = 2.0  # 超时预算低于此值的调用超时不计入熔断（多为调用方的短截止时间）
+
     def __init__(self, adb_path: Optional[str], logger: Logger):
         self.logger = logger
         self.adb_path: Optional[str] = None
+        self.breakers = BreakerBoard(self._probe, self._on_breaker)
+        # serial -> 触摸设备信息（None 表示不可用 sendevent）
+        self._touch_cache: Dict[str, Optional[dict]] = {}
+        self._burst_ids = itertools.count(1)
+        # serial -> (截图时刻 monotonic, png)；任务截图后缩略图等可直接复用。
+        # 仅在 keep_recent_png(秒) 开启期间保存，且超过保留时长的条目随写入淘汰
+        self._last_png: Dict[str, Tuple[float, bytes]] = {}
+        self._png_keep = 0.0
+        # serial -> 分辨率档案（首次需要时探测一次）
+        self._profiles: Dict[str, DeviceProfile] = {}
+        self.normalize = False
 
         # 优先使用传入的路径，否则使用默认路径
         if adb_path and os.path.isfile(adb_path):
@@ -91,32 +131,154 @@ class AdbClient:
             return False, msg
 
     # ---------------- helpers ----------------
-    def _run(self, args: List[str], timeout: int = 30) -> Tuple[bool, str]:
+    def _exec(self, args: List[str], timeout: Optional[float], stderr=subprocess.STDOUT,
+              probe: bool = False) -> subprocess.CompletedProcess:
+        """
+        执行 adb 子进程（可取消、受 deadline 约束、经过熔断器）。
+        熔断中抛 DeviceUnavailable；超时抛 subprocess.TimeoutExpired；任务取消抛 cancel.Cancelled。
+        """
+        serial = args[1] if len(args) >= 2 and args[0] == "-s" else None
+        br = self.breakers.get(serial) if serial and not probe else None
+        if br is not None and not br.allow():
+            raise DeviceUnavailable(serial)
+        budget = cancel.remaining(timeout)
+        creation = subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0
+        t0 = time.perf_counter()
+        try:
+            p = cancel.run(
+                [self.adb_path] + args,
+                stdout=subprocess.PIPE,
+                stderr=stderr,
+                timeout=budget,
+                creationflags=creation
+            )
+        except subprocess.TimeoutExpired:
+            if br is not None and (budget is None or budget >= self._BREAKER_MIN_TIMEOUT):
+                br.record_timeout()
+            if serial and not probe:
+                health.monitor().record(serial, self._call_kind(args), time.perf_counter() - t0, False)
+            raise
+        if br is not None:
+            br.record_ok()
+        if serial and not probe:
+            kind = self._call_kind(args)
+            # 普通 shell 的非零退出码多为命令本身的结果，只对截图/输入计为失败
+            ok = p.returncode == 0 or kind == "other"
+            health.monitor().record(serial, kind, time.perf_counter() - t0, ok)
+        return p
+
+    @staticmethod
+    def _call_kind(args: List[str]) -> str:
+        if "screencap" in args:
+            return "capture"
+        if len(args) >= 4 and args[2] == "shell" and args[3].startswith("input "):
+            return "input"
+        return "other"
+
+    def _run(self, args: List[str], timeout: Optional[float] = None) -> Tuple[bool, str]:
         """
         执行 adb 子进程，返回 (ok, stdout+stderr)。
-        在 Windows 下隐藏黑窗。
+        在 Windows 下隐藏黑窗；所在任务被取消时子进程立即结束并返回失败。
         """
         if not self.adb_path:
             return False, "adb path not set"
 
         try:
-            cmd = [self.adb_path] + args
-            creation = subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0
-            p = subprocess.run(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                timeout=timeout,
-                creationflags=creation
-            )
+            p = self._exec(args, self.DEFAULT_TIMEOUT if timeout is None else timeout)
             out = p.stdout.decode("utf-8", errors="ignore").strip()
             ok = (p.returncode == 0)
             return ok, out
         except subprocess.TimeoutExpired:
             return False, "ADB 命令超时"
+        except cancel.Cancelled:
+            return False, "ADB 命令已取消"
+        except DeviceUnavailable:
+            return False, "设备无响应（熔断中）"
         except Exception as e:
             return False, f"ADB 执行失败：{e}"
 
+    def _probe(self, serial: str) -> bool:
+        """熔断探测：绕过熔断器执行一次 shell true。"""
+        if not self.adb_path:
+            return False
+        try:
+            p = self._exec(["-s", serial, "shell", "true"], self.PROBE_TIMEOUT, probe=True)
+            return p.returncode == 0
+        except Exception:
+            return False
+
+    def _on_breaker(self, serial: str, opened: bool) -> None:
+        health.monitor().set_breaker(serial, opened)
+        if opened:
+            self.logger.warn(f"[{serial}] adb 连续超时，暂停向该设备发送命令，后台探测恢复中")
+        else:
+            self.logger.info(f"[{serial}] adb 已恢复响应")
+
+    def is_unavailable(self, serial: str) -> bool:
+        """设备是否处于熔断中（调用会立即失败）。"""
+        return self.breakers.is_open(serial)
+
+    # ---------------- 分辨率档案 ----------------
+    def set_normalize(self, on: bool) -> None:
+        """开启/关闭截图与坐标的逻辑分辨率归一化。"""
+        self.normalize = bool(on)
+
+    def profile(self, serial: str) -> Optional[DeviceProfile]:
+        """设备分辨率档案（wm size / wm density，按 serial 缓存）；探测失败返回 None（下次重试）。"""
+        prof = self._profiles.get(serial)
+        if prof is not None:
+            return prof
+        ok, out = self._run(["-s", serial, "shell", "wm size"], timeout=5)
+        size = parse_wm_size(out) if ok else None
+        if size is None:
+            return None
+        ok_d, out_d = self._run(["-s", serial, "shell", "wm density"], timeout=5)
+        prof = DeviceProfile(serial, size[0], size[1], parse_wm_density(out_d) if ok_d else None)
+        self._profiles[serial] = prof
+        if not prof.identity:
+            self.logger.info(f"[{serial}] 分辨率 {prof.width}x{prof.height}（DPI {prof.density}），"
+                             f"{'已按 %dx%d 归一化' % prof.logical if self.normalize else '未归一化'}")
+        return prof
+
+    def forget_profile(self, serial: str) -> None:
+        """分辨率/DPI 可能变化时（如重连、修改模拟器设置）清除档案。"""
+        self._profiles.pop(serial, None)
+        self._touch_cache.pop(serial, None)
+
+    def _active_profile(self, serial: str) -> Optional[DeviceProfile]:
+        """归一化开启且设备非逻辑尺寸时返回档案，否则 None（坐标/截图原样）。"""
+        if not self.normalize:
+            return None
+        prof = self.profile(serial)
+        return prof if prof is not None and not prof.identity else None
+
+    def to_physical(self, serial: str, x: float, y: float) -> Tuple[int, int]:
+        prof = self._active_profile(serial)
+        return prof.to_physical(x, y) if prof else (int(x), int(y))
+
+    def physical_actions(self, serial: str, actions):
+        """fleet 动作序列的坐标换算（未开启归一化时原样返回）。"""
+        prof = self._active_profile(serial)
+        return prof.map_actions(actions) if prof else actions
+
+    def _normalize_png(self, serial: str, png: bytes) -> bytes:
+        """把物理分辨率截图缩放到逻辑尺寸（OpenCV 不可用或失败时原样返回）。"""
+        prof = self._active_profile(serial)
+        if prof is None:
+            return png
+        try:
+            import cv2
+            import numpy as np
+            img = cv2.imdecode(np.frombuffer(png, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+            if img is None or (img.shape[1], img.shape[0]) != (prof.width, prof.height):
+                return png
+            interp = cv2.INTER_AREA if prof.sx > 1 else cv2.INTER_LINEAR
+            img = cv2.resize(img, prof.logical, interpolation=interp)
+            ok, buf = cv2.imencode(".png", img, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+            return buf.tobytes() if ok else png
+        except Exception:
+            return png
+
     # ---------------- 设备管理 ----------------
     def list_devices(self) -> List[str]:
         ok, out = self._run(["devices"])
@@ -133,54 +295,320 @@ class AdbClient:
 
     def connect(self, ip_port: str):
         # 缩短连接超时，避免大规模扫描时长时间卡住
-        return self._run(["connect", ip_port], timeout=2)
+        ok, out = self._run(["connect", ip_port], timeout=2)
+        if ok and "connected" in out and "cannot" not in out:
+            self.breakers.reset(ip_port)
+            self.forget_profile(ip_port)
+        return ok, out
 
     def disconnect(self, serial: str):
         return self._run(["disconnect", serial], timeout=2)
 
     # ---------------- 输入事件 ----------------
-    def shell(self, serial: str, cmd: str):
-        return self._run(["-s", serial, "shell", cmd])
+    def shell(self, serial: str, cmd: str, timeout: Optional[float] = None):
+        return self._run(["-s", serial, "shell", cmd], timeout=timeout)
 
-    def input_tap(self, serial: str, x: int, y: int):
-        return self.shell(serial, f"input tap {x} {y}")
+    def input_tap(self, serial: str, x: int, y: int, timeout: Optional[float] = None):
+        x, y = self.to_physical(serial, x, y)
+        return self.shell(serial, f"input tap {x} {y}", timeout=timeout or self.INPUT_TIMEOUT)
 
-    def input_text(self, serial: str, text: str):
+    def input_text(self, serial: str, text: str, timeout: Optional[float] = None):
         safe = text.replace(" ", "%s")
-        return self.shell(serial, f"input text {safe}")
+        return self.shell(serial, f"input text {safe}", timeout=timeout or self.INPUT_TIMEOUT)
 
-    def input_keyevent(self, serial: str, keycode: int):
-        return self.shell(serial, f"input keyevent {keycode}")
+    def input_keyevent(self, serial: str, keycode: int, timeout: Optional[float] = None):
+        return self.shell(serial, f"input keyevent {keycode}", timeout=timeout or self.INPUT_TIMEOUT)
 
     def input_back(self, serial: str):
         # KEYCODE_BACK = 4
         return self.input_keyevent(serial, 4)
 
-    def input_swipe(self, serial: str, start_x: int, start_y: int, end_x: int, end_y: int, duration: int = 1000):
-        """执行滑动操作"""
-        return self.shell(serial, f"input swipe {start_x} {start_y} {end_x} {end_y} {duration}")
+    def input_swipe(self, serial: str, start_x: int, start_y: int, end_x: int, end_y: int, duration: int = 1000,
+                    timeout: Optional[float] = None):
+        """执行滑动操作（默认超时 = 输入超时 + 滑动时长）"""
+        if timeout is None:
+            timeout = self.INPUT_TIMEOUT + max(0, int(duration)) / 1000.0
+        start_x, start_y = self.to_physical(serial, start_x, start_y)
+        end_x, end_y = self.to_physical(serial, end_x, end_y)
+        return self.shell(serial, f"input swipe {start_x} {start_y} {end_x} {end_y} {duration}", timeout=timeout)
+
+    # ---------------- 高频连点 ----------------
+    # Linux input 事件常量（sendevent 快速通道）
+    _EV_SYN, _EV_KEY, _EV_ABS = 0, 1, 3
+    _BTN_TOUCH = 330
+    _ABS_MT_POSITION_X, _ABS_MT_POSITION_Y, _ABS_MT_TRACKING_ID = 53, 54, 57
+
+    def _touch_device(self, serial: str) -> Optional[dict]:
+        """
+        探测可用 sendevent 写入的触摸设备（结果按 serial 缓存）：
+        返回 {"dev", "max_x", "max_y", "disp_w", "disp_h"}；不可用返回 None。
+        """
+        cache = self._touch_cache
+        if serial in cache:
+            return cache[serial]
+        info = None
+        try:
+            ok, out = self._run(["-s", serial, "shell", "getevent -p"], timeout=5)
+            dev, found = None, {}
+            if ok:
+                for line in out.splitlines():
+                    s = line.strip()
+                    if s.startswith("add device"):
+                        if dev and "x" in found and "y" in found:
+                            break
+                        dev, found = s.split(":", 1)[1].strip(), {}
+                        continue
+                    m = re.search(r"\b(0035|0036)\s*:.*?max (\d+)", s)
+                    if m and dev:
+                        found["x" if m.group(1) == "0035" else "y"] = int(m.group(2))
+            ok_sz, sz = self._run(["-s", serial, "shell", "wm size"], timeout=5)
+            sizes = re.findall(r"(\d+)x(\d+)", sz) if ok_sz else []
+            if dev and "x" in found and "y" in found and sizes:
+                disp_w, disp_h = (int(v) for v in sizes[-1])  # 有 Override size 时以其为准
+                # 只检查当前 shell 用户对设备节点的写权限，不向正在使用的触摸设备写入任何事件
+                ok_w, out_w = self._run(["-s", serial, "shell", f"[ -w {dev} ] && echo W"], timeout=5)
+                if ok_w and out_w.strip() == "W":
+                    info = {"dev": dev, "max_x": found["x"], "max_y": found["y"],
+                            "disp_w": disp_w, "disp_h": disp_h}
+        except Exception:
+            info = None
+        cache[serial] = info
+        return info
+
+    def _sendevent_tap_cmd(self, info: dict, x: int, y: int, tracking_id: int) -> str:
+        tx = int(round(x * (info["max_x"] + 1) / float(info["disp_w"])))
+        ty = int(round(y * (info["max_y"] + 1) / float(info["disp_h"])))
+        tx = max(0, min(info["max_x"], tx))
+        ty = max(0, min(info["max_y"], ty))
+        d = info["dev"]
+        ev = [
+            (self._EV_ABS, self._ABS_MT_TRACKING_ID, tracking_id),
+            (self._EV_ABS, self._ABS_MT_POSITION_X, tx),
+            (self._EV_ABS, self._ABS_MT_POSITION_Y, ty),
+            (self._EV_KEY, self._BTN_TOUCH, 1),
+            (self._EV_SYN, 0, 0),
+            (self._EV_ABS, self._ABS_MT_TRACKING_ID, -1),
+            (self._EV_KEY, self._BTN_TOUCH, 0),
+            (self._EV_SYN, 0, 0),
+        ]
+        return "; ".join(f"sendevent {d} {t} {c} {v}" for t, c, v in ev)
+
+    def tap_burst(self, serial: str, x: int, y: int, rate_hz: float = 20.0, duration_s: float = 1.0,
+                  should_stop: Optional[Callable[[], bool]] = None, mode: str = "auto") -> dict:
+        """
+        在设备端循环高频点击 (x, y)，避免每次点击都启动一个 adb 进程。
+        mode:
+          - "auto"：触摸设备可用 sendevent 写入时走 "sendevent"，否则 "shell"；
+          - "sendevent"：直接写 input 事件（无 JVM 启动开销，速率最高）；
+          - "shell"：设备端 shell 循环调用 input tap（同一时刻只有一个，每次都要启动 JVM，
+            实际速率受其耗时限制）；
+          - "host"：主机端逐次 input_tap（旧行为，兜底）。
+        按时长结束：设备端循环到 duration_s（按设备时钟取整秒兜底），主机端到点即通知退出，
+        不会因单次点击耗时长（shell 模式每次启动 JVM）而拖过时长；点击数最多 rate_hz*duration_s。
+        should_stop() 为 True 时中途停止（设备端循环在下一次点击前退出）。
+        返回 {"ok", "mode", "taps", "elapsed", "rate", "target_rate", "stopped"}，
+        rate 为实际达到的点击速率（次/秒，按首末次点击回显计算）。
+        """
+        rate_hz = max(0.1, float(rate_hz))
+        duration_s = max(0.0, float(duration_s))
+        total = int(round(rate_hz * duration_s))
+        result = {"ok": True, "mode": mode, "taps": 0, "elapsed": 0.0, "rate": 0.0,
+                  "target_rate": rate_hz, "stopped": False}
+        if total <= 0:
+            return result
+        stop = should_stop or (lambda: False)
+        x, y = self.to_physical(serial, x, y)
+
+        if mode == "auto":
+            mode = "sendevent" if self._touch_device(serial) else "shell"
+        elif mode == "sendevent" and not self._touch_device(serial):
+            self.logger.warn(f"[{serial}] 未找到可写入的触摸设备，连点改用 shell 模式")
+            mode = "shell"
+        result["mode"] = mode
+        if self.is_unavailable(serial):
+            result.update(ok=False, mode="host")
+            return result
+        if mode == "host" or not self.adb_path:
+            result["mode"] = "host"
+            return self._tap_burst_host(serial, x, y, rate_hz, total, duration_s, stop, result)
+
+        interval = 1.0 / rate_hz
+        seq = next(self._burst_ids)
+        flag = f"/data/local/tmp/.mumu_burst_{os.getpid()}_{seq}"
+        if mode == "sendevent":
+            tap = self._sendevent_tap_cmd(self._touch_device(serial), x, y, 4000 + seq % 1000) + ";"
+        else:
+            # input tap 每次都要启动 JVM：前台顺序执行，同一时刻最多一个，避免并发 JVM 压垮设备
+            tap = f"input tap {x} {y};"
+        # 先在后台起计时 sleep 再点击，最后等计时结束：周期 = max(间隔, 点击耗时)；
+        # 到点数、到时（date +%s 只有秒精度，向上取整作兜底）或出现停止标记时退出
+        span = max(1, int(math.ceil(duration_s)))
+        script = (
+            f"rm -f {flag}; e=$(( $(date +%s) + {span} )); i=0; while [ $i -lt {total} ]; do "
+            f"[ -e {flag} ] && break; [ $(date +%s) -ge $e ] && break; "
+            f"sleep {interval:.4f} & s=$!; {tap} i=$((i+1)); echo t; "
+            f"wait $s; done; rm -f {flag}"
+        )
+        t_start = time.perf_counter()
+
+        try:
+            creation = subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0
+            p = subprocess.Popen([self.adb_path, "-s", serial, "shell", script],
+                                 stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                 creationflags=creation)
+            cancel.track(p)
+        except Exception as e:
+            self.logger.warn(f"[{serial}] 设备端连点启动失败（{e}），改用主机端点击")
+            result["mode"] = "host"
+            return self._tap_burst_host(serial, x, y, rate_hz, total, duration_s, stop, result)
+
+        stamps: List[float] = []
+
+        def _reader():
+            try:
+                for line in p.stdout:
+                    if line.strip() == b"t":
+                        stamps.append(time.perf_counter())
+            except Exception:
+                pass
+
+        reader = threading.Thread(target=_reader, name=f"TapBurst-{serial}", daemon=True)
+        reader.start()
+        # 到时长先放停止标记让设备端自行退出（当前这次点击做完），宽限后仍未退出才强杀
+        t_end = t_start + duration_s
+        deadline = t_end + 2.0
+        stop_sent = False
+        while p.poll() is None:
+            if not stop_sent:
+                if stop():
+                    stop_sent = True
+                    result["stopped"] = True
+                elif time.perf_counter() >= t_end:
+                    stop_sent = True
+                if stop_sent:
+                    self._run(["-s", serial, "shell", f"touch {flag}"], timeout=2)
+                    deadline = min(deadline, time.perf_counter() + 2.0)
+            if time.perf_counter() > deadline:
+                try:
+                    p.kill()
+                except Exception:
+                    pass
+                break
+            time.sleep(0.05)
+        try:
+            p.wait(timeout=2)
+        except Exception:
+            pass
+        cancel.untrack(p)
+        reader.join(timeout=1.0)
+
+        taps = len(stamps)
+        result["taps"] = taps
+        if taps >= 2:
+            result["elapsed"] = stamps[-1] - stamps[0]
+            result["rate"] = (taps - 1) / result["elapsed"] if result["elapsed"] > 0 else 0.0
+        result["ok"] = taps > 0 or result["stopped"]
+        if taps == 0 and not result["stopped"]:
+            # 只用剩余时长兜底，不把整段点击在主机端重放一遍
+            remain = t_end - time.perf_counter()
+            if remain <= 0:
+                self.logger.warn(f"[{serial}] 设备端连点无回显（mode={mode}），时长已用完")
+                return result
+            self.logger.warn(f"[{serial}] 设备端连点无回显（mode={mode}），剩余 {remain:.1f}s 改用主机端点击")
+            result["mode"] = "host"
+            return self._tap_burst_host(serial, x, y, rate_hz, int(round(rate_hz * remain)), remain,
+                                        stop, result)
+        return result
+
+    def _tap_burst_host(self, serial: str, x: int, y: int, rate_hz: float, total: int,
+                        duration_s: float, stop: Callable[[], bool], result: dict) -> dict:
+        interval = 1.0 / rate_hz
+        t0 = time.perf_counter()
+        t_end = t0 + duration_s
+        taps = 0
+        for _ in range(total):
+            if stop():
+                result["stopped"] = True
+                break
+            if time.perf_counter() >= t_end:
+                break
+            # 坐标已是物理坐标，不再经 input_tap 换算
+            self.shell(serial, f"input tap {x} {y}", timeout=self.INPUT_TIMEOUT)
+            taps += 1
+            time.sleep(max(0.0, t0 + taps * interval - time.perf_counter()))
+        elapsed = time.perf_counter() - t0
+        result.update(ok=taps > 0 or result["stopped"], taps=taps, elapsed=elapsed,
+                      rate=(taps / elapsed if elapsed > 0 else 0.0))
+        return result
 
     # ---------------- 截图（PNG bytes） ----------------
-    def screencap(self, serial: str):
+    def screencap(self, serial: str, timeout: Optional[float] = None):
         """
         返回 (ok, png_bytes|None)
         """
         if not self.adb_path:
             return False, None
         try:
-            creation = subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0
-            cmd = [self.adb_path, "-s", serial, "exec-out", "screencap", "-p"]
-            p = subprocess.run(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                timeout=30,
-                creationflags=creation
-            )
+            p = self._exec(["-s", serial, "exec-out", "screencap", "-p"],
+                           self.SCREENCAP_TIMEOUT if timeout is None else timeout,
+                           stderr=subprocess.PIPE)
             if p.returncode != 0:
                 return False, None
-            return True, p.stdout
+            png = p.stdout
+            if png and self.normalize:
+                png = self._normalize_png(serial, png)
+            if png and self._png_keep > 0:
+                self._remember_png(serial, png)
+            return True, png
         except subprocess.TimeoutExpired:
             return False, None
         except Exception:
             return False, None
+
+    def screencap_raw(self, serial: str, timeout: Optional[float] = None):
+        """
+        不压缩截图（screencap 不带 -p）：省去设备端 PNG 编码，适合缩略图等只需缩放的场景。
+        始终为物理分辨率（不做归一化）。
+        返回 (ok, (w, h, rgba_bytes)|None)；像素格式非 RGBA_8888/RGBX_8888 时返回失败。
+        """
+        if not self.adb_path:
+            return False, None
+        try:
+            p = self._exec(["-s", serial, "exec-out", "screencap"],
+                           self.SCREENCAP_TIMEOUT if timeout is None else timeout,
+                           stderr=subprocess.PIPE)
+            data = p.stdout
+            if p.returncode != 0 or len(data) < 12:
+                return False, None
+            w = int.from_bytes(data[0:4], "little")
+            h = int.from_bytes(data[4:8], "little")
+            fmt = int.from_bytes(data[8:12], "little")
+            # 头部 12 字节（w, h, format），Android 9+ 另有 4 字节 colorspace
+            header = len(data) - w * h * 4
+            if fmt not in (1, 2) or w <= 0 or h <= 0 or header not in (12, 16):
+                return False, None
+            return True, (w, h, data[header:])
+        except subprocess.TimeoutExpired:
+            return False, None
+        except Exception:
+            return False, None
+
+    def keep_recent_png(self, seconds: float) -> None:
+        """开启（seconds>0，如缩略图网格显示期间）或关闭（0，同时清空）最近截图的保留。"""
+        self._png_keep = max(0.0, float(seconds))
+        if self._png_keep <= 0:
+            self._last_png.clear()
+
+    def _remember_png(self, serial: str, png: bytes) -> None:
+        now = time.monotonic()
+        self._last_png[serial] = (now, png)
+        for s, (ts, _) in list(self._last_png.items()):
+            if now - ts > self._png_keep:
+                self._last_png.pop(s, None)
+
+    def recent_png(self, serial: str, max_age: float) -> Optional[bytes]:
+        """max_age 秒内最近一次 screencap 得到的 PNG（通常由任务截取），没有返回 None。"""
+        item = self._last_png.get(serial)
+        if item and time.monotonic() - item[0] <= max_age:
+            return item[1]
+        return None
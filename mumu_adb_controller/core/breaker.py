@@ -0,0 +1,117 @@
+# mumu_adb_controller/core/breaker.py
+"""
+按设备的 adb 熔断器：
+- 同一设备连续 FAIL_THRESHOLD 次 adb 调用超时后“断开”，之后该设备的调用直接失败，
+  不再每次白等完整超时、占住 DeviceWorker；
+- 断开期间由后台线程定期探测（probe 返回 True 表示设备已恢复），成功后自动“闭合”；
+- 探测间隔从 PROBE_INTERVAL 起按 2 倍退避，最长 PROBE_MAX_INTERVAL；
+- 成功的调用清零连续超时计数；被取消的调用不计入。
+"""
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+FAIL_THRESHOLD = 3
+PROBE_INTERVAL = 3.0
+PROBE_MAX_INTERVAL = 30.0
+
+
+class CircuitBreaker:
+    """单台设备的熔断状态。"""
+
+    def __init__(self, serial: str, probe: Callable[[str], bool],
+                 on_change: Optional[Callable[[str, bool], None]] = None):
+        self.serial = serial
+        self._probe = probe
+        self._on_change = on_change
+        self._lock = threading.Lock()
+        self.timeouts = 0          # 连续超时次数
+        self.opened_at = 0.0       # 断开时刻（monotonic），0 表示闭合
+        self.trips = 0             # 累计断开次数
+        self._prober: Optional[threading.Thread] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at > 0
+
+    def allow(self) -> bool:
+        return not self.is_open
+
+    def record_ok(self) -> None:
+        with self._lock:
+            self.timeouts = 0
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+            if self.is_open or self.timeouts < FAIL_THRESHOLD:
+                return
+            self.opened_at = time.monotonic()
+            self.trips += 1
+            start = self._prober is None or not self._prober.is_alive()
+            if start:
+                self._prober = threading.Thread(target=self._probe_loop,
+                                                name=f"AdbProbe-{self.serial}", daemon=True)
+        self._notify(True)
+        if start:
+            self._prober.start()
+
+    def reset(self) -> None:
+        """手动闭合（如重新 connect 成功）。"""
+        with self._lock:
+            was_open = self.is_open
+            self.timeouts = 0
+            self.opened_at = 0.0
+        if was_open:
+            self._notify(False)
+
+    def _probe_loop(self) -> None:
+        interval = PROBE_INTERVAL
+        while self.is_open:
+            time.sleep(interval)
+            if not self.is_open:
+                break
+            try:
+                ok = bool(self._probe(self.serial))
+            except Exception:
+                ok = False
+            if ok:
+                self.reset()
+                break
+            interval = min(PROBE_MAX_INTERVAL, interval * 2)
+
+    def _notify(self, opened: bool) -> None:
+        if self._on_change is None:
+            return
+        try:
+            self._on_change(self.serial, opened)
+        except Exception:
+            pass
+
+
+class BreakerBoard:
+    """serial -> CircuitBreaker（按需创建）。"""
+
+    def __init__(self, probe: Callable[[str], bool],
+                 on_change: Optional[Callable[[str, bool], None]] = None):
+        self._probe = probe
+        self._on_change = on_change
+        self._items: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, serial: str) -> CircuitBreaker:
+        with self._lock:
+            br = self._items.get(serial)
+            if br is None:
+                br = CircuitBreaker(serial, self._probe, self._on_change)
+                self._items[serial] = br
+            return br
+
+    def is_open(self, serial: str) -> bool:
+        br = self._items.get(serial)
+        return br is not None and br.is_open
+
+    def reset(self, serial: str) -> None:
+        br = self._items.get(serial)
+        if br is not None:
+            br.reset()
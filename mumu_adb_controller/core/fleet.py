@@ -0,0 +1,358 @@
+# mumu_adb_controller/core/fleet.py
+"""
+多设备同步输入（集结上车 / 打熊发车时让所有账号在几毫秒内同时点击）：
+- 每台设备维持一个常驻 `adb shell` 会话（stdin 管道），命令写入即执行，
+  省去每次点击启动 adb 进程的几十毫秒且各设备启动耗时不一致的问题；
+- broadcast()：先为每台设备拼好命令，各发送线程在同一 Event 上等待放行，
+  放行后并发写入；每段命令末尾回显 "@fleet <序号>"，用于统计完成时刻；
+- gather()：各设备任务线程各自走到“出征”一步时登记动作并等待，
+  成员到齐（或首个到达后超过 window 秒）时统一 broadcast；
+- 返回值含发送/完成时刻的偏差统计（skew，毫秒）。
+
+动作格式（元组）：
+    ("tap", x, y) / ("swipe", x1, y1, x2, y2, ms) / ("key", keycode) / ("sleep", 秒)
+"""
+import os
+import time
+import itertools
+import threading
+import subprocess
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from ..common.logger import Logger
+
+Action = Tuple
+Actions = Sequence[Action]
+
+_ACK = "@fleet"
+
+
+def build_command(actions: Actions) -> str:
+    """动作序列 -> 设备端 shell 命令（分号连接）；未知动作抛 ValueError。"""
+    parts: List[str] = []
+    for act in actions:
+        kind = str(act[0]).lower()
+        args = act[1:]
+        if kind == "tap":
+            x, y = args
+            parts.append(f"input tap {int(x)} {int(y)}")
+        elif kind == "swipe":
+            x1, y1, x2, y2 = args[:4]
+            ms = int(args[4]) if len(args) > 4 else 300
+            parts.append(f"input swipe {int(x1)} {int(y1)} {int(x2)} {int(y2)} {ms}")
+        elif kind in ("key", "keyevent"):
+            parts.append(f"input keyevent {int(args[0])}")
+        elif kind == "sleep":
+            parts.append(f"sleep {max(0.0, float(args[0])):.3f}")
+        else:
+            raise ValueError(f"未知动作：{act!r}")
+    return "; ".join(parts)
+
+
+def skew_stats(stamps: Dict[str, float]) -> dict:
+    """
+    各设备时刻（perf_counter 秒）的偏差统计，单位毫秒：
+    spread=最晚-最早，mean=相对最早的平均偏移，max_dev=相对均值的最大偏差。
+    """
+    if not stamps:
+        return {"n": 0, "spread_ms": 0.0, "mean_ms": 0.0, "max_dev_ms": 0.0, "first": None, "last": None}
+    items = sorted(stamps.items(), key=lambda kv: kv[1])
+    t0 = items[0][1]
+    offs = [(t - t0) * 1000.0 for _, t in items]
+    mean = sum(offs) / len(offs)
+    return {
+        "n": len(items),
+        "spread_ms": offs[-1],
+        "mean_ms": mean,
+        "max_dev_ms": max(abs(o - mean) for o in offs),
+        "first": items[0][0],
+        "last": items[-1][0],
+    }
+
+
+class _Session:
+    """单台设备的常驻 adb shell 会话；reader 线程解析回显的完成标记。"""
+
+    def __init__(self, adb_path: str, serial: str):
+        self.serial = serial
+        creation = subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0
+        self.proc = subprocess.Popen([adb_path, "-s", serial, "shell"],
+                                     stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                     stderr=subprocess.DEVNULL, creationflags=creation)
+        self._cond = threading.Condition()
+        self._acks: Dict[int, float] = {}
+        self._reader = threading.Thread(target=self._read, name=f"Fleet-{serial}", daemon=True)
+        self._reader.start()
+
+    def _read(self):
+        try:
+            for raw in self.proc.stdout:
+                line = raw.decode("utf-8", errors="ignore").strip()
+                if not line.startswith(_ACK):
+                    continue
+                try:
+                    seq = int(line.split()[1])
+                except Exception:
+                    continue
+                with self._cond:
+                    self._acks[seq] = time.perf_counter()
+                    self._cond.notify_all()
+        except Exception:
+            pass
+        with self._cond:
+            self._cond.notify_all()
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def write(self, line: str) -> None:
+        self.proc.stdin.write((line + "\n").encode("utf-8"))
+        self.proc.stdin.flush()
+
+    def wait_ack(self, seq: int, deadline: float) -> Optional[float]:
+        with self._cond:
+            while seq not in self._acks:
+                remain = deadline - time.perf_counter()
+                if remain <= 0 or not self.alive():
+                    return None
+                self._cond.wait(min(remain, 0.2))
+            return self._acks.pop(seq)
+
+    def close(self) -> None:
+        try:
+            self.proc.stdin.close()
+        except Exception:
+            pass
+        try:
+            self.proc.terminate()
+            self.proc.wait(timeout=1)
+        except Exception:
+            try:
+                self.proc.kill()
+            except Exception:
+                pass
+
+
+class FleetInput:
+    """
+    多设备同步输入。会话按需建立，断开后下次自动重建；
+    会话不可用的设备回退为放行后各自执行一次 adb shell（仍同时放行，只是多了进程启动开销）。
+    """
+
+    def __init__(self, adb, logger: Optional[Logger] = None):
+        self.adb = adb
+        self.logger = logger or getattr(adb, "logger", None)
+        self._sessions: Dict[str, _Session] = {}
+        self._lock = threading.Lock()
+        self._seq = itertools.count(1)
+        # gather 状态：group -> 成员集合 / 当前批次
+        self._members: Dict[str, set] = {}
+        self._rounds: Dict[str, dict] = {}
+        self._gcond = threading.Condition()
+
+    # ---------------- 会话 ----------------
+    def _session(self, serial: str) -> Optional[_Session]:
+        with self._lock:
+            s = self._sessions.get(serial)
+            if s is not None and s.alive():
+                return s
+            if s is not None:
+                s.close()
+                self._sessions.pop(serial, None)
+            if not getattr(self.adb, "adb_path", None):
+                return None
+            try:
+                s = _Session(self.adb.adb_path, serial)
+            except Exception as e:
+                if self.logger:
+                    self.logger.warn(f"[{serial}] 同步输入会话启动失败：{e}")
+                return None
+            self._sessions[serial] = s
+            return s
+
+    def warm_up(self, serials: Iterable[str], timeout: float = 3.0) -> List[str]:
+        """预先建立会话并确认可用（回显一次），返回可用的设备列表。"""
+        ready: List[str] = []
+        for serial in serials:
+            s = self._session(serial)
+            if s is None:
+                continue
+            seq = next(self._seq)
+            try:
+                s.write(f"echo {_ACK} {seq}")
+            except Exception:
+                continue
+            if s.wait_ack(seq, time.perf_counter() + timeout) is not None:
+                ready.append(serial)
+        return ready
+
+    def close(self, serial: Optional[str] = None) -> None:
+        """关闭指定设备（None=全部）的会话。"""
+        with self._lock:
+            keys = [serial] if serial else list(self._sessions)
+            sessions = [self._sessions.pop(k) for k in keys if k in self._sessions]
+        for s in sessions:
+            s.close()
+
+    # ---------------- 广播 ----------------
+    def broadcast(self, serials: Sequence[str], actions: Union[Actions, Dict[str, Actions]],
+                  timeout: float = 5.0) -> dict:
+        """
+        向 serials 同时发送动作序列（actions 为列表=所有设备相同；为 dict=按设备指定）。
+        返回：
+          {"ok", "results": {serial: {"ok", "mode", "sent", "done", "written"}},
+           "send_skew": skew_stats(发送时刻), "done_skew": skew_stats(完成时刻)}
+        sent/done 为相对放行时刻的毫秒数；mode 为 "session" 或 "exec"；
+        written 表示命令已写出/已执行（ok=False 但 written=True 时多半只是回显超时，不应补发）。
+        """
+        serials = list(dict.fromkeys(serials))
+        plan: Dict[str, Tuple[str, Optional[_Session]]] = {}
+        for serial in serials:
+            acts = actions.get(serial) if isinstance(actions, dict) else actions
+            if not acts:
+                continue
+            # 开启分辨率归一化时把逻辑坐标换算为该设备的物理坐标
+            if hasattr(self.adb, "physical_actions"):
+                acts = self.adb.physical_actions(serial, acts)
+            plan[serial] = (build_command(acts), self._session(serial))
+
+        go = threading.Event()
+        sent: Dict[str, float] = {}
+        done: Dict[str, float] = {}
+        results: Dict[str, dict] = {}
+        deadline_box = [0.0]
+
+        def _send(serial: str, cmd: str, sess: Optional[_Session]):
+            res = {"ok": False, "mode": "session" if sess else "exec", "sent": None, "done": None, "written": False}
+            seq = next(self._seq)
+            line = f"{cmd}; echo {_ACK} {seq}"
+            go.wait()
+            if sess is not None:
+                try:
+                    sess.write(line)
+                    sent[serial] = time.perf_counter()
+                    t = sess.wait_ack(seq, deadline_box[0])
+                    if t is not None:
+                        done[serial] = t
+                        res["ok"] = True
+                except Exception:
+                    sess = None
+                    res["mode"] = "exec"
+            if sess is None and serial not in done:
+                sent.setdefault(serial, time.perf_counter())
+                ok, _ = self.adb._run(["-s", serial, "shell", cmd], timeout=max(1, int(timeout)))
+                done[serial] = time.perf_counter()
+                res["ok"] = bool(ok)
+            res["written"] = serial in sent
+            results[serial] = res
+
+        threads = [threading.Thread(target=_send, args=(s, c, sess), name=f"FleetSend-{s}", daemon=True)
+                   for s, (c, sess) in plan.items()]
+        for t in threads:
+            t.start()
+        # 给发送线程一点时间进入 go.wait()，再同时放行
+        time.sleep(0.005)
+        t0 = time.perf_counter()
+        deadline_box[0] = t0 + timeout
+        go.set()
+        for t in threads:
+            t.join(timeout=timeout + 1.0)
+
+        for serial, res in results.items():
+            if serial in sent:
+                res["sent"] = (sent[serial] - t0) * 1000.0
+            if serial in done:
+                res["done"] = (done[serial] - t0) * 1000.0
+        for serial in plan:
+            results.setdefault(serial, {"ok": False, "mode": "timeout", "sent": None, "done": None,
+                                        "written": serial in sent})
+        ok_done = {s: done[s] for s, r in results.items() if r["ok"] and s in done}
+        return {
+            "ok": bool(results) and all(r["ok"] for r in results.values()),
+            "results": results,
+            "send_skew": skew_stats({s: sent[s] for s in results if s in sent}),
+            "done_skew": skew_stats(ok_done),
+        }
+
+    # ---------------- 汇合后同时执行 ----------------
+    def enroll(self, group: str, serial: str) -> None:
+        """登记 serial 参与 group 的同步动作（任务启动时调用），并在后台预建会话。"""
+        with self._gcond:
+            self._members.setdefault(group, set()).add(serial)
+            self._gcond.notify_all()
+        threading.Thread(target=self.warm_up, args=([serial],), name=f"FleetWarm-{serial}", daemon=True).start()
+
+    def leave(self, group: str, serial: str) -> None:
+        """退出 group（任务结束时调用）；正在等待的批次不再等它。"""
+        with self._gcond:
+            members = self._members.get(group)
+            if members is not None:
+                members.discard(serial)
+                if not members:
+                    self._members.pop(group, None)
+            self._gcond.notify_all()
+
+    def members(self, group: str) -> List[str]:
+        with self._gcond:
+            return sorted(self._members.get(group, ()))
+
+    def gather(self, group: str, serial: str, actions: Actions, window: float = 1.0,
+               timeout: float = 5.0, should_stop: Optional[Callable[[], bool]] = None) -> dict:
+        """
+        在 group 内汇合：阻塞直到所有成员都提交了动作，或距首个提交超过 window 秒，
+        然后由最后一个到达（或超时）的线程统一 broadcast。
+        返回本设备的结果 dict（含 "batch"：本批次的完整 broadcast 结果）。
+        等待中 should_stop() 为真时撤回本设备的动作、不下发，返回 {"ok": False, "mode": "stopped"}；
+        其余成员继续按原规则汇合。
+        未 enroll 或只有自己一个成员时直接执行。
+        """
+        stop = should_stop or (lambda: False)
+        with self._gcond:
+            members = self._members.get(group, set())
+            if len(members) <= 1 or serial not in members:
+                solo = True
+            else:
+                solo = False
+                rnd = self._rounds.get(group)
+                if rnd is None or rnd["closed"]:
+                    rnd = {"actions": {}, "t0": time.perf_counter(), "closed": False, "result": None}
+                    self._rounds[group] = rnd
+                rnd["actions"][serial] = actions
+                self._gcond.notify_all()
+        if solo:
+            batch = self.broadcast([serial], actions, timeout=timeout)
+            return dict(batch["results"].get(serial, {"ok": False}), batch=batch)
+
+        leader = False
+        with self._gcond:
+            while not rnd["closed"]:
+                if stop():
+                    rnd["actions"].pop(serial, None)
+                    if not rnd["actions"] and self._rounds.get(group) is rnd:
+                        self._rounds.pop(group, None)  # 无人剩下：丢弃本批次，下一个到达者重新计时
+                    self._gcond.notify_all()
+                    return {"ok": False, "mode": "stopped", "sent": None, "done": None, "written": False,
+                            "batch": None}
+                waiting = set(self._members.get(group, ())) - set(rnd["actions"])
+                expired = time.perf_counter() - rnd["t0"] >= window
+                if not waiting or expired:
+                    rnd["closed"] = True
+                    leader = True
+                    break
+                self._gcond.wait(min(0.02, max(0.001, window - (time.perf_counter() - rnd["t0"]))))
+            batch_actions = dict(rnd["actions"]) if leader else None
+        if leader:
+            try:
+                batch = self.broadcast(list(batch_actions), batch_actions, timeout=timeout)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"[同步输入] {group} 广播失败：{e}")
+                batch = {"ok": False, "results": {}, "send_skew": skew_stats({}), "done_skew": skew_stats({})}
+            with self._gcond:
+                rnd["result"] = batch
+                self._gcond.notify_all()
+        with self._gcond:
+            while rnd["result"] is None:
+                self._gcond.wait(0.05)
+            batch = rnd["result"]
+        return dict(batch["results"].get(serial, {"ok": False}), batch=batch)
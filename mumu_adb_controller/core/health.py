@@ -0,0 +1,178 @@
+# mumu_adb_controller/core/health.py
+"""
+设备健康度（全进程共享，数据来自 AdbClient 的每次调用）：
+- 每台设备滚动记录最近 WINDOW 次截图耗时、输入命令耗时与调用成败；
+- 分级：
+    unresponsive：熔断中（连续超时，见 core/breaker.py），或最近失败率 >= FAIL_UNRESPONSIVE；
+    degraded    ：截图/输入耗时中位数超过 CAPTURE_SLOW / INPUT_SLOW，或失败率 >= FAIL_DEGRADED；
+    healthy     ：其余（样本不足 MIN_SAMPLES 时按 healthy）；
+  从 degraded 恢复需低于阈值的 RECOVER_RATIO 倍，避免在阈值附近来回切换；
+- 状态变化时通知订阅者 fn(serial, state, snapshot)：截图轮询节奏（pacing）对降级设备放慢、
+  UI 设备列表显示标记，掉线监控等可据此提前处理。
+"""
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+
+HEALTHY = "healthy"
+DEGRADED = "degraded"
+UNRESPONSIVE = "unresponsive"
+
+WINDOW = 30
+MIN_SAMPLES = 5
+CAPTURE_SLOW = 1.5       # 截图耗时中位数（秒）
+INPUT_SLOW = 0.8         # 输入命令耗时中位数（秒）
+FAIL_DEGRADED = 0.2
+FAIL_UNRESPONSIVE = 0.6
+RECOVER_RATIO = 0.8
+
+Listener = Callable[[str, str, dict], None]
+
+
+def _median(xs) -> float:
+    s = sorted(xs)
+    if not s:
+        return 0.0
+    n = len(s)
+    return s[n // 2] if n % 2 else (s[n // 2 - 1] + s[n // 2]) / 2.0
+
+
+class DeviceHealth:
+    """单台设备的滚动统计与当前分级。"""
+
+    def __init__(self, serial: str):
+        self.serial = serial
+        self.capture: Deque[float] = deque(maxlen=WINDOW)
+        self.input: Deque[float] = deque(maxlen=WINDOW)
+        self.outcomes: Deque[bool] = deque(maxlen=WINDOW)
+        self.breaker_open = False
+        self.state = HEALTHY
+        self.since = time.time()
+        self.last_seen = 0.0
+
+    def record(self, kind: str, latency: float, ok: bool) -> None:
+        if ok:
+            if kind == "capture":
+                self.capture.append(latency)
+            elif kind == "input":
+                self.input.append(latency)
+            self.last_seen = time.time()
+        self.outcomes.append(bool(ok))
+
+    def fail_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return 1.0 - sum(self.outcomes) / float(len(self.outcomes))
+
+    def classify(self) -> str:
+        if self.breaker_open:
+            return UNRESPONSIVE
+        fail = self.fail_rate() if len(self.outcomes) >= MIN_SAMPLES else 0.0
+        if fail >= FAIL_UNRESPONSIVE:
+            return UNRESPONSIVE
+        # 已降级的设备需明显好转才恢复
+        k = RECOVER_RATIO if self.state != HEALTHY else 1.0
+        slow = ((len(self.capture) >= MIN_SAMPLES and _median(self.capture) > CAPTURE_SLOW * k)
+                or (len(self.input) >= MIN_SAMPLES and _median(self.input) > INPUT_SLOW * k))
+        if slow or fail >= FAIL_DEGRADED * k:
+            return DEGRADED
+        return HEALTHY
+
+    def snapshot(self) -> dict:
+        return {
+            "state": self.state,
+            "since": self.since,
+            "capture_ms": _median(self.capture) * 1000.0,
+            "input_ms": _median(self.input) * 1000.0,
+            "fail_rate": self.fail_rate(),
+            "samples": len(self.outcomes),
+            "breaker_open": self.breaker_open,
+            "last_seen": self.last_seen,
+        }
+
+
+class HealthMonitor:
+    def __init__(self):
+        self._items: Dict[str, DeviceHealth] = {}
+        self._listeners: List[Listener] = []
+        self._lock = threading.Lock()
+
+    def _get(self, serial: str) -> DeviceHealth:
+        h = self._items.get(serial)
+        if h is None:
+            h = DeviceHealth(serial)
+            self._items[serial] = h
+        return h
+
+    def record(self, serial: str, kind: str, latency: float, ok: bool) -> None:
+        """登记一次 adb 调用：kind 为 "capture" / "input" / "other"。"""
+        with self._lock:
+            h = self._get(serial)
+            h.record(kind, latency, ok)
+            changed = self._update(h)
+        if changed:
+            self._notify(h)
+
+    def set_breaker(self, serial: str, opened: bool) -> None:
+        with self._lock:
+            h = self._get(serial)
+            h.breaker_open = bool(opened)
+            if not opened:
+                h.outcomes.clear()  # 恢复后重新统计失败率
+            changed = self._update(h)
+        if changed:
+            self._notify(h)
+
+    def _update(self, h: DeviceHealth) -> bool:
+        state = h.classify()
+        if state == h.state:
+            return False
+        h.state = state
+        h.since = time.time()
+        return True
+
+    def state(self, serial: str) -> str:
+        h = self._items.get(serial)
+        return h.state if h is not None else HEALTHY
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            return {s: h.snapshot() for s, h in self._items.items()}
+
+    def forget(self, serial: str) -> None:
+        with self._lock:
+            self._items.pop(serial, None)
+
+    def subscribe(self, fn: Listener) -> None:
+        with self._lock:
+            if fn not in self._listeners:
+                self._listeners.append(fn)
+
+    def unsubscribe(self, fn: Listener) -> None:
+        with self._lock:
+            if fn in self._listeners:
+                self._listeners.remove(fn)
+
+    def _notify(self, h: DeviceHealth) -> None:
+        with self._lock:
+            listeners = list(self._listeners)
+            snap = h.snapshot()
+        for fn in listeners:
+            try:
+                fn(h.serial, snap["state"], snap)
+            except Exception:
+                pass
+
+
+_monitor: Optional[HealthMonitor] = None
+_mon_lock = threading.Lock()
+
+
+def monitor() -> HealthMonitor:
+    global _monitor
+    if _monitor is None:
+        with _mon_lock:
+            if _monitor is None:
+                _monitor = HealthMonitor()
+    return _monitor
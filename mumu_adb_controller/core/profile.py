@@ -0,0 +1,76 @@
+# mumu_adb_controller/core/profile.py
+"""
+设备分辨率档案与逻辑坐标变换：
+- 任务按 720x1280（竖屏）逻辑坐标编写；DeviceProfile 记录设备实际分辨率与 DPI
+  （wm size / wm density，有 Override 时以其为准），每个 serial 只探测一次；
+- 开启归一化后（AdbClient.set_normalize(True)）：截图在截取时缩放到逻辑尺寸，
+  点击/滑动坐标从逻辑坐标映射回物理坐标，任务与模板匹配只面对 720x1280 一种尺寸；
+- 设备本身就是逻辑尺寸时为恒等变换，不做任何额外处理。
+横屏设备的逻辑尺寸为 1280x720。
+"""
+import re
+from typing import Optional, Sequence, Tuple
+
+LOGICAL = (720, 1280)  # (w, h)，与 regions.BASE_SIZE 一致
+
+
+def parse_wm_size(out: str) -> Optional[Tuple[int, int]]:
+    """解析 `wm size` 输出（取最后一个尺寸，即 Override size 优先）。"""
+    sizes = re.findall(r"(\d+)x(\d+)", out or "")
+    if not sizes:
+        return None
+    w, h = (int(v) for v in sizes[-1])
+    return (w, h) if w > 0 and h > 0 else None
+
+
+def parse_wm_density(out: str) -> Optional[int]:
+    """解析 `wm density` 输出（Override density 优先）。"""
+    vals = re.findall(r"density:\s*(\d+)", out or "")
+    return int(vals[-1]) if vals else None
+
+
+class DeviceProfile:
+    """单台设备的分辨率/DPI 及逻辑 <-> 物理坐标换算。"""
+    __slots__ = ("serial", "width", "height", "density", "logical", "sx", "sy")
+
+    def __init__(self, serial: str, width: int, height: int, density: Optional[int] = None):
+        self.serial = serial
+        self.width = int(width)
+        self.height = int(height)
+        self.density = density
+        lw, lh = LOGICAL
+        self.logical = (lw, lh) if self.height >= self.width else (lh, lw)
+        self.sx = self.width / float(self.logical[0])
+        self.sy = self.height / float(self.logical[1])
+
+    @property
+    def identity(self) -> bool:
+        return (self.width, self.height) == self.logical
+
+    def to_physical(self, x: float, y: float) -> Tuple[int, int]:
+        if self.identity:
+            return int(x), int(y)
+        px = int(round(x * self.sx))
+        py = int(round(y * self.sy))
+        return max(0, min(self.width - 1, px)), max(0, min(self.height - 1, py))
+
+    def map_actions(self, actions: Sequence[tuple]) -> list:
+        """fleet 动作序列中的 tap/swipe 坐标换算为物理坐标（其余动作原样）。"""
+        if self.identity:
+            return list(actions)
+        out = []
+        for act in actions:
+            kind = str(act[0]).lower()
+            if kind == "tap":
+                out.append(("tap",) + self.to_physical(act[1], act[2]))
+            elif kind == "swipe":
+                x1, y1 = self.to_physical(act[1], act[2])
+                x2, y2 = self.to_physical(act[3], act[4])
+                out.append(("swipe", x1, y1, x2, y2) + tuple(act[5:]))
+            else:
+                out.append(act)
+        return out
+
+    def as_dict(self) -> dict:
+        return {"serial": self.serial, "size": (self.width, self.height), "density": self.density,
+                "logical": self.logical, "identity": self.identity}
@@ -3,30 +3,59 @@
 按用户指定逻辑实现简洁快速的智能选兵功能
 """
 
+from __future__ import annotations
+
 import os
 import time
-try:
-    import cv2  # type: ignore
-    _CV2_IMPORT_ERROR = None
-except Exception as exc:  # pragma: no cover - optional dependency
-    cv2 = None  # type: ignore[assignment]
-    _CV2_IMPORT_ERROR = exc
-
-import numpy as np
-try:
-    import pytesseract  # type: ignore
-    _PYTESSERACT_IMPORT_ERROR = None
-except Exception as exc:  # pragma: no cover - optional dependency
-    pytesseract = None  # type: ignore[assignment]
-    _PYTESSERACT_IMPORT_ERROR = exc
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, TYPE_CHECKING
 from ..ui.helpers import matcher
 
+if TYPE_CHECKING:  # pragma: no cover
+    import numpy
+
+# 可选依赖延迟导入：首次使用时才加载，避免模块导入即拉起 OpenCV/Tesseract
+cv2 = None  # type: ignore[assignment]
+np = None  # type: ignore[assignment]
+pytesseract = None  # type: ignore[assignment]
+_CV2_IMPORT_ERROR: Optional[BaseException] = None
+_PYTESSERACT_IMPORT_ERROR: Optional[BaseException] = None
+_PYTESSERACT_TRIED = False
+
+
+def _ensure_cv() -> bool:
+    """导入 cv2/numpy（优先复用 matcher 的延迟加载结果），返回是否可用。"""
+    global cv2, np, _CV2_IMPORT_ERROR
+    if cv2 is not None:
+        return True
+    if matcher.has_cv():
+        cv2, np = matcher.cv2, matcher.np
+        return True
+    try:
+        import cv2 as _cv2  # type: ignore
+        import numpy as _np
+        cv2, np = _cv2, _np
+        return True
+    except Exception as exc:  # pragma: no cover - optional dependency
+        _CV2_IMPORT_ERROR = exc
+        return False
+
+
+def _ensure_pytesseract() -> bool:
+    global pytesseract, _PYTESSERACT_IMPORT_ERROR, _PYTESSERACT_TRIED
+    if not _PYTESSERACT_TRIED:
+        _PYTESSERACT_TRIED = True
+        try:
+            import pytesseract as _pt  # type: ignore
+            pytesseract = _pt
+        except Exception as exc:  # pragma: no cover - optional dependency
+            _PYTESSERACT_IMPORT_ERROR = exc
+    return pytesseract is not None
+
 
 class NewTroopSelector:
     """新版智能选兵选择器 - 调试版本"""
     # 静态模板缓存，降低启动开销
-    _TEMPLATE_CACHE: Dict[str, np.ndarray] = {}
+    _TEMPLATE_CACHE: Dict[str, numpy.ndarray] = {}
 
     def __init__(self, device_worker, device_log):
         self.device_worker = device_worker
@@ -124,7 +153,7 @@ class NewTroopSelector:
             self.log(f"❌ 模板加载异常: {e}")
             return False
 
-    def get_screenshot(self) -> Optional[np.ndarray]:
+    def get_screenshot(self) -> Optional[numpy.ndarray]:
         """获取当前屏幕截图"""
         try:
             ok, data = self.device_worker.adb.screencap(self.device_worker.serial)
@@ -184,7 +213,7 @@ class NewTroopSelector:
         self.log("🔍 开始获取容量文字...")
         
         try:
-            if pytesseract is None:
+            if not _ensure_pytesseract():
                 detail = f"，导入异常：{_PYTESSERACT_IMPORT_ERROR}" if _PYTESSERACT_IMPORT_ERROR else ""
                 self.log(f"⚠️ 缺少 pytesseract 依赖，容量 OCR 被跳过{detail}", force=True)
                 return ""
@@ -477,7 +506,7 @@ def run_new_troop_selection(device_worker, device_log):
     Returns:
         bool: 是否成功完成
     """
-    if cv2 is None:
+    if not _ensure_cv():
         base_msg = '\u7f3a\u5c11 opencv-python \u4f9d\u8d56\uff0c\u5df2\u8df3\u8fc7\u667a\u80fd\u9009\u5175\u4efb\u52a1\u3002\u8bf7\u5148\u6267\u884c\uff1apip install opencv-python'
         detail = f'\uff08\u5bfc\u5165\u5f02\u5e38\uff1a{_CV2_IMPORT_ERROR}\uff09' if _CV2_IMPORT_ERROR else ''
         message = f"{base_msg}{detail}"
@@ -1074,8 +1074,17 @@ class App(tk.Tk):
             self.cfg["layout"]["split_left"] = int(left_width)
             self.cfg["geometry"] = self.geometry()
             self.config_mgr.save(self.cfg)
-            self.thumb_grid.cancel_timer()
+            self.thumb_grid.close()
         finally:
+            try:
+                from .helpers import fleet_sync
+                fleet_sync.shutdown(self)
+            except Exception:
+                pass
+            try:
+                self.config_mgr.close()
+            except Exception:
+                pass
             self.destroy()
 
 
@@ -1,6 +1,8 @@
 THUMB_W = 135
 THUMB_H = 240
 THUMB_REFRESH_MS = 10_000
+THUMB_REUSE_SEC = 3.0       # 任务在此秒数内截过图则直接复用，不再单独截图
+THUMB_WORKERS = 3           # 缩略图截图 + 解码缩放的并发上限（避免占满 adb）
 LEFT_DEFAULT_WIDTH = 200
 PREVIEW_MAX_W = 540
 PREVIEW_MAX_H = 960
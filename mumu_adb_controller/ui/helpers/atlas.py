@@ -0,0 +1,285 @@
+# mumu_adb_controller/ui/helpers/atlas.py
+"""
+模板图集：同一搜索区域内常一起匹配的一组模板（出征按钮、伤兵入口等）
+预先堆叠为一个图集，一帧只做一次区域 DFT，组内各模板共享该频谱：
+    分子_i = IDFT(区域频谱 × conj(模板_i 频谱))，分母由 Frame 积分图给出，
+与 matcher.correlate 的 TM_CCOEFF_NORMED 等价。
+
+离线步骤（模板更新后执行一次，结果写到 pic/atlas/<组名>.npz）：
+    python -m mumu_adb_controller.ui.helpers.atlas [pic目录]
+运行时 npz 缺失或与模板文件 mtime 不一致时，在内存中现场构建，结果相同。
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from . import colorfilter, matcher, regions
+
+# ---------- 冻结安全的资源定位 ----------
+try:
+    from ...common.pathutil import res_path
+except Exception:
+    def _app_base_dir():
+        if getattr(sys, "frozen", False) and hasattr(sys, "_MEIPASS"):
+            return sys._MEIPASS
+        return os.path.dirname(os.path.abspath(sys.argv[0]))
+    def res_path(*parts: str):
+        return os.path.join(_app_base_dir(), *parts)
+
+# 组名 -> 模板文件名（顺序即任务里的优先顺序）
+GROUPS: Dict[str, Tuple[str, ...]] = {
+    "chuzheng": ("chuzheng_red.png", "chuzheng_red2.png", "chuzheng_blue_2.png"),
+    "shangbing": ("shangbing_1.png", "shangbing_2.png", "shangbing_3.png"),
+}
+
+_SPEC_SHAPES_MAX = 3  # 每个图集缓存的频谱尺寸数（整帧一份约 3.7MB/模板）
+_LOCK = threading.Lock()
+_ATLASES: Dict[Tuple[str, ...], "Atlas"] = {}
+
+
+def atlas_dir() -> str:
+    return res_path("pic", "atlas")
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return -1.0
+
+
+def group_for(paths: Sequence[str]) -> Optional[str]:
+    """包含这些模板（按文件名）的登记组名；未登记返回 None。"""
+    key = {os.path.basename(p).lower() for p in paths}
+    for name, files in GROUPS.items():
+        if key <= {f.lower() for f in files}:
+            return name
+    return None
+
+
+class Atlas:
+    """
+    堆叠的零均值模板：stack[i, :h_i, :w_i] 为第 i 个模板 t - mean(t)，其余补零；
+    sizes[i] = (h_i, w_i)，norms[i] = ||t_i - mean||。
+    """
+
+    def __init__(self, paths: Sequence[str], stack, sizes, norms, mtimes):
+        self.paths = list(paths)
+        self.stack = stack
+        self.sizes = [(int(h), int(w)) for h, w in sizes]
+        self.norms = [float(n) for n in norms]
+        self.mtimes = [float(m) for m in mtimes]
+        self._specs: "OrderedDict[Tuple[int, int], list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.paths)
+
+    @classmethod
+    def build(cls, paths: Sequence[str]) -> Optional["Atlas"]:
+        """读模板并堆叠；任一模板不可用返回 None。"""
+        np = matcher.np
+        tpls = []
+        for p in paths:
+            t = matcher.get_template(p)
+            if t is None:
+                return None
+            tpls.append(t)
+        hm = max(t.h for t in tpls)
+        wm = max(t.w for t in tpls)
+        stack = np.zeros((len(tpls), hm, wm), dtype=np.float32)
+        for i, t in enumerate(tpls):
+            stack[i, :t.h, :t.w] = t.zm
+        return cls(paths, stack, [(t.h, t.w) for t in tpls], [t.norm for t in tpls],
+                   [_mtime(p) for p in paths])
+
+    def subset(self, paths: Sequence[str]) -> "Atlas":
+        """按文件名取出其中几个模板组成新图集（顺序同 paths）。"""
+        index = {os.path.basename(p).lower(): i for i, p in enumerate(self.paths)}
+        idx = [index[os.path.basename(p).lower()] for p in paths]
+        return Atlas(paths, self.stack[idx], [self.sizes[i] for i in idx], [self.norms[i] for i in idx],
+                     [self.mtimes[i] for i in idx])
+
+    def fresh(self) -> bool:
+        return all(_mtime(p) == m for p, m in zip(self.paths, self.mtimes))
+
+    def save(self, path: str) -> None:
+        np = matcher.np
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, stack=self.stack, sizes=np.array(self.sizes, dtype=np.int32),
+                 norms=np.array(self.norms, dtype=np.float64), mtimes=np.array(self.mtimes, dtype=np.float64),
+                 names=np.array([os.path.basename(p) for p in self.paths]))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, paths: Sequence[str]) -> Optional["Atlas"]:
+        """读离线图集；文件名顺序不符或模板已更新（mtime 变化）返回 None。"""
+        np = matcher.np
+        try:
+            with np.load(path) as z:
+                names = [str(n) for n in z["names"]]
+                if [n.lower() for n in names] != [os.path.basename(p).lower() for p in paths]:
+                    return None
+                at = cls(paths, z["stack"].astype(np.float32), z["sizes"], z["norms"], z["mtimes"])
+        except Exception:
+            return None
+        return at if at.fresh() else None
+
+    def spectra(self, shape: Tuple[int, int]) -> list:
+        """各模板补零到 shape 的 DFT（CCS 格式），按尺寸 LRU 缓存。"""
+        cv2, np = matcher.cv2, matcher.np
+        with self._lock:
+            specs = self._specs.get(shape)
+            if specs is not None:
+                self._specs.move_to_end(shape)
+                return specs
+        specs = []
+        for i, (h, w) in enumerate(self.sizes):
+            pad = np.zeros(shape, dtype=np.float32)
+            pad[:h, :w] = self.stack[i, :h, :w]
+            specs.append(cv2.dft(pad))
+        with self._lock:
+            self._specs[shape] = specs
+            while len(self._specs) > _SPEC_SHAPES_MAX:
+                self._specs.popitem(last=False)
+        return specs
+
+    def search(self, frame: "matcher.Frame", roi: Optional[regions.Region] = None) -> List[Tuple[float, Tuple[int, int]]]:
+        """
+        一次区域 DFT 算出组内全部模板的最佳匹配：返回 [(score, (x, y))]，顺序同 paths，
+        坐标为模板中心（整帧坐标）；模板放不下或被颜色预筛排除时 score=0。
+        """
+        cv2, np = matcher.cv2, matcher.np
+        H, W = frame.shape
+        if roi is None:
+            x1, y1, x2, y2 = 0, 0, W, H
+            shape, fspec = frame.spectrum()  # 整帧频谱与 matcher 的 fft 路径共享
+        else:
+            (x1, y1), (x2, y2) = regions.clip(roi, (W, H))
+            if x2 <= x1 or y2 <= y1:
+                return [(0.0, (0, 0))] * len(self)
+            sub = frame.f32()[y1:y2, x1:x2]
+            shape = (cv2.getOptimalDFTSize(y2 - y1), cv2.getOptimalDFTSize(x2 - x1))
+            pad = np.zeros(shape, dtype=np.float32)
+            pad[:y2 - y1, :x2 - x1] = sub
+            fspec = cv2.dft(pad)
+        rh, rw = y2 - y1, x2 - x1
+        out = []
+        for path, (h, w), norm, tspec in zip(self.paths, self.sizes, self.norms, self.spectra(shape)):
+            if h > rh or w > rw or norm <= 0:
+                out.append((0.0, (0, 0)))
+                continue
+            reject, keep = colorfilter.gate(frame, path, h, w, x1, y1, x2, y2)
+            if reject:
+                out.append((0.0, (0, 0)))
+                continue
+            prod = cv2.mulSpectrums(fspec, tspec, 0, conjB=True)
+            full = cv2.idft(prod, flags=cv2.DFT_SCALE | cv2.DFT_REAL_OUTPUT)
+            num = full[:rh - h + 1, :rw - w + 1]
+            std = frame.window_std(h, w, x1, y1, x2, y2)
+            std *= norm
+            res = np.zeros(num.shape, dtype=np.float32)
+            np.divide(num, std, out=res, where=std > 1e-3 * norm * float(np.sqrt(h * w)))
+            if keep is not None:
+                res[~keep] = 0.0
+            _, max_val, _, (rx, ry) = cv2.minMaxLoc(res)
+            out.append((min(1.0, float(max_val)), (int(x1 + rx + w // 2), int(y1 + ry + h // 2))))
+        return out
+
+
+def get(paths: Sequence[str]) -> Optional[Atlas]:
+    """取模板组的图集（内存缓存 → 离线 npz → 现场构建）；OpenCV 或模板不可用返回 None。"""
+    if not matcher.has_cv():
+        return None
+    key = tuple(paths)
+    at = _ATLASES.get(key)
+    if at is not None and at.fresh():
+        return at
+    at = None
+    name = group_for(paths)
+    if name is not None:
+        base = os.path.dirname(paths[0])
+        full = [os.path.join(base, f) for f in GROUPS[name]]
+        at = Atlas.load(os.path.join(atlas_dir(), name + ".npz"), full)
+        if at is not None and len(full) != len(paths):
+            at = at.subset(paths)
+    if at is None:
+        at = Atlas.build(paths)
+    if at is not None:
+        with _LOCK:
+            _ATLASES[key] = at
+    return at
+
+
+def match_group(screen: Union[bytes, "matcher.Frame"], paths: Sequence[str],
+                threshold: Union[float, Sequence[float]] = matcher.THRESH, roi=regions.AUTO):
+    """
+    一帧匹配一组模板，返回 {path: (found, (x,y), score)}（与 matcher.match_many 相同格式）。
+    threshold 可为每个模板单独给出（与 paths 等长）；roi 为 AUTO 时取第一个模板的绑定区域。
+    图集只按原尺寸（1.0）匹配：该设备首选尺度不是 1.0 的模板直接走多尺度 matcher.match_frame，
+    图集未命中的模板也用 match_frame 补搜（使用并学习设备尺度，补搜按 RESWEEP_SEC 节流）；
+    图集不可用（缺模板等）时逐个回退到 matcher.match_frame。
+    """
+    paths = list(paths)
+    thrs = list(threshold) if isinstance(threshold, (list, tuple)) else [float(threshold)] * len(paths)
+    color = any(colorfilter.enabled(p) for p in paths)
+    frame = screen if isinstance(screen, matcher.Frame) else matcher.Frame.from_png(screen, color=color)
+    if frame is None:
+        return {p: (False, (0, 0), 0.0) for p in paths}
+    H, W = frame.shape
+    region = regions.resolve(roi, paths[0], (W, H)) if paths else None
+    out = {}
+    try:
+        if all(matcher.preferred_scale(frame.shape, p) == 1.0 for p in paths):
+            at = get(paths)
+            if at is not None:
+                for p, thr, (score, pos) in zip(paths, thrs, at.search(frame, region)):
+                    if score >= thr or not matcher.multi_scale():
+                        out[p] = (score >= thr, pos, score)
+    except Exception:
+        out = {}
+    for p, thr in zip(paths, thrs):
+        if p not in out:
+            out[p] = matcher.match_frame(frame, p, threshold=thr, roi=region)
+    return {p: out[p] for p in paths}
+
+
+def first_hit(screen: Union[bytes, "matcher.Frame"], paths: Sequence[str],
+              threshold: Union[float, Sequence[float]] = matcher.THRESH, roi=regions.AUTO):
+    """按 paths 顺序返回第一个命中的 (path, (x,y), score)；均未命中返回 (None, (0,0), 最高分)。"""
+    res = match_group(screen, paths, threshold=threshold, roi=roi)
+    for p in paths:
+        ok, pos, score = res[p]
+        if ok:
+            return p, pos, score
+    return None, (0, 0), max((r[2] for r in res.values()), default=0.0)
+
+
+def build_all(pic_dir: Optional[str] = None, log=print) -> int:
+    """离线构建 GROUPS 中全部图集到 <pic_dir>/atlas，返回成功数。"""
+    if not matcher.has_cv():
+        log("[图集] 未安装 OpenCV，跳过")
+        return 0
+    pic_dir = pic_dir or res_path("pic")
+    out_dir = os.path.join(pic_dir, "atlas")
+    done = 0
+    for name, files in GROUPS.items():
+        paths = [os.path.join(pic_dir, f) for f in files]
+        at = Atlas.build(paths)
+        if at is None:
+            log(f"[图集] {name}: 模板缺失，跳过")
+            continue
+        dst = os.path.join(out_dir, name + ".npz")
+        at.save(dst)
+        log(f"[图集] {name}: {len(at)} 个模板 {at.sizes} -> {dst}")
+        done += 1
+    return done
+
+
+if __name__ == "__main__":
+    # -m 运行时 sys.argv[0] 指向本文件，默认改用仓库根目录下的 pic/
+    _root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    build_all(sys.argv[1] if len(sys.argv) > 1 else os.path.join(_root, "pic"))
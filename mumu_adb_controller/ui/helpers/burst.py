@@ -0,0 +1,42 @@
+# mumu_adb_controller/ui/helpers/burst.py
+"""
+任务侧高频连点：封装 AdbClient.tap_burst（设备端循环点击），并与任务的暂停/停止语义对齐：
+- 暂停期间挂起点击，暂停时间计入总时长（与原来逐次 input tap + _sleep_pause 的循环一致）；
+- should_stop() 为 True 时立即中断设备端循环。
+"""
+import time
+from typing import Callable, Optional
+
+
+def tap_for(app, serial: str, x: int, y: int, rate_hz: float, duration_s: float,
+            should_stop: Optional[Callable[[], bool]] = None) -> dict:
+    """
+    在 duration_s 秒内以 rate_hz 频率点击 (x, y)。
+    返回 {"taps", "elapsed", "rate", "target_rate", "mode", "stopped"}（多段连点时累计）。
+    """
+    stop = should_stop or (lambda: False)
+    pause_ev = getattr(app, "pause_event", None)
+
+    def paused() -> bool:
+        return pause_ev is not None and pause_ev.is_set()
+
+    total = {"taps": 0, "elapsed": 0.0, "rate": 0.0, "target_rate": float(rate_hz),
+             "mode": "", "stopped": False}
+    end = time.time() + max(0.0, float(duration_s))
+    while not stop():
+        while paused() and not stop() and time.time() < end:
+            time.sleep(0.05)
+        remain = end - time.time()
+        if remain <= 0 or stop():
+            break
+        r = app.adb.tap_burst(serial, x, y, rate_hz=rate_hz, duration_s=remain,
+                              should_stop=lambda: stop() or paused())
+        total["taps"] += int(r.get("taps", 0))
+        total["elapsed"] += float(r.get("elapsed", 0.0))
+        total["mode"] = r.get("mode", total["mode"])
+        if not paused():
+            break
+    total["stopped"] = bool(stop())
+    if total["elapsed"] > 0:
+        total["rate"] = total["taps"] / total["elapsed"]
+    return total
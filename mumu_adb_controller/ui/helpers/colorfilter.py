@@ -0,0 +1,152 @@
+# mumu_adb_controller/ui/helpers/colorfilter.py
+"""
+颜色预筛（可选，按模板登记）：
+- 模板颜色特征：HSV 中饱和度/亮度足够的像素按色相分 18 档，取覆盖 80% 的主色档（再向两侧各扩 1 档
+  容忍光照），记录主色像素占模板面积的比例 frac；主色比例过低（灰白图标）的模板不做颜色处理；
+- 预筛：在搜索区域里统计每个模板大小窗口内的主色像素比例（积分图 O(1)），
+  没有任何窗口达到 MIN_RATIO × frac 时直接判定未命中，不再做相关运算；
+- 颜色感知得分：相关系数图中主色比例不足的窗口得分置 0，
+  红/蓝出征按钮在灰度下形状相近，不会再互相误命中。
+
+matcher.match_frame / match_one_detail 与 atlas.match_group 对登记的模板自动启用，
+帧需按彩色解码（Frame.from_png(png, color=True)）。
+"""
+import os
+import threading
+from typing import Dict, Optional, Set
+
+from . import matcher
+
+HUE_BINS = 18          # OpenCV 色相 0..179，每档 10
+S_MIN = 80
+V_MIN = 60
+COVER = 0.8            # 主色档累计覆盖比例
+MIN_FRAC = 0.15        # 模板主色像素占比低于此值时不做颜色处理
+MIN_RATIO = 0.5        # 窗口主色比例 >= MIN_RATIO × 模板主色比例 才参与得分
+
+# 默认启用颜色处理的模板（文件名小写）
+_ENABLED: Set[str] = {
+    "chuzheng_red.png",
+    "chuzheng_red2.png",
+    "chuzheng_blue.png",
+    "chuzheng_blue_2.png",
+}
+_LOCK = threading.Lock()
+_PROFILES: Dict[str, tuple] = {}  # path -> (mtime, ColorProfile|None)
+
+
+def enable(template: str, on: bool = True) -> None:
+    """为模板（文件名或路径）开启/关闭颜色预筛。"""
+    name = os.path.basename(template).lower()
+    with _LOCK:
+        if on:
+            _ENABLED.add(name)
+        else:
+            _ENABLED.discard(name)
+
+
+def enabled(tpl_path: str) -> bool:
+    return os.path.basename(tpl_path).lower() in _ENABLED
+
+
+class ColorProfile:
+    """模板的主色档与主色像素占比。"""
+    __slots__ = ("bins", "frac", "lut")
+
+    def __init__(self, bins, frac: float):
+        np = matcher.np
+        self.bins = sorted(bins)
+        self.frac = float(frac)
+        lut = np.zeros(256, dtype=np.uint8)
+        for b in self.bins:
+            lut[b * 10:(b + 1) * 10] = 1
+        self.lut = lut
+
+    @classmethod
+    def from_bgr(cls, bgr) -> Optional["ColorProfile"]:
+        cv2, np = matcher.cv2, matcher.np
+        hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV)
+        chroma = (hsv[..., 1] >= S_MIN) & (hsv[..., 2] >= V_MIN)
+        total = int(chroma.sum())
+        if total == 0:
+            return None
+        hist = np.bincount((hsv[..., 0][chroma] // 10).ravel(), minlength=HUE_BINS)[:HUE_BINS]
+        order = hist.argsort()[::-1]
+        bins, acc = set(), 0
+        for b in order:
+            bins.add(int(b))
+            acc += int(hist[b])
+            if acc >= COVER * total:
+                break
+        for b in list(bins):
+            bins.add((b - 1) % HUE_BINS)
+            bins.add((b + 1) % HUE_BINS)
+        prof = cls(bins, 0.0)
+        frac = float(prof.mask(hsv).mean())
+        if frac < MIN_FRAC:
+            return None
+        prof.frac = frac
+        return prof
+
+    def mask(self, hsv):
+        """主色像素掩码（uint8 0/1）。"""
+        cv2, np = matcher.cv2, matcher.np
+        h, s, v = cv2.split(hsv)
+        m = cv2.LUT(h, self.lut)
+        m &= (s >= S_MIN).astype(np.uint8)
+        m &= (v >= V_MIN).astype(np.uint8)
+        return m
+
+
+def profile(tpl_path: str) -> Optional[ColorProfile]:
+    """模板颜色特征（按 mtime 缓存）；未启用、无 OpenCV 或主色不明显返回 None。"""
+    if not enabled(tpl_path) or not matcher.has_cv():
+        return None
+    try:
+        mtime = os.path.getmtime(tpl_path)
+    except OSError:
+        return None
+    hit = _PROFILES.get(tpl_path)
+    if hit is not None and hit[0] == mtime:
+        return hit[1]
+    bgr = matcher.cv2.imread(tpl_path, matcher.cv2.IMREAD_COLOR)
+    prof = ColorProfile.from_bgr(bgr) if bgr is not None else None
+    with _LOCK:
+        _PROFILES[tpl_path] = (mtime, prof)
+    return prof
+
+
+def window_ratio(frame: "matcher.Frame", prof: ColorProfile, h: int, w: int,
+                 x1: int, y1: int, x2: int, y2: int):
+    """
+    区域 [x1,x2)×[y1,y2) 内每个 h×w 窗口的主色像素比例，形状与相关系数图一致；
+    帧不含彩色数据时返回 None。
+    """
+    cv2, np = matcher.cv2, matcher.np
+    hsv = frame.hsv()
+    if hsv is None:
+        return None
+    m = prof.mask(hsv[y1:y2, x1:x2])
+    S = cv2.integral(m, sdepth=cv2.CV_32S)
+    rh, rw = y2 - y1, x2 - x1
+    if h > rh or w > rw:
+        return None
+    ye, xe = rh - h + 1, rw - w + 1
+    cnt = S[h:h + ye, w:w + xe] - S[0:ye, w:w + xe] - S[h:h + ye, 0:xe] + S[0:ye, 0:xe]
+    return cnt.astype(np.float32) * (1.0 / (h * w))
+
+
+def gate(frame: "matcher.Frame", tpl_path: str, h: int, w: int, x1: int, y1: int, x2: int, y2: int):
+    """
+    返回 (reject, keep)：
+    - reject=True：区域内没有窗口具备模板主色，调用方可跳过相关运算；
+    - keep：与相关系数图同形状的布尔掩码（主色比例足够的窗口），无需颜色处理时为 None。
+    """
+    prof = profile(tpl_path)
+    if prof is None:
+        return False, None
+    ratio = window_ratio(frame, prof, h, w, x1, y1, x2, y2)
+    if ratio is None:
+        return False, None
+    keep = ratio >= MIN_RATIO * prof.frac
+    return (not bool(keep.any())), keep
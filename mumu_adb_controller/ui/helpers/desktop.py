@@ -0,0 +1,162 @@
+# mumu_adb_controller/ui/helpers/desktop.py
+"""
+桌面区域找图（替代 pyautogui.locateCenterOnScreen）：
+- 每次轮询只截取目标窗口区域一次（优先 mss，其次 PIL.ImageGrab），所有候选模板共用这一帧；
+- 模板按 (路径, 缩放倍数) 缓存灰度图与预计算统计量（matcher.Template），
+  DPI 缩放只在首次使用或模板文件更新后做一次；
+- 相关计算与设备找图相同（matcher.correlate，TM_CCOEFF_NORMED 等价）。
+
+截图来源可替换：set_source(fn)，fn(region) 返回 BGR/灰度 ndarray，
+region 为 (left, top, width, height) 或 None（整屏），便于在非 Windows 环境用图片代替桌面。
+"""
+import os
+import time
+import threading
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from . import matcher
+
+Region = Tuple[int, int, int, int]  # (left, top, width, height)，与 pyautogui 一致
+
+_LOCK = threading.Lock()
+_source: Optional[Callable[[Optional[Region]], object]] = None
+_mss_tls = threading.local()  # 线程内复用的 mss 实例（mss 对象不可跨线程）
+_TPL: Dict[Tuple[str, float], tuple] = {}  # (path, scale) -> (mtime, Template)
+
+
+def set_source(fn: Optional[Callable[[Optional[Region]], object]]) -> None:
+    """替换截图来源；None 恢复为系统桌面截图。"""
+    global _source
+    _source = fn
+
+
+def _grab_mss(region: Optional[Region]):
+    try:
+        import mss  # type: ignore
+    except Exception:
+        return None
+    sct = getattr(_mss_tls, "sct", None)
+    if sct is None:
+        sct = mss.mss()
+        _mss_tls.sct = sct
+    if region is None:
+        mon = sct.monitors[0]
+    else:
+        left, top, w, h = region
+        mon = {"left": int(left), "top": int(top), "width": int(w), "height": int(h)}
+    shot = sct.grab(mon)
+    return matcher.np.asarray(shot)[..., :3]  # BGRA -> BGR
+
+
+def _grab_pil(region: Optional[Region]):
+    try:
+        from PIL import ImageGrab
+    except Exception:
+        return None
+    bbox = None
+    if region is not None:
+        left, top, w, h = region
+        bbox = (int(left), int(top), int(left + w), int(top + h))
+    try:
+        img = ImageGrab.grab(bbox=bbox, all_screens=True)
+    except TypeError:
+        img = ImageGrab.grab(bbox=bbox)
+    arr = matcher.np.asarray(img.convert("RGB"))
+    return arr[..., ::-1]
+
+
+def grab(region: Optional[Region] = None):
+    """截取桌面区域，返回灰度 ndarray；不可用返回 None。"""
+    if not matcher.has_cv():
+        return None
+    cv2 = matcher.cv2
+    img = None
+    try:
+        if _source is not None:
+            img = _source(region)
+        else:
+            img = _grab_mss(region)
+            if img is None:
+                img = _grab_pil(region)
+    except Exception:
+        img = None
+    if img is None:
+        return None
+    if img.ndim == 3:
+        img = cv2.cvtColor(matcher.np.ascontiguousarray(img), cv2.COLOR_BGR2GRAY)
+    return img
+
+
+def template(path: str, scale: float = 1.0):
+    """按 DPI 缩放后的模板（matcher.Template，带缓存）；文件缺失返回 None。"""
+    if not matcher.has_cv():
+        return None
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    key = (path, round(float(scale), 3))
+    hit = _TPL.get(key)
+    if hit is not None and hit[0] == mtime:
+        return hit[1]
+    gray = matcher.load_template(path)
+    if gray is None:
+        return None
+    if abs(scale - 1.0) > 0.01:
+        cv2 = matcher.cv2
+        h, w = gray.shape[:2]
+        size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+        gray = cv2.resize(gray, size, interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC)
+    tobj = matcher.Template(gray, path)
+    with _LOCK:
+        _TPL[key] = (mtime, tobj)
+    return tobj
+
+
+def find(gray, paths: Sequence[str], scale: float = 1.0, confidence: float = 0.8):
+    """
+    在一帧灰度图上按顺序找候选模板：返回 (path, (x, y), score)，坐标相对该帧；
+    都未达到 confidence 返回 (None, (0, 0), 最高分)。
+    """
+    frame = matcher.Frame(gray)
+    best = 0.0
+    for p in paths:
+        tpl = template(p, scale)
+        if tpl is None:
+            continue
+        res, _ = matcher.correlate(frame, tpl)
+        if res is None:
+            continue
+        _, max_val, _, (rx, ry) = matcher.cv2.minMaxLoc(res)
+        score = min(1.0, float(max_val))
+        if score >= confidence:
+            return p, (int(rx + tpl.w // 2), int(ry + tpl.h // 2)), score
+        best = max(best, score)
+    return None, (0, 0), best
+
+
+def locate(paths: Sequence[str], region: Optional[Region] = None, scale: float = 1.0,
+           confidence: float = 0.8, timeout: float = 4.0, interval: float = 0.05,
+           should_stop: Optional[Callable[[], bool]] = None):
+    """
+    轮询桌面区域直到任一候选出现：返回 (path, (x, y) 屏幕坐标, score)；
+    超时/停止/截图不可用返回 (None, (0, 0), 最高分)。
+    """
+    end = time.time() + max(0.0, timeout)
+    ox, oy = (int(region[0]), int(region[1])) if region else (0, 0)
+    best = 0.0
+    while True:
+        if should_stop and should_stop():
+            break
+        gray = grab(region)
+        if gray is None:
+            break
+        hit, (x, y), score = find(gray, paths, scale=scale, confidence=confidence)
+        if hit is not None:
+            return hit, (x + ox, y + oy), score
+        best = max(best, score)
+        remain = end - time.time()
+        if remain <= 0:
+            break
+        time.sleep(min(interval, remain))
+    return None, (0, 0), best
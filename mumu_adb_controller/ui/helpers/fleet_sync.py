@@ -0,0 +1,98 @@
+# mumu_adb_controller/ui/helpers/fleet_sync.py
+"""
+任务侧多设备同步点击（全局操作模式且配置 sync_departure=true 时生效）：
+- 任务启动时 enroll(app, group, serial)，结束时 leave()；
+- 走到需要“所有账号同时点”的一步（秒进集结出征）时调用 tap_together()，
+  打熊发车不走这里：各设备用 timing.run_at 各自对准同一发车时刻；
+  各设备线程在 group 内汇合，到齐或超过 window 秒后由 core.fleet 统一下发；
+- 汇合最多等待 window 秒，会拖慢先到的设备，因此只在明确要求同步出征时启用；
+  未启用 / 组内只有自己时退化为普通 input_tap，行为与原来一致。
+"""
+import threading
+from typing import Callable, Optional
+
+_lock = threading.Lock()
+
+
+def global_mode(app) -> bool:
+    """Qt 版读 cfg["global_mode"]，Tk 版读 is_global_multi_mode()。"""
+    try:
+        fn = getattr(app, "is_global_multi_mode", None)
+        if callable(fn):
+            return bool(fn())
+        return bool((getattr(app, "cfg", None) or {}).get("global_mode", False))
+    except Exception:
+        return False
+
+
+def sync_requested(app) -> bool:
+    """全局模式下且配置 sync_departure 为真时才同步出征。"""
+    if not global_mode(app):
+        return False
+    try:
+        return bool((getattr(app, "cfg", None) or {}).get("sync_departure", False))
+    except Exception:
+        return False
+
+
+def fleet(app):
+    """取（首次使用时创建）挂在 app 上的 FleetInput。"""
+    inst = getattr(app, "_fleet_input", None)
+    if inst is None:
+        with _lock:
+            inst = getattr(app, "_fleet_input", None)
+            if inst is None:
+                from ...core.fleet import FleetInput
+                inst = FleetInput(app.adb, getattr(app, "logger", None))
+                app._fleet_input = inst
+    return inst
+
+
+def shutdown(app) -> None:
+    """关闭所有同步输入会话（主窗口关闭时调用）。"""
+    inst = getattr(app, "_fleet_input", None)
+    if inst is not None:
+        try:
+            inst.close()
+        except Exception:
+            pass
+
+
+def enroll(app, group: str, serial: str) -> bool:
+    """要求同步出征时登记参与同步；返回是否已登记。"""
+    if not sync_requested(app):
+        return False
+    try:
+        fleet(app).enroll(group, serial)
+        return True
+    except Exception:
+        return False
+
+
+def leave(app, group: str, serial: str) -> None:
+    inst = getattr(app, "_fleet_input", None)
+    if inst is not None:
+        inst.leave(group, serial)
+
+
+def tap_together(app, group: str, serial: str, x: int, y: int,
+                 log: Optional[Callable[[str], None]] = None, window: float = 1.0,
+                 should_stop: Optional[Callable[[], bool]] = None) -> bool:
+    """在 group 内与其他设备同时点击 (x, y)；返回本设备是否点击成功。"""
+    inst = getattr(app, "_fleet_input", None)
+    members = inst.members(group) if inst is not None else []
+    if len(members) <= 1 or serial not in members:
+        app.adb.input_tap(serial, int(x), int(y))
+        return True
+    res = inst.gather(group, serial, [("tap", int(x), int(y))], window=window, should_stop=should_stop)
+    if res.get("mode") == "stopped":
+        return False
+    batch = res.get("batch") or {}
+    if log:
+        sk = batch.get("done_skew") or {}
+        log(f"[同步] {group}：{sk.get('n', 0)} 台同时点击，完成偏差 {sk.get('spread_ms', 0.0):.1f}ms"
+            f"（本机 {res.get('mode', '?')}，发送 +{(res.get('sent') or 0.0):.1f}ms）")
+    if not res.get("ok") and not res.get("written"):
+        # 命令没有发出去：补一次普通点击，保证不漏点（已写出仅回显超时的不补，避免重复点击）
+        app.adb.input_tap(serial, int(x), int(y))
+    return True
@@ -1,161 +1,530 @@
 
 import os
+import time
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 
-try:
-    import cv2
-    import numpy as np
-    _HAS_CV = True
-except Exception:
-    _HAS_CV = False
+from . import regions
+
+# cv2/numpy 延迟到首次匹配时导入，避免拖慢程序冷启动（冻结包中 OpenCV 导入耗时明显）
+cv2 = None
+np = None
+_HAS_CV = None  # None=尚未尝试导入
+_CV_LOCK = threading.Lock()
 
 THRESH = 0.85
-SCALES = [1.0]
+# 多尺度搜索的倍率（相对“截图宽度 / 720”的分辨率比例）；首选尺度未命中时按此顺序补搜
+SCALES = [1.0, 0.9, 1.1, 0.8, 1.25]
+RESWEEP_SEC = 10.0  # 同一设备/模板两次全尺度补搜的最小间隔（轮询中模板长期不出现时不反复补搜）
 
-def has_cv():
+def _ensure_cv() -> bool:
+    global cv2, np, _HAS_CV
+    if _HAS_CV is not None:
+        return _HAS_CV
+    with _CV_LOCK:
+        if _HAS_CV is None:
+            try:
+                import cv2 as _cv2
+                import numpy as _np
+                cv2, np = _cv2, _np
+                _HAS_CV = True
+            except Exception:
+                _HAS_CV = False
     return _HAS_CV
 
-def match_one(screen_png: bytes, tpl_path: str, threshold: float = THRESH):
+def has_cv():
+    return _ensure_cv()
+
+# 灰度模板缓存：path -> (mtime, gray)；mtime 变化（截图工具覆盖模板）时自动重读
+_TPL_CACHE = {}
+_TPL_LOCK = threading.Lock()
+
+def load_template(tpl_path: str):
+    """读取灰度模板（带缓存）；不可用返回 None。"""
+    if not _ensure_cv():
+        return None
+    try:
+        mtime = os.path.getmtime(tpl_path)
+    except OSError:
+        return None
+    hit = _TPL_CACHE.get(tpl_path)
+    if hit is not None and hit[0] == mtime:
+        return hit[1]
+    tpl = cv2.imread(tpl_path, cv2.IMREAD_GRAYSCALE)
+    if tpl is None:
+        return None
+    with _TPL_LOCK:
+        _TPL_CACHE[tpl_path] = (mtime, tpl)
+    return tpl
+
+def cached_template_count() -> int:
+    return len(_TPL_CACHE)
+
+def warm_up_sizes(sizes, frame_shape=(1280, 720)) -> int:
     """
-    返回 (found: bool, (x,y)): 模板中心坐标，基于 TM_CCOEFF_NORMED。
-    要求：screen_png 是 PNG 字节；tpl_path 为模板文件路径。
+    对每种模板尺寸在空白帧上跑一次 matchTemplate，并做一次 PNG 编解码，
+    让 OpenCV 的首次内部分配/库加载提前发生。返回实际预热的尺寸数。
+    """
+    if not _ensure_cv():
+        return 0
+    fh, fw = frame_shape
+    frame = np.zeros((fh, fw), dtype=np.uint8)
+    try:
+        ok, buf = cv2.imencode(".png", cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR))
+        if ok:
+            cv2.cvtColor(cv2.imdecode(buf, cv2.IMREAD_COLOR), cv2.COLOR_BGR2GRAY)
+    except Exception:
+        pass
+    done = 0
+    for (th, tw) in sorted(set(sizes)):
+        if th <= 0 or tw <= 0 or th >= fh or tw >= fw:
+            continue
+        try:
+            res = cv2.matchTemplate(frame, np.zeros((th, tw), dtype=np.uint8), cv2.TM_CCOEFF_NORMED)
+            cv2.minMaxLoc(res)
+            done += 1
+        except Exception:
+            pass
+    return done
+
+# fft 路径的模板频谱 LRU：(Template, shape) -> CCS 频谱（整帧尺寸，单个约数 MB）
+_SPEC_CACHE = OrderedDict()
+_SPEC_CACHE_MAX = 12
+
+class Template:
+    """
+    预计算统计量的模板：零均值模板 t' = t - mean(t) 及其范数 ||t'||。
+    归一化相关系数 = sum(I·t') / (||t'|| · sqrt(sum(I²) - sum(I)²/n))，
+    其中分子只需与零均值模板做一次互相关（sum(t')=0，窗口均值项自然抵消），
+    分母的窗口统计量由 Frame 的积分图 O(1) 给出。
+    """
+    __slots__ = ("path", "gray", "h", "w", "n", "zm", "norm")
+
+    def __init__(self, gray, path: str = ""):
+        self.path = path
+        self.gray = gray
+        self.h, self.w = gray.shape[:2]
+        self.n = float(self.h * self.w)
+        t = gray.astype(np.float32)
+        self.zm = t - float(t.mean())
+        self.norm = float(np.sqrt(np.sum(self.zm.astype(np.float64) ** 2)))
+
+    def spectrum(self, shape):
+        """零均值模板补零到 shape 后的 DFT（CCS 打包格式，LRU 缓存）。"""
+        key = (self, shape)
+        with _TPL_LOCK:
+            spec = _SPEC_CACHE.get(key)
+            if spec is not None:
+                _SPEC_CACHE.move_to_end(key)
+                return spec
+        pad = np.zeros(shape, dtype=np.float32)
+        pad[:self.h, :self.w] = self.zm
+        spec = cv2.dft(pad)
+        with _TPL_LOCK:
+            _SPEC_CACHE[key] = spec
+            while len(_SPEC_CACHE) > _SPEC_CACHE_MAX:
+                _SPEC_CACHE.popitem(last=False)
+        return spec
+
+
+class Frame:
+    """
+    一帧灰度图及其懒计算的派生数据（float32 副本、积分图、DFT 频谱），
+    同一帧上匹配多个模板时只解码/计算一次。按彩色解码时另保留 BGR 与懒算的 HSV，供颜色预筛使用。
+    """
+    __slots__ = ("gray", "bgr", "_hsv", "_f32", "_sum", "_sqsum", "_fft_shape", "_fft")
+
+    def __init__(self, gray, bgr=None):
+        self.gray = gray
+        self.bgr = bgr
+        self._hsv = None
+        self._f32 = None
+        self._sum = None
+        self._sqsum = None
+        self._fft_shape = None
+        self._fft = None
+
+    @classmethod
+    def from_png(cls, screen_png: bytes, color: bool = False):
+        """PNG 字节 -> Frame；color=True 时同时保留彩色图。解码失败或无 OpenCV 返回 None。"""
+        if not screen_png or not _ensure_cv():
+            return None
+        try:
+            buf = np.frombuffer(screen_png, dtype=np.uint8)
+            if color:
+                bgr = cv2.imdecode(buf, cv2.IMREAD_COLOR)
+                if bgr is None:
+                    return None
+                return cls(cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY), bgr)
+            gray = cv2.imdecode(buf, cv2.IMREAD_GRAYSCALE)
+        except Exception:
+            return None
+        return cls(gray) if gray is not None else None
+
+    @property
+    def shape(self):
+        return self.gray.shape[:2]
+
+    def hsv(self):
+        """整帧 HSV（懒计算）；非彩色解码的帧返回 None。"""
+        if self._hsv is None and self.bgr is not None:
+            self._hsv = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2HSV)
+        return self._hsv
+
+    def f32(self):
+        if self._f32 is None:
+            self._f32 = self.gray.astype(np.float32)
+        return self._f32
+
+    def integrals(self):
+        """(sum, sqsum) 积分图，float64，形状 (H+1, W+1)。"""
+        if self._sum is None:
+            self._sum, self._sqsum = cv2.integral2(self.gray, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+        return self._sum, self._sqsum
+
+    def window_std(self, h: int, w: int, x1: int = 0, y1: int = 0, x2: int = None, y2: int = None):
+        """
+        区域 [x1,x2)×[y1,y2) 内所有 h×w 窗口的 sqrt(sum(I²) - sum(I)²/n)（float32），
+        形状 (y2-y1-h+1, x2-x1-w+1)，与 matchTemplate 结果逐点对应。
+        """
+        H, W = self.shape
+        x2 = W if x2 is None else x2
+        y2 = H if y2 is None else y2
+        S, Q = self.integrals()
+        ys, ye = y1, y2 - h + 1
+        xs, xe = x1, x2 - w + 1
+
+        def box(I):
+            out = I[ys + h:ye + h, xs + w:xe + w] - I[ys:ye, xs + w:xe + w]
+            out -= I[ys + h:ye + h, xs:xe]
+            out += I[ys:ye, xs:xe]
+            return out
+        s = box(S)
+        q = box(Q)
+        s *= s
+        s *= 1.0 / (h * w)
+        q -= s
+        # 相减须在 float64 下完成（避免大数相消），结果再降为 float32 供后续 OpenCV 运算
+        return cv2.sqrt(cv2.max(q.astype(np.float32), 0.0))
+
+    def spectrum(self):
+        """整帧补零到 OpenCV 最优 DFT 尺寸后的频谱，多模板共享。返回 (shape, spec)。"""
+        if self._fft is None:
+            H, W = self.shape
+            shape = (cv2.getOptimalDFTSize(H), cv2.getOptimalDFTSize(W))
+            pad = np.zeros(shape, dtype=np.float32)
+            pad[:H, :W] = self.f32()
+            self._fft = cv2.dft(pad)
+            self._fft_shape = shape
+        return self._fft_shape, self._fft
+
+
+# 模板对象缓存：(path, scale) -> (灰度模板, Template)；灰度模板因 mtime 变化被重读时同步失效
+_TOBJ_CACHE = {}
+
+def get_template(tpl_path: str, scale: float = 1.0):
+    """读取带预计算统计量的 Template（按缩放倍率缓存）；不可用或缩放后过小返回 None。"""
+    gray = load_template(tpl_path)
+    if gray is None:
+        return None
+    key = (tpl_path, round(float(scale), 3))
+    hit = _TOBJ_CACHE.get(key)
+    if hit is not None and hit[0] is gray:
+        return hit[1]
+    src = gray
+    if key[1] != 1.0:
+        h, w = gray.shape[:2]
+        tw, th = max(10, int(w * key[1])), max(10, int(h * key[1]))
+        src = cv2.resize(gray, (tw, th), interpolation=cv2.INTER_AREA if key[1] < 1 else cv2.INTER_LINEAR)
+    tobj = Template(src, tpl_path)
+    with _TPL_LOCK:
+        _TOBJ_CACHE[key] = (gray, tobj)
+    return tobj
+
+
+# ---------------- 多尺度：按设备 × 模板记住命中尺度 ----------------
+_dev_tls = threading.local()
+_SCALE_LOCK = threading.Lock()
+_LEARNED = {}     # (设备, 帧尺寸, 模板路径) -> 命中尺度
+_DEV_SCALE = {}   # (设备, 帧尺寸) -> 该设备最近命中的尺度（新模板的首选）
+_LAST_SWEEP = {}  # (设备, 帧尺寸, 模板路径) -> 上次全尺度搜索时刻
+
+@contextmanager
+def device_scope(serial: str):
+    """在 with 块内把匹配归属到设备 serial（多尺度学习按设备区分；任务线程入口处设置）。"""
+    prev = getattr(_dev_tls, "serial", "")
+    _dev_tls.serial = serial or ""
+    try:
+        yield
+    finally:
+        _dev_tls.serial = prev
+
+def _scale_key(shape, tpl_path: str):
+    return (getattr(_dev_tls, "serial", ""), tuple(shape[:2])), tpl_path
+
+def _ladder(shape):
+    base = float(shape[1]) / float(regions.BASE_SIZE[0]) if shape[1] else 1.0
+    ladder = []
+    for f in list(SCALES) + [1.0 / base if base > 0 else 1.0]:
+        s = round(base * f, 3)
+        if s > 0 and s not in ladder:
+            ladder.append(s)
+    return ladder
+
+def preferred_scale(shape, tpl_path: str) -> float:
+    """该设备/帧尺寸下模板的首选尺度（已学到的，否则设备最近命中的，否则按帧宽推算）；不影响补搜节流。"""
+    dk, path = _scale_key(shape, tpl_path)
+    with _SCALE_LOCK:
+        learned = _LEARNED.get((dk, path))
+        if learned is not None:
+            return learned
+        dev = _DEV_SCALE.get(dk)
+    return dev if dev is not None else _ladder(shape)[0]
+
+def multi_scale() -> bool:
+    """是否启用多尺度匹配（逻辑坐标归一化模式下 SCALES 只有 1.0）。"""
+    return len(SCALES) > 1
+
+def _candidate_scales(shape, tpl_path: str):
+    """(首选尺度, 补搜尺度列表 或 None=本次不补搜)。"""
+    dk, path = _scale_key(shape, tpl_path)
+    ladder = _ladder(shape)
+    with _SCALE_LOCK:
+        learned = _LEARNED.get((dk, path))
+        first = learned if learned is not None else _DEV_SCALE.get(dk, ladder[0])
+        if len(ladder) <= 1:
+            return first, None
+        now = time.monotonic()
+        last = _LAST_SWEEP.get((dk, path))
+        if last is not None and now - last < RESWEEP_SEC:
+            return first, None
+        _LAST_SWEEP[(dk, path)] = now
+    return first, [s for s in ladder if s != first]
+
+def _learn_scale(shape, tpl_path: str, scale: float) -> None:
+    dk, path = _scale_key(shape, tpl_path)
+    with _SCALE_LOCK:
+        _LEARNED[(dk, path)] = scale
+        _DEV_SCALE[dk] = scale
+
+def _multi_scale(shape, tpl_path: str, threshold: float, attempt):
+    """
+    attempt(scale) -> (score, pos) 或 None。先试首选尺度，未达阈值时（按节流）补搜其余尺度，
+    命中即记住该尺度。返回得分最高的 (score, pos) 或 None。
+    """
+    first, rest = _candidate_scales(shape, tpl_path)
+    best = attempt(first)
+    hit_scale = first if best is not None and best[0] >= threshold else None
+    if hit_scale is None and rest:
+        for s in rest:
+            r = attempt(s)
+            if r is not None and (best is None or r[0] > best[0]):
+                best = r
+                if r[0] >= threshold:
+                    hit_scale = s
+                    break
+    if hit_scale is not None:
+        _learn_scale(shape, tpl_path, hit_scale)
+    return best
+
+def learned_scales() -> dict:
+    """已学到的尺度：{(设备, (h, w), 模板路径): scale}（调试/日志用）。"""
+    with _SCALE_LOCK:
+        return {(dk[0], dk[1], p): s for (dk, p), s in _LEARNED.items()}
+
+def correlate(frame: "Frame", tpl: "Template", roi=None, method: str = "ccorr"):
+    """
+    计算归一化相关系数图（与 TM_CCOEFF_NORMED 等价）。
+    roi: ((x1,y1),(x2,y2)) 搜索范围；结果坐标相对 roi 左上角。
+    method:
+      - "ccorr"：分子用 OpenCV TM_CCORR(帧, 零均值模板)，分母查积分图；
+      - "fft"：分子 = IDFT(帧频谱 × conj(模板频谱))，帧频谱在同帧各模板间共享、
+        模板频谱 LRU 缓存；仅用于整帧搜索，指定 roi 时按 "ccorr" 处理（小区域直接算更快）。
+    窗口方差为 0（纯色区域）或模板为纯色时得分记 0；结果为 float32，数值误差可能略超 1。
+    返回 (res, (x1, y1))；模板超出范围返回 (None, (x1, y1))。
     """
-    if not _HAS_CV or not screen_png or not os.path.isfile(tpl_path):
-        return (False, (0, 0))
+    H, W = frame.shape
+    if roi is None:
+        x1, y1, x2, y2 = 0, 0, W, H
+    else:
+        (x1, y1), (x2, y2) = roi
+        x1, y1 = max(0, int(x1)), max(0, int(y1))
+        x2, y2 = min(W, int(x2)), min(H, int(y2))
+    h, w = tpl.h, tpl.w
+    if h > y2 - y1 or w > x2 - x1 or tpl.norm <= 0:
+        return None, (x1, y1)
+
+    if method == "fft" and roi is None:
+        shape, fspec = frame.spectrum()
+        prod = cv2.mulSpectrums(fspec, tpl.spectrum(shape), 0, conjB=True)
+        full = cv2.idft(prod, flags=cv2.DFT_SCALE | cv2.DFT_REAL_OUTPUT)
+        num = full[:H - h + 1, :W - w + 1]
+    else:
+        sub = frame.f32()[y1:y2, x1:x2]
+        num = cv2.matchTemplate(sub, tpl.zm, cv2.TM_CCORR)
 
+    std = frame.window_std(h, w, x1, y1, x2, y2)
+    std *= tpl.norm
+    res = np.zeros(num.shape, dtype=np.float32)
+    # 近似纯色窗口不参与除法，得分保持 0
+    np.divide(num, std, out=res, where=std > 1e-3 * tpl.norm * float(np.sqrt(tpl.n)))
+    return res, (x1, y1)
+
+def match_frame(frame: "Frame", tpl_path: str, threshold: float = THRESH, roi=regions.AUTO,
+                method: str = "ccorr"):
+    """
+    在已解码的 Frame 上匹配一个模板：返回 (found, (x,y), score)，坐标为模板中心（整帧坐标）。
+    同帧匹配多个模板时先 Frame.from_png 一次，再逐个调用本函数。
+    roi 含义同 match_one（默认按模板绑定区域）。
+    帧为彩色解码且模板登记了颜色预筛（colorfilter）时：区域内无模板主色直接判未命中，
+    主色比例不足的位置得分记 0。
+    """
+    if frame is None or not _ensure_cv():
+        return (False, (0, 0), 0.0)
     try:
-        screen_arr = np.frombuffer(screen_png, dtype=np.uint8)
-        scr = cv2.imdecode(screen_arr, cv2.IMREAD_COLOR)
-        if scr is None:
-            return (False, (0, 0))
-        gray = cv2.cvtColor(scr, cv2.COLOR_BGR2GRAY)
-
-        tpl = cv2.imread(tpl_path, cv2.IMREAD_GRAYSCALE)
-        if tpl is None:
-            return (False, (0, 0))
-
-        h, w = tpl.shape[:2]
-        best = (0.0, None, None, None)  # (score, top_left, tw, th)
-        for s in SCALES:
-            tw = max(10, int(w * s))
-            th = max(10, int(h * s))
-            if tw >= gray.shape[1] or th >= gray.shape[0]:
-                continue
-            tpl_s = cv2.resize(tpl, (tw, th), interpolation=cv2.INTER_AREA)
-            res = cv2.matchTemplate(gray, tpl_s, cv2.TM_CCOEFF_NORMED)
-            _, max_val, _, max_loc = cv2.minMaxLoc(res)
-            if max_val > best[0]:
-                best = (max_val, max_loc, tw, th)
-
-        score, tl, bw, bh = best
-        if score >= threshold and tl is not None:
-            x = tl[0] + bw // 2
-            y = tl[1] + bh // 2
-            return (True, (int(x), int(y)))
-        return (False, (0, 0))
+        H, W = frame.shape
+        region = regions.resolve(roi, tpl_path, (W, H))
+
+        def attempt(scale):
+            tpl = get_template(tpl_path, scale)
+            if tpl is None:
+                return None
+            keep = None
+            if frame.bgr is not None:
+                from . import colorfilter
+                (x1, y1), (x2, y2) = region if region is not None else ((0, 0), (W, H))
+                reject, keep = colorfilter.gate(frame, tpl_path, tpl.h, tpl.w, x1, y1, x2, y2)
+                if reject:
+                    return None
+            res, (ox, oy) = correlate(frame, tpl, roi=region, method=method)
+            if res is None:
+                return None
+            if keep is not None and keep.shape == res.shape:
+                res[~keep] = 0.0
+            _, max_val, _, (rx, ry) = cv2.minMaxLoc(res)
+            return (min(1.0, float(max_val)), (int(ox + rx + tpl.w // 2), int(oy + ry + tpl.h // 2)))
+
+        hit = _multi_scale(frame.shape, tpl_path, threshold, attempt)
+        if hit is None:
+            return (False, (0, 0), 0.0)
+        score, pos = hit
+        return (score >= threshold, pos, score)
     except Exception:
-        return (False, (0, 0))
+        return (False, (0, 0), 0.0)
+
+def match_many(screen_png: bytes, tpl_paths, threshold: float = THRESH, roi=regions.AUTO, method: str = None):
+    """
+    一帧多模板：只解码一次、积分图/频谱在模板间共享。
+    返回 {path: (found, (x,y), score)}。method 为 None 时模板数 >= 4 走 fft，否则 ccorr
+    （有搜索区域的模板仍按 ccorr 在区域内计算）。
+    """
+    paths = list(tpl_paths)
+    frame = Frame.from_png(screen_png, color=_wants_color(paths))
+    if frame is None:
+        return {p: (False, (0, 0), 0.0) for p in paths}
+    if method is None:
+        method = "fft" if len(paths) >= 4 else "ccorr"
+    return {p: match_frame(frame, p, threshold=threshold, roi=roi, method=method) for p in paths}
+
+def _wants_color(paths) -> bool:
+    """是否有模板登记了颜色预筛（需要彩色解码）。"""
+    from . import colorfilter
+    return any(colorfilter.enabled(p) for p in paths)
+
+def _decode_gray(screen_png: bytes):
+    screen_arr = np.frombuffer(screen_png, dtype=np.uint8)
+    scr = cv2.imdecode(screen_arr, cv2.IMREAD_COLOR)
+    if scr is None:
+        return None
+    return cv2.cvtColor(scr, cv2.COLOR_BGR2GRAY)
+
+def _best_match(gray, tpl_path: str, region=None, threshold: float = THRESH):
+    """
+    在 gray 的 region（None=整屏）内匹配：先用该设备/模板学到的尺度，未命中再补搜 SCALES
+    （缩放后的模板按尺度缓存）。返回 (score, (x,y) 模板中心整帧坐标)；模板不可用或放不下返回 None。
+    """
+    shape = gray.shape[:2]
+    ox = oy = 0
+    if region is not None:
+        (x1, y1), (x2, y2) = region
+        gray = gray[y1:y2, x1:x2]
+        ox, oy = x1, y1
+
+    def attempt(scale):
+        tpl = get_template(tpl_path, scale)
+        if tpl is None or tpl.w >= gray.shape[1] or tpl.h >= gray.shape[0]:
+            return None
+        res = cv2.matchTemplate(gray, tpl.gray, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, max_loc = cv2.minMaxLoc(res)
+        return (float(max_val), (int(max_loc[0] + tpl.w // 2 + ox), int(max_loc[1] + tpl.h // 2 + oy)))
+
+    return _multi_scale(shape, tpl_path, threshold, attempt)
+
+def match_one(screen_png: bytes, tpl_path: str, threshold: float = THRESH, roi=regions.AUTO):
+    """
+    返回 (found: bool, (x,y)): 模板中心坐标，基于 TM_CCOEFF_NORMED。
+    要求：screen_png 是 PNG 字节；tpl_path 为模板文件路径。
+    roi：默认按 regions 注册表中该模板绑定的区域搜索（未绑定则整屏）；
+         None=强制整屏；区域名或 ((x1,y1),(x2,y2)) 指定区域。
+    """
+    found, pos, _ = match_one_detail(screen_png, tpl_path, threshold=threshold, roi=roi)
+    return (found, pos) if found else (False, (0, 0))
 
 def exist(screen_png: bytes, tpl_path: str, threshold: float = THRESH):
     found, _ = match_one(screen_png, tpl_path, threshold=threshold)
     return found
 
 def exist_all(screen_png: bytes, paths: dict, keys: list, threshold: float = THRESH):
+    # 同一帧只解码一次，积分图在各模板间复用；任一不满足即提前返回
+    if not keys:
+        return True
+    frame = Frame.from_png(screen_png)
+    if frame is None:
+        return False
     for k in keys:
-        ok, _ = match_one(screen_png, paths[k], threshold=threshold)
+        ok, _, _ = match_frame(frame, paths[k], threshold=threshold)
         if not ok:
             return False
     return True
 
 
 
-def match_one_detail(screen_png: bytes, tpl_path: str, threshold: float = THRESH):
+def match_one_detail(screen_png: bytes, tpl_path: str, threshold: float = THRESH, roi=regions.AUTO):
     """
     返回 (found: bool, (x,y), score: float)。
     与 match_one 一致，但额外返回匹配得分，便于详细日志。
     """
-    if not _HAS_CV or not screen_png or not os.path.isfile(tpl_path):
+    if not screen_png or not _ensure_cv() or not os.path.isfile(tpl_path):
         return (False, (0, 0), 0.0)
+    if _wants_color([tpl_path]):
+        return match_frame(Frame.from_png(screen_png, color=True), tpl_path, threshold=threshold, roi=roi)
     try:
-        screen_arr = np.frombuffer(screen_png, dtype=np.uint8)
-        scr = cv2.imdecode(screen_arr, cv2.IMREAD_COLOR)
-        if scr is None:
+        gray = _decode_gray(screen_png)
+        if gray is None:
             return (False, (0, 0), 0.0)
-        gray = cv2.cvtColor(scr, cv2.COLOR_BGR2GRAY)
-        tpl = cv2.imread(tpl_path, cv2.IMREAD_GRAYSCALE)
-        if tpl is None:
+        region = regions.resolve(roi, tpl_path, (gray.shape[1], gray.shape[0]))
+        hit = _best_match(gray, tpl_path, region, threshold)
+        if hit is None:
             return (False, (0, 0), 0.0)
-        h, w = tpl.shape[:2]
-        best = (0.0, None, None, None)  # (score, top_left, tw, th)
-        for s in SCALES:
-            tw = max(10, int(w * s))
-            th = max(10, int(h * s))
-            if tw >= gray.shape[1] or th >= gray.shape[0]:
-                continue
-            tpl_s = cv2.resize(tpl, (tw, th), interpolation=cv2.INTER_AREA)
-            res = cv2.matchTemplate(gray, tpl_s, cv2.TM_CCOEFF_NORMED)
-            _, max_val, _, max_loc = cv2.minMaxLoc(res)
-            if max_val > best[0]:
-                best = (max_val, max_loc, tw, th)
-        score, tl, bw, bh = best
-        if tl is not None:
-            x = tl[0] + bw // 2
-            y = tl[1] + bh // 2
-            ok = score >= threshold
-            return (ok, (int(x), int(y)), float(score))
-        return (False, (0, 0), float(score))
+        score, pos = hit
+        return (score >= threshold, pos, score)
     except Exception:
         return (False, (0, 0), 0.0)
 
-def match_in_range(screen_png: bytes, tpl_path: str, coord_range: tuple, threshold: float = THRESH):
+def match_in_range(screen_png: bytes, tpl_path: str, coord_range, threshold: float = THRESH):
     """
     在指定范围内匹配模板。
 
     参数:
         screen_png: 屏幕截图（PNG字节）
         tpl_path: 模板文件路径
-        coord_range: 搜索范围 ((x1, y1), (x2, y2))
+        coord_range: 搜索范围 ((x1, y1), (x2, y2))，或 regions 中的区域名（按截图尺寸缩放）
         threshold: 匹配阈值
 
     返回:
         (found: bool, (x, y)): 模板中心坐标（基于原始屏幕坐标系）
     """
-    if not _HAS_CV or not screen_png or not os.path.isfile(tpl_path):
-        return (False, (0, 0))
-
-    try:
-        screen_arr = np.frombuffer(screen_png, dtype=np.uint8)
-        scr = cv2.imdecode(screen_arr, cv2.IMREAD_COLOR)
-        if scr is None:
-            return (False, (0, 0))
-
-        # 提取指定范围
-        (x1, y1), (x2, y2) = coord_range
-        roi = scr[y1:y2, x1:x2]
-        gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
-
-        tpl = cv2.imread(tpl_path, cv2.IMREAD_GRAYSCALE)
-        if tpl is None:
-            return (False, (0, 0))
-
-        h, w = tpl.shape[:2]
-        best = (0.0, None, None, None)  # (score, top_left, tw, th)
-        for s in SCALES:
-            tw = max(10, int(w * s))
-            th = max(10, int(h * s))
-            if tw >= gray.shape[1] or th >= gray.shape[0]:
-                continue
-            tpl_s = cv2.resize(tpl, (tw, th), interpolation=cv2.INTER_AREA)
-            res = cv2.matchTemplate(gray, tpl_s, cv2.TM_CCOEFF_NORMED)
-            _, max_val, _, max_loc = cv2.minMaxLoc(res)
-            if max_val > best[0]:
-                best = (max_val, max_loc, tw, th)
-
-        score, tl, bw, bh = best
-        if score >= threshold and tl is not None:
-            # 转换回原始坐标系
-            x = tl[0] + bw // 2 + x1
-            y = tl[1] + bh // 2 + y1
-            return (True, (int(x), int(y)))
-        return (False, (0, 0))
-    except Exception:
-        return (False, (0, 0))
+    if coord_range is None:
+        coord_range = regions.EMPTY
+    return match_one(screen_png, tpl_path, threshold=threshold, roi=coord_range)
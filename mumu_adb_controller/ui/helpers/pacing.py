@@ -0,0 +1,189 @@
+# mumu_adb_controller/ui/helpers/pacing.py
+"""
+截图轮询节奏控制（全进程共享）：
+- 每台设备记录截图+识别的耗时（墙钟）与本线程 CPU 耗时（EWMA）；
+- 所有活动轮询按“CPU 耗时 / 轮询周期”累加为主机 CPU 需求，超出预算（默认 60% 核数）时
+  按优先级拉长间隔：high 只按平方根放大，normal 线性放大，low 再多放大 50%；
+- 连续未命中（空等）时间隔逐步退避到 max_interval，命中后恢复；
+- 距离截止时间（如打熊发车）不足 urgent_sec 时不受预算与退避限制，按 min_interval 轮询；
+- 设备健康度（core/health.py）为 degraded 时 normal/low 轮询再放大 DEGRADED_MUL 倍，
+  unresponsive 时直接按 max_interval，把主机资源让给正常设备。
+
+用法（任务自带可暂停的 sleep）：
+    pacer = pacing.poller(serial, base=2.0, priority="low")
+    with pacer.measure():
+        png = screencap(); ok = match(png)
+    pacer.hit() if ok else pacer.miss()
+    if sleep_check(pacer.next_interval()): return
+    ...
+    pacer.close()
+"""
+import os
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from ...core import health
+
+_PRIORITY_EXP = {"high": 0.5, "normal": 1.0, "low": 1.0}
+_PRIORITY_MUL = {"high": 1.0, "normal": 1.0, "low": 1.5}
+_ALPHA = 0.3  # EWMA 权重
+DEGRADED_MUL = 1.5
+
+
+class DeviceCost:
+    """单台设备一次“截图+识别”的平均代价。"""
+    __slots__ = ("latency", "cpu", "samples")
+
+    def __init__(self):
+        self.latency = 0.0
+        self.cpu = 0.0
+        self.samples = 0
+
+    def update(self, latency: float, cpu: float):
+        if self.samples == 0:
+            self.latency, self.cpu = latency, cpu
+        else:
+            self.latency += _ALPHA * (latency - self.latency)
+            self.cpu += _ALPHA * (cpu - self.cpu)
+        self.samples += 1
+
+
+class RateController:
+    def __init__(self, cpu_budget: Optional[float] = None):
+        cores = os.cpu_count() or 2
+        # 预算：每秒可用的 CPU 秒数
+        self.cpu_budget = float(cpu_budget) if cpu_budget else 0.6 * cores
+        self._costs: Dict[str, DeviceCost] = {}
+        self._active: Dict[int, "Poller"] = {}
+        self._lock = threading.Lock()
+
+    def set_budget(self, cpu_seconds_per_sec: float) -> None:
+        self.cpu_budget = max(0.1, float(cpu_seconds_per_sec))
+
+    def cost(self, serial: str) -> DeviceCost:
+        with self._lock:
+            c = self._costs.get(serial)
+            if c is None:
+                c = DeviceCost()
+                self._costs[serial] = c
+            return c
+
+    def record(self, serial: str, latency: float, cpu: float) -> None:
+        c = self.cost(serial)
+        with self._lock:
+            c.update(latency, cpu)
+
+    def _register(self, p: "Poller") -> None:
+        with self._lock:
+            self._active[id(p)] = p
+
+    def _unregister(self, p: "Poller") -> None:
+        with self._lock:
+            self._active.pop(id(p), None)
+
+    def demand(self) -> float:
+        """当前所有活动轮询的 CPU 需求（CPU 秒/秒）。"""
+        with self._lock:
+            total = 0.0
+            for p in self._active.values():
+                c = self._costs.get(p.serial)
+                if c is None or c.samples == 0:
+                    continue
+                total += c.cpu / max(0.05, c.latency + p.last_interval)
+            return total
+
+    def load_factor(self) -> float:
+        """需求/预算，不低于 1。"""
+        return max(1.0, self.demand() / self.cpu_budget)
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            return {s: {"latency_ms": c.latency * 1000.0, "cpu_ms": c.cpu * 1000.0, "samples": c.samples}
+                    for s, c in self._costs.items()}
+
+
+class Poller:
+    """单个轮询循环的节奏；线程内使用，不需要加锁。"""
+
+    def __init__(self, ctl: RateController, serial: str, base: float, priority: str = "normal",
+                 min_interval: Optional[float] = None, max_interval: Optional[float] = None,
+                 urgent_sec: float = 10.0):
+        self.ctl = ctl
+        self.serial = serial
+        self.base = max(0.0, float(base))
+        self.priority = priority if priority in _PRIORITY_EXP else "normal"
+        self.min_interval = float(min_interval) if min_interval is not None else min(self.base, 0.2)
+        self.max_interval = float(max_interval) if max_interval is not None else max(self.base * 4, self.base)
+        self.urgent_sec = float(urgent_sec)
+        self.deadline: Optional[float] = None  # time.time() 时间戳
+        self.last_interval = self.base
+        self._misses = 0
+        ctl._register(self)
+
+    @contextmanager
+    def measure(self):
+        """包住一次截图+识别，记录墙钟与本线程 CPU 耗时。"""
+        t0, c0 = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.ctl.record(self.serial, time.perf_counter() - t0, time.thread_time() - c0)
+
+    def hit(self) -> None:
+        self._misses = 0
+
+    def miss(self) -> None:
+        self._misses += 1
+
+    def next_interval(self, deadline: Optional[float] = None) -> float:
+        """下一次截图前应等待的秒数。deadline 未给出时使用 self.deadline。"""
+        dl = deadline if deadline is not None else self.deadline
+        if dl is not None:
+            remain = dl - time.time()
+            if remain <= self.urgent_sec:
+                self.last_interval = max(0.0, min(self.min_interval, remain)) if remain > 0 else self.min_interval
+                return self.last_interval
+        factor = self.ctl.load_factor() ** _PRIORITY_EXP[self.priority]
+        if factor > 1.0:
+            factor *= _PRIORITY_MUL[self.priority]
+        # 空等退避：连续未命中 3 次后每次放大 25%
+        backoff = 1.25 ** max(0, self._misses - 2)
+        state = health.monitor().state(self.serial)
+        if state == health.UNRESPONSIVE:
+            self.last_interval = self.max_interval
+            return self.last_interval
+        if state == health.DEGRADED and self.priority != "high":
+            factor *= DEGRADED_MUL
+        interval = self.base * factor * backoff
+        self.last_interval = max(self.min_interval, min(self.max_interval, interval))
+        return self.last_interval
+
+    def close(self) -> None:
+        self.ctl._unregister(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+_controller: Optional[RateController] = None
+_ctl_lock = threading.Lock()
+
+
+def controller() -> RateController:
+    global _controller
+    if _controller is None:
+        with _ctl_lock:
+            if _controller is None:
+                _controller = RateController()
+    return _controller
+
+
+def poller(serial: str, base: float, priority: str = "normal", **kw) -> Poller:
+    """创建登记在全局控制器上的轮询节奏；用完调用 close()（或用 with）。"""
+    return Poller(controller(), serial, base, priority, **kw)
@@ -0,0 +1,161 @@
+# mumu_adb_controller/ui/helpers/regions.py
+"""
+屏幕区域（ROI）注册表：
+- 命名区域：统一按 720x1280 基准坐标登记，匹配时按实际截图尺寸等比缩放；
+- 模板默认区域：bind("all_help.png", "like.all_help") 后，matcher.match_one 等
+  未显式指定 roi 时只在该区域内搜索，模板文件名按小写比较；
+- 相对区域：around(anchor, name) 以锚点（如匹配到的头像坐标）为原点平移。
+
+区域格式与 matcher.match_in_range 一致：((x1, y1), (x2, y2))，右下角不含。
+"""
+import os
+import struct
+import threading
+from typing import Dict, List, Optional, Tuple, Union
+
+Region = Tuple[Tuple[int, int], Tuple[int, int]]
+
+BASE_SIZE = (720, 1280)  # (w, h)
+AUTO = "auto"            # matcher 中 roi 参数的默认值：按模板绑定查注册表
+EMPTY: Region = ((0, 0), (0, 0))  # 裁剪后为空：不搜索（区别于 None=整屏）
+
+_LOCK = threading.Lock()
+
+# 名称 -> 基准坐标区域（绝对坐标，或 around() 使用的相对偏移）
+_REGIONS: Dict[str, Region] = {
+    # 刷王城
+    "city.detect": ((220, 1029), (519, 1109)),
+    "city.blue_button": ((200, 1000), (800, 1280)),
+    "city.red_button": ((0, 900), (1000, 1280)),
+    "city.soldier": ((461, 773), (615, 1085)),
+    # 自动点赞：all_help 面板
+    "like.all_help": ((89, 1020), (602, 1242)),
+    # 打熊：头像右下方 join 按钮（相对头像匹配中心）
+    "bear.join_near_head": ((0, 0), (720, 240)),
+    # 撤军：左侧行军折叠按钮
+    "withdraw.fold_marching": ((0, 178), (71, 238)),
+    # 建旗：联盟旗帜入口
+    "flag.lianmengqizhi": ((133, 970), (582, 1131)),
+    # 队列满编提示（覆盖刷资源与燃霜两处使用范围）
+    "queue.full": ((14, 146), (298, 311)),
+}
+
+# 模板文件名（小写）-> 区域名；仅登记只在固定位置出现的模板
+_TEMPLATE_ROI: Dict[str, str] = {
+    "all_help.png": "like.all_help",
+    "fold_marching.png": "withdraw.fold_marching",
+    "lianmengqizhi.png": "flag.lianmengqizhi",
+    "full_queue5.png": "queue.full",
+    "full_queue6.png": "queue.full",
+}
+
+
+def register(name: str, region: Region) -> None:
+    """登记/覆盖命名区域（基准坐标）。"""
+    (x1, y1), (x2, y2) = region
+    if x2 <= x1 or y2 <= y1:
+        raise ValueError(f"无效区域 {name}: {region}")
+    with _LOCK:
+        _REGIONS[name] = ((int(x1), int(y1)), (int(x2), int(y2)))
+
+
+def get(name: str) -> Region:
+    """取基准坐标下的命名区域；不存在抛 KeyError。"""
+    return _REGIONS[name]
+
+
+def names() -> List[str]:
+    return sorted(_REGIONS)
+
+
+def bind(template: str, name: str) -> None:
+    """为模板（文件名或路径）设置默认搜索区域。"""
+    if name not in _REGIONS:
+        raise KeyError(name)
+    with _LOCK:
+        _TEMPLATE_ROI[os.path.basename(template).lower()] = name
+
+
+def unbind(template: str) -> None:
+    with _LOCK:
+        _TEMPLATE_ROI.pop(os.path.basename(template).lower(), None)
+
+
+def bound_name(tpl_path: str) -> Optional[str]:
+    return _TEMPLATE_ROI.get(os.path.basename(tpl_path).lower())
+
+
+def png_size(png: bytes) -> Optional[Tuple[int, int]]:
+    """从 PNG 头（IHDR）读取 (w, h)，无需解码整张图；非 PNG 返回 None。"""
+    if not png or len(png) < 24 or png[:8] != b"\x89PNG\r\n\x1a\n":
+        return None
+    try:
+        w, h = struct.unpack(">II", png[16:24])
+        return int(w), int(h)
+    except Exception:
+        return None
+
+
+def _factors(size: Optional[Tuple[int, int]]) -> Tuple[float, float]:
+    if not size:
+        return 1.0, 1.0
+    return size[0] / float(BASE_SIZE[0]), size[1] / float(BASE_SIZE[1])
+
+
+def clip(region: Region, size: Optional[Tuple[int, int]]) -> Region:
+    """裁剪到画面内；空区域返回 EMPTY。size 为 None 时只保证非负。"""
+    (x1, y1), (x2, y2) = region
+    x1, y1 = max(0, int(x1)), max(0, int(y1))
+    x2, y2 = int(x2), int(y2)
+    if size:
+        x2, y2 = min(x2, int(size[0])), min(y2, int(size[1]))
+    if x2 <= x1 or y2 <= y1:
+        return EMPTY
+    return (x1, y1), (x2, y2)
+
+
+def scale(region: Region, size: Optional[Tuple[int, int]] = None) -> Region:
+    """基准坐标区域 -> 实际截图 size=(w, h) 下的区域（已裁剪）。"""
+    fx, fy = _factors(size)
+    (x1, y1), (x2, y2) = region
+    scaled = ((int(x1 * fx), int(y1 * fy)), (int(round(x2 * fx)), int(round(y2 * fy))))
+    return clip(scaled, size)
+
+
+def region(name: str, size: Optional[Tuple[int, int]] = None) -> Region:
+    """按名称取区域并缩放到 size；名称不存在抛 KeyError。"""
+    return scale(get(name), size)
+
+
+def around(anchor: Tuple[int, int], name: str, size: Optional[Tuple[int, int]] = None) -> Region:
+    """以 anchor（实际坐标）为原点，平移命名的相对区域（偏移按 size 缩放）。"""
+    fx, fy = _factors(size)
+    (dx1, dy1), (dx2, dy2) = get(name)
+    ax, ay = int(anchor[0]), int(anchor[1])
+    r = ((ax + int(dx1 * fx), ay + int(dy1 * fy)), (ax + int(round(dx2 * fx)), ay + int(round(dy2 * fy))))
+    return clip(r, size)
+
+
+def for_template(tpl_path: str, size: Optional[Tuple[int, int]] = None) -> Optional[Region]:
+    """模板绑定的默认搜索区域（已缩放）；未绑定返回 None（整屏搜索）。"""
+    name = bound_name(tpl_path)
+    if name is None:
+        return None
+    return region(name, size)
+
+
+def resolve(roi: Union[str, Region, None], tpl_path: str, size: Optional[Tuple[int, int]]) -> Optional[Region]:
+    """
+    解析 matcher 的 roi 参数：
+    - AUTO：查模板绑定；
+    - None：整屏；
+    - 字符串：命名区域（缩放）；
+    - 元组：实际坐标，仅裁剪不缩放。
+    """
+    if roi is None:
+        return None
+    if isinstance(roi, str):
+        if roi == AUTO:
+            return for_template(tpl_path, size)
+        return region(roi, size)
+    return clip(roi, size)
@@ -0,0 +1,184 @@
+# mumu_adb_controller/ui/helpers/timing.py
+"""
+定时动作引擎（打熊发车等需要毫秒级对点的场景）：
+- 延迟模型：按设备记录 adb 输入命令往返耗时（input tap/keyevent）与空命令往返耗时（true），
+  预测“发出命令 → 设备实际注入事件”的延迟 ≈ 输入往返中位数 - 空命令往返中位数 / 2；
+- run_at(deadline, action)：在 deadline - 预测延迟 时刻发出，使事件落在 deadline 上；
+- 等待采用“粗睡 + 末段自旋”：距离目标 SPIN_SEC 以上时可暂停地 sleep，之后 1ms 级 sleep，
+  最后 2ms 忙等；
+- 每次定时动作记录误差（估计注入时刻 - 目标时刻），report() 输出分布。
+
+时间基准为主机 time.time()（与任务里的 datetime 目标时间一致）。
+"""
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+
+SPIN_SEC = 0.03      # 末段进入细粒度等待的窗口
+BUSY_SEC = 0.002     # 最后忙等的窗口
+_MAX_SAMPLES = 50
+
+
+def _median(xs) -> float:
+    s = sorted(xs)
+    if not s:
+        return 0.0
+    n = len(s)
+    return s[n // 2] if n % 2 else (s[n // 2 - 1] + s[n // 2]) / 2.0
+
+
+def _pct(xs, q: float) -> float:
+    s = sorted(xs)
+    if not s:
+        return 0.0
+    return s[min(len(s) - 1, max(0, int(round(q * (len(s) - 1)))))]
+
+
+class LatencyStats:
+    """单台设备的 adb 命令往返耗时样本（秒）。"""
+
+    def __init__(self):
+        self.input_rt: Deque[float] = deque(maxlen=_MAX_SAMPLES)
+        self.noop_rt: Deque[float] = deque(maxlen=_MAX_SAMPLES)
+        self._lock = threading.Lock()
+
+    def add_input(self, rt: float):
+        with self._lock:
+            self.input_rt.append(rt)
+
+    def add_noop(self, rt: float):
+        with self._lock:
+            self.noop_rt.append(rt)
+
+    def return_leg(self) -> float:
+        """命令完成后结果回传到主机的估计耗时（空命令往返的一半）。"""
+        with self._lock:
+            return _median(self.noop_rt) / 2.0
+
+    def predicted(self) -> float:
+        """预测的“发出 → 注入”延迟（秒）；无样本时为 0。"""
+        with self._lock:
+            if not self.input_rt:
+                return 0.0
+            return max(0.0, _median(self.input_rt) - _median(self.noop_rt) / 2.0)
+
+
+_stats: Dict[str, LatencyStats] = {}
+_stats_lock = threading.Lock()
+
+
+def latency(serial: str) -> LatencyStats:
+    """进程内共享的设备延迟统计。"""
+    with _stats_lock:
+        st = _stats.get(serial)
+        if st is None:
+            st = LatencyStats()
+            _stats[serial] = st
+        return st
+
+
+def precise_wait(target_ts: float, should_stop: Optional[Callable[[], bool]] = None,
+                 coarse_sleep: Optional[Callable[[float], bool]] = None) -> bool:
+    """
+    等到 time.time() >= target_ts。coarse_sleep(sec) 返回 True 表示应停止（可带暂停语义）。
+    返回 True 表示被停止。
+    """
+    stop = should_stop or (lambda: False)
+    while True:
+        remain = target_ts - time.time()
+        if remain <= SPIN_SEC:
+            break
+        if stop():
+            return True
+        step = min(0.5, remain - SPIN_SEC)
+        if coarse_sleep is not None:
+            if coarse_sleep(step):
+                return True
+        else:
+            time.sleep(step)
+    # 末段：换算到 perf_counter，避免系统时钟调整影响
+    end = time.perf_counter() + (target_ts - time.time())
+    while True:
+        remain = end - time.perf_counter()
+        if remain <= 0:
+            return False
+        if remain > BUSY_SEC:
+            time.sleep(min(0.001, remain - BUSY_SEC))
+
+
+class TimingEngine:
+    """单台设备的定时动作执行与误差统计（每次任务运行一个实例）。"""
+
+    def __init__(self, serial: str, log: Optional[Callable[[str], None]] = None,
+                 should_stop: Optional[Callable[[], bool]] = None,
+                 coarse_sleep: Optional[Callable[[float], bool]] = None):
+        self.serial = serial
+        self.stats = latency(serial)
+        self.log = log
+        self.should_stop = should_stop
+        self.coarse_sleep = coarse_sleep
+        self.errors: List[float] = []  # 秒，正数=晚于目标
+
+    def timed(self, action: Callable[[], object]):
+        """执行一次 adb 输入命令并记录往返耗时；返回 action 的返回值。"""
+        t0 = time.perf_counter()
+        try:
+            return action()
+        finally:
+            self.stats.add_input(time.perf_counter() - t0)
+
+    def calibrate(self, adb, rounds: int = 3) -> float:
+        """用空命令与无害按键（KEYCODE_UNKNOWN）测量往返耗时，返回预测延迟（秒）。"""
+        for _ in range(max(1, int(rounds))):
+            if self.should_stop and self.should_stop():
+                break
+            t0 = time.perf_counter()
+            adb.shell(self.serial, "true")
+            self.stats.add_noop(time.perf_counter() - t0)
+            self.timed(lambda: adb.input_keyevent(self.serial, 0))
+        pred = self.stats.predicted()
+        if self.log:
+            self.log(f"[定时] 延迟校准：预测注入延迟 {pred * 1000:.0f}ms（回传 {self.stats.return_leg() * 1000:.0f}ms）")
+        return pred
+
+    def wait_until(self, target_ts: float) -> bool:
+        return precise_wait(target_ts, self.should_stop, self.coarse_sleep)
+
+    def run_at(self, deadline: float, action: Callable[[], object], label: str = "") -> Optional[float]:
+        """
+        使 action（一次 adb 输入）的注入时刻对准 deadline。
+        返回误差秒数（估计注入时刻 - deadline）；被停止返回 None。
+        """
+        lead = self.stats.predicted()
+        if self.wait_until(deadline - lead):
+            return None
+        t_send = time.time()
+        t0 = time.perf_counter()
+        try:
+            action()
+        finally:
+            rt = time.perf_counter() - t0
+            self.stats.add_input(rt)
+        err = (t_send + max(0.0, rt - self.stats.return_leg())) - deadline
+        self.errors.append(err)
+        if self.log:
+            self.log(f"[定时] {label or '动作'}：误差 {err * 1000:+.0f}ms（提前量 {lead * 1000:.0f}ms，往返 {rt * 1000:.0f}ms）")
+        return err
+
+    def report(self) -> Optional[dict]:
+        """本次运行的误差分布（毫秒）；无定时动作返回 None。"""
+        if not self.errors:
+            return None
+        ms = [e * 1000.0 for e in self.errors]
+        rep = {
+            "n": len(ms),
+            "mean_ms": sum(ms) / len(ms),
+            "p50_ms": _pct(ms, 0.5),
+            "p90_ms": _pct(ms, 0.9),
+            "max_abs_ms": max(abs(x) for x in ms),
+        }
+        if self.log:
+            self.log(f"[定时] 本次 {rep['n']} 个定时动作：平均 {rep['mean_ms']:+.0f}ms，"
+                     f"P50 {rep['p50_ms']:+.0f}ms，P90 {rep['p90_ms']:+.0f}ms，最大偏差 {rep['max_abs_ms']:.0f}ms")
+        return rep
@@ -0,0 +1,115 @@
+# mumu_adb_controller/ui/helpers/warmup.py
+"""
+模板预热（后台线程，主窗口显示后执行）：
+1) 导入各任务模块，收集 _paths()/build_paths() 以及模块级 IMG_* 常量引用的模板；
+2) 通过 matcher.get_template 读入模板缓存并预计算零均值模板/范数（省去首次使用时的文件 IO + imread）；
+3) 每种模板尺寸在空白帧上跑一次 matchTemplate（省去 OpenCV 首次分配开销）。
+
+这样第一次真正的打熊/上车判定与稳态耗时一致。
+"""
+import os
+import time
+import threading
+import importlib
+from typing import Callable, Iterable, List, Optional, Set
+
+from . import matcher
+
+_PATH_FUNCS = ("_paths", "build_paths")
+_started = False
+_lock = threading.Lock()
+
+
+def _flatten(value) -> Iterable[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from _flatten(v)
+    elif isinstance(value, (list, tuple, set)):
+        for v in value:
+            yield from _flatten(v)
+
+
+def collect_template_paths(log: Optional[Callable[[str], None]] = None) -> List[str]:
+    """遍历任务注册表中的模块，返回去重后存在的 png 模板路径。"""
+    from .. import tasks
+
+    seen: Set[str] = set()
+    out: List[str] = []
+    modules = sorted(set(tasks.registered().values()))
+    for mod_name in modules:
+        try:
+            mod = importlib.import_module(f"{tasks.__name__}.{mod_name}")
+        except Exception as e:
+            if log:
+                log(f"[预热] 导入任务模块失败 {mod_name}: {e}")
+            continue
+        candidates: List[str] = []
+        for fn_name in _PATH_FUNCS:
+            fn = getattr(mod, fn_name, None)
+            if callable(fn):
+                try:
+                    candidates.extend(_flatten(fn()))
+                except Exception:
+                    pass
+        for attr, value in vars(mod).items():
+            if attr.startswith("IMG_") and isinstance(value, str) and os.path.isabs(value):
+                candidates.append(value)
+        for p in candidates:
+            if not p.lower().endswith(".png") or p in seen:
+                continue
+            seen.add(p)
+            if os.path.isfile(p):
+                out.append(p)
+    return out
+
+
+def warm_up(log: Optional[Callable[[str], None]] = None,
+            should_stop: Optional[Callable[[], bool]] = None) -> dict:
+    """同步执行预热，返回统计信息。"""
+    t0 = time.perf_counter()
+    stats = {"templates": 0, "sizes": 0, "failed": 0, "ms": 0}
+    if not matcher.has_cv():
+        if log:
+            log("[预热] 未安装 opencv-python/numpy，跳过模板预热")
+        return stats
+    paths = collect_template_paths(log)
+    sizes = set()
+    for p in paths:
+        if should_stop and should_stop():
+            break
+        tpl = matcher.get_template(p)
+        if tpl is None:
+            stats["failed"] += 1
+            continue
+        stats["templates"] += 1
+        sizes.add((tpl.h, tpl.w))
+    if not (should_stop and should_stop()):
+        stats["sizes"] = matcher.warm_up_sizes(sizes)
+    stats["ms"] = int((time.perf_counter() - t0) * 1000)
+    if log:
+        log(f"[预热] 已缓存 {stats['templates']} 个模板（失败 {stats['failed']}），"
+            f"预热 {stats['sizes']} 种尺寸，耗时 {stats['ms']}ms")
+    return stats
+
+
+def start_background(log: Optional[Callable[[str], None]] = None,
+                     should_stop: Optional[Callable[[], bool]] = None) -> Optional[threading.Thread]:
+    """在守护线程中预热（进程内只执行一次）；已启动则返回 None。"""
+    global _started
+    with _lock:
+        if _started:
+            return None
+        _started = True
+
+    def _run():
+        try:
+            warm_up(log=log, should_stop=should_stop)
+        except Exception as e:
+            if log:
+                log(f"[预热] 异常：{e}")
+
+    thr = threading.Thread(target=_run, name="TemplateWarmup", daemon=True)
+    thr.start()
+    return thr
@@ -1,13 +1,64 @@
-from .init_to_wild import run_init_to_wild
-from .sweep_army import run_sweep_army
-from .sweep_fort import run_sweep_fort
-from .sweep_hunt import run_sweep_hunt
-from .withdraw_troops import run_withdraw_troops
-
-__all__ = [
-    "run_init_to_wild",
-    "run_sweep_army", 
-    "run_sweep_fort",
-    "run_sweep_hunt",
-    "run_withdraw_troops",
-]
+"""
+任务注册表：仅登记“入口名 → 所在模块”，首次访问时才导入任务模块本体。
+UI 构建阶段只引用本包，不会连带导入各任务实现及其依赖（cv2/numpy 等）。
+
+用法：
+    from mumu_adb_controller.ui import tasks
+    tasks.run_sweep_army(...)        # 首次调用时导入 sweep_army
+"""
+import importlib
+from typing import Any, Dict
+
+# 入口名 -> 模块名（相对本包）
+_REGISTRY: Dict[str, str] = {
+    "run_init_to_wild": "init_to_wild",
+    "run_sweep_army": "sweep_army",
+    "run_sweep_city": "sweep_city",
+    "run_sweep_fort": "sweep_fort",
+    "run_sweep_hunt": "sweep_hunt",
+    "run_withdraw_troops": "withdraw_troops",
+    "run_auto_garrison": "auto_garrison",
+    "run_close_alliance_help": "auto_garrison",
+    "run_open_alliance_help": "auto_garrison",
+    "run_emergency_heal": "emergency_heal",
+    "run_init_heal": "init_heal",
+    "run_ranshuang_mode": "ranshuang_mode",
+    "run_auto_like": "auto_like",
+    "run_fast_join_rally": "fast_join_rally",
+    "run_promote_rank4": "promote_rank4",
+    "run_build_flag": "build_flag",
+    "run_bear_mode": "bear_mode",
+    "BearOptions": "bear_mode",
+    "run_attack_resources": "attack_resources",
+    "parse_coords_text": "attack_resources",
+    "plan_targets": "attack_planner",
+    "AttackStats": "attack_planner",
+    "run_offline_monitor": "offline_monitor",
+}
+
+
+def registered() -> Dict[str, str]:
+    """返回已登记的入口（入口名 -> 模块名）副本。"""
+    return dict(_REGISTRY)
+
+
+def get_task(name: str) -> Any:
+    """按入口名取任务对象；首次访问时导入对应模块并缓存到本包命名空间。"""
+    mod_name = _REGISTRY.get(name)
+    if mod_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    mod = importlib.import_module(f".{mod_name}", __name__)
+    value = getattr(mod, name)
+    globals()[name] = value
+    return value
+
+
+def __getattr__(name: str) -> Any:
+    return get_task(name)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_REGISTRY))
+
+
+__all__ = sorted(_REGISTRY)
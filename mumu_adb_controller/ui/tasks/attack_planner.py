@@ -0,0 +1,146 @@
+# mumu_adb_controller/ui/tasks/attack_planner.py
+"""
+打资源多设备规划：
+- 分配：坐标按攻击轮次（每轮一次出征）从多到少依次分给当前负载最小的设备（LPT），
+  负载相同时优先分给离该设备主城（attack_origins 配置，可缺省）更近的；
+  各设备的总轮次接近，处理速度随设备数线性增长；
+- 路线：每台设备从主城（未知时从离其余坐标最近的点）出发按最近邻排序，再做 2-opt 改进，
+  减少相邻坐标之间的地图移动距离；
+- 执行：各设备独立运行 run_attack_resources(..., pipeline=True)，
+  最后一轮出征后不等归位，先导航到下一坐标，出征前再等队列空出；
+- 统计：AttackStats 记录每个坐标的完成时刻与耗时，输出单设备/全体的每小时处理数。
+"""
+import math
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+Target = Tuple[int, int, str, int]  # (x, y, 备注名, 轮次)，与 parse_coords_text 一致
+Point = Tuple[float, float]
+
+MAX_2OPT_PASSES = 20  # 2-opt 最多扫描轮数（通常几轮内收敛）
+
+
+def _dist(a: Point, b: Point) -> float:
+    return math.hypot(a[0] - b[0], a[1] - b[1])
+
+
+def parse_origin(text: str) -> Optional[Point]:
+    """"x:y" -> (x, y)；格式不对返回 None。"""
+    try:
+        xs, ys = str(text).split(":")[:2]
+        return (float(xs), float(ys))
+    except Exception:
+        return None
+
+
+def route_length(targets: Sequence[Target], origin: Optional[Point] = None) -> float:
+    pts = [(t[0], t[1]) for t in targets]
+    if origin is not None:
+        pts = [origin] + pts
+    return sum(_dist(pts[i], pts[i + 1]) for i in range(len(pts) - 1))
+
+
+def order_route(targets: Sequence[Target], origin: Optional[Point] = None) -> List[Target]:
+    """最近邻 + 2-opt（开放路径，起点固定为 origin 或最近邻得到的首个坐标）。"""
+    rest = list(targets)
+    if len(rest) <= 1:
+        return rest
+    if origin is None:
+        # 从最“中心”的坐标出发
+        start = min(rest, key=lambda t: sum(_dist((t[0], t[1]), (u[0], u[1])) for u in rest))
+        route = [start]
+        rest.remove(start)
+        cur: Point = (start[0], start[1])
+    else:
+        route = []
+        cur = origin
+    while rest:
+        nxt = min(rest, key=lambda t: _dist(cur, (t[0], t[1])))
+        route.append(nxt)
+        rest.remove(nxt)
+        cur = (nxt[0], nxt[1])
+
+    # 2-opt：翻转区间 [i, j] 只改变两端的两条边，按边长差判断是否更短（起点固定不动）
+    seq: List[Optional[Target]] = ([None] if origin is not None else []) + route
+    pts = [origin if t is None else (t[0], t[1]) for t in seq]
+    n = len(seq)
+    for _ in range(MAX_2OPT_PASSES):
+        improved = False
+        for i in range(1, n - 1):
+            a, b = pts[i - 1], pts[i]
+            for j in range(i + 1, n):
+                c = pts[j]
+                before = _dist(a, b)
+                after = _dist(a, c)
+                if j + 1 < n:  # 开放路径：翻转到末尾时没有后继边
+                    d = pts[j + 1]
+                    before += _dist(c, d)
+                    after += _dist(b, d)
+                if after + 1e-9 < before:
+                    seq[i:j + 1] = seq[i:j + 1][::-1]
+                    pts[i:j + 1] = pts[i:j + 1][::-1]
+                    b = pts[i]
+                    improved = True
+        if not improved:
+            break
+    return [t for t in seq if t is not None]
+
+
+def plan_targets(coords: Sequence[Target], serials: Sequence[str],
+                 origins: Optional[Dict[str, Point]] = None) -> Dict[str, List[Target]]:
+    """把坐标分配给各设备并排好路线：返回 {serial: [target, ...]}（无坐标的设备也有空列表）。"""
+    serials = list(dict.fromkeys(serials))
+    plan: Dict[str, List[Target]] = {s: [] for s in serials}
+    if not serials:
+        return plan
+    origins = origins or {}
+    load = {s: 0 for s in serials}
+    for t in sorted(coords, key=lambda t: -max(1, int(t[3]))):
+        def key(s):
+            o = origins.get(s)
+            return (load[s], _dist(o, (t[0], t[1])) if o is not None else 0.0, serials.index(s))
+        s = min(serials, key=key)
+        plan[s].append(t)
+        load[s] += max(1, int(t[3]))
+    return {s: order_route(ts, origins.get(s)) for s, ts in plan.items()}
+
+
+class AttackStats:
+    """多设备打资源的完成统计（线程安全，各设备任务共用一个实例）。"""
+
+    def __init__(self, log: Optional[Callable[[str], None]] = None):
+        self.log = log
+        self.t0 = time.time()
+        self._lock = threading.Lock()
+        self._done: Dict[str, List[Tuple[str, float]]] = {}  # serial -> [(name, 耗时秒)]
+        self._started: Dict[str, float] = {}
+
+    def begin(self, serial: str) -> None:
+        with self._lock:
+            self._started.setdefault(serial, time.time())
+            self._done.setdefault(serial, [])
+
+    def record(self, serial: str, name: str, seconds: float) -> None:
+        with self._lock:
+            self._done.setdefault(serial, []).append((name, float(seconds)))
+
+    def per_hour(self, serial: Optional[str] = None) -> float:
+        """每小时处理坐标数：serial=None 为全体（按第一台开始起算）。"""
+        with self._lock:
+            if serial is None:
+                n = sum(len(v) for v in self._done.values())
+                start = min(self._started.values()) if self._started else self.t0
+            else:
+                n = len(self._done.get(serial, []))
+                start = self._started.get(serial, self.t0)
+        elapsed = max(1.0, time.time() - start)
+        return n * 3600.0 / elapsed
+
+    def summary(self, serial: str) -> str:
+        with self._lock:
+            items = list(self._done.get(serial, []))
+            total = sum(len(v) for v in self._done.values())
+        avg = sum(s for _, s in items) / len(items) if items else 0.0
+        return (f"[PLAN] 本设备完成 {len(items)} 个坐标（平均 {avg:.0f}s/个，{self.per_hour(serial):.1f} 个/小时）；"
+                f"全体累计 {total} 个（{self.per_hour():.1f} 个/小时）")
@@ -1,7 +1,7 @@
 # mumu_adb_controller/ui/tasks/attack_resources.py
 import os, sys, time
 from typing import Callable, Optional, List, Tuple
-from ..helpers import matcher
+from ..helpers import atlas, matcher, pacing
 from .init_to_wild import build_paths as build_init_paths
 
 # ---------- 冻结安全的资源定位 ----------
@@ -93,12 +93,14 @@ def _tap_chuzheng_red(app, serial, log: Callable[[str], None], name: str, primar
     if png is None:
         log(f"[{name}] 截图失败")
         return False
-    ok1, pos1, sc1 = matcher.match_one_detail(png, IMG_CHUZHENG_RED, threshold=thr1)
+    # 两个模板同帧一次 DFT 出分（图集），结果与逐个 match_one_detail 一致
+    res = atlas.match_group(png, [IMG_CHUZHENG_RED, IMG_CHUZHENG_RED2], threshold=[thr1, thr2])
+    ok1, pos1, sc1 = res[IMG_CHUZHENG_RED]
     if ok1:
         _tap(app, serial, pos1[0], pos1[1])
         log(f"[{name}] 命中 chuzheng_red.png score={sc1:.3f}>=thr={thr1:.2f} → tap({pos1[0]},{pos1[1]})")
         return True
-    ok2, pos2, sc2 = matcher.match_one_detail(png, IMG_CHUZHENG_RED2, threshold=thr2)
+    ok2, pos2, sc2 = res[IMG_CHUZHENG_RED2]
     if ok2:
         _tap(app, serial, pos2[0], pos2[1])
         log(f"[{name}] 备选命中 chuzheng_red2.png score={sc2:.3f}>=thr={thr2:.2f} → tap({pos2[0]},{pos2[1]})")
@@ -209,23 +211,27 @@ def wait_until_queue_clears(app, serial: str, log: Callable[[str], None], should
         if _sleep_check_pause(app, should_stop, interval_sec):
             return "stopped"
 
-    # 轮询直到目标消失
-    while not should_stop():
-        if time.time() - start_ts > max_wait_sec:
-            log("[QUEUE] 等待队列归位超时（>180s）")
-            return "timeout"
-        png = _screencap(app, serial)
-        if png is None:
-            log("[QUEUE] 截图失败，继续等待…")
-        else:
-            found, pos = matcher.match_in_range(png, target_img, ((x1, y1), (x2, y2)), threshold=threshold)
-            in_roi = found
-            log(f"[QUEUE] 监测 {target_name}={in_roi}@{pos} roi=({x1},{y1})-({x2},{y2})")
-            if not in_roi:
-                log("[QUEUE] 目标图已消失，判定军队归位")
-                return "cleared"
-        if _sleep_check_pause(app, should_stop, interval_sec):
-            return "stopped"
+    # 轮询直到目标消失（空等：低优先级，按主机负载与等待时长放慢）
+    with pacing.poller(serial, base=interval_sec, priority="low", max_interval=max(interval_sec, 6.0)) as pacer:
+        while not should_stop():
+            if time.time() - start_ts > max_wait_sec:
+                log("[QUEUE] 等待队列归位超时（>180s）")
+                return "timeout"
+            with pacer.measure():
+                png = _screencap(app, serial)
+                found, pos = (matcher.match_in_range(png, target_img, ((x1, y1), (x2, y2)), threshold=threshold)
+                              if png is not None else (False, (0, 0)))
+            if png is None:
+                log("[QUEUE] 截图失败，继续等待…")
+            else:
+                in_roi = found
+                log(f"[QUEUE] 监测 {target_name}={in_roi}@{pos} roi=({x1},{y1})-({x2},{y2})")
+                if not in_roi:
+                    log("[QUEUE] 目标图已消失，判定军队归位")
+                    return "cleared"
+            pacer.miss()
+            if _sleep_check_pause(app, should_stop, pacer.next_interval()):
+                return "stopped"
     return "stopped"
 
 
@@ -236,7 +242,10 @@ def run_attack_resources(app, serial: str,
                          should_stop: Callable[[], bool],
                          threshold: Optional[float] = None,
                          verbose: bool = False,
-                         on_timeout: str = "continue"):
+                         on_timeout: str = "continue",
+                         pipeline: bool = False,
+                         stats=None,
+                         more: Optional[Callable[[], Optional[list]]] = None):
     """
     危险操作：仅当前设备。坐标序列 [(x,y,name,rounds), ...]
     步骤：
@@ -246,94 +255,129 @@ def run_attack_resources(app, serial: str,
       4) 若还需更多轮：在 ROI 内等待 full_queue5/6 消失后，再次执行攻击轮
       5) 切换到下一个坐标，重复 1）-4）
     选项 on_timeout："continue"（继续本坐标）、"skip"（跳过本坐标）、"abort"（终止任务）
+    pipeline=True（多设备规划使用）：最后一轮出征后不等军队归位，先导航到下一坐标，
+    到达后再等队列空出才出征，导航与行军重叠。
+    more：流水线下最后一个坐标打完时调用，返回追加的坐标（如共享队列中同一批的下一段），
+    使流水线跨段不中断；返回空则照常等待归位后结束。
+    stats：attack_planner.AttackStats，记录每个坐标的完成耗时。
     """
     thr = matcher.THRESH if threshold is None else float(threshold)
+    roi = (174, 181, 259, 233)
 
     toast("开始打资源（危险操作）")
-    log("[ATTACK] 启动：打资源（仅当前设备）")
-
-    for idx, (x, y, name, rounds) in enumerate(coords, start=1):
-        if should_stop():
-            break
-        log("=" * 48)
-        log(f"[ATTACK] 第{idx}组：坐标=({x},{y}) 备注={name} 轮数={rounds}")
+    log("[ATTACK] 启动：打资源（仅当前设备）" + ("，流水线导航" if pipeline else ""))
+    if stats is not None:
+        stats.begin(serial)
 
-        # Step 1：回到野外
-        if not ensure_wild(app, serial, toast, log, threshold=thr, verbose=verbose):
-            log(f"[ATTACK] 坐标{name}：无法进入野外，跳过")
-            continue
-
-        # Step 3：前往城镇并输入坐标（加速与速度因子兼容）
-        if should_stop():
-            break
+    def _speed() -> float:
         # 读取速度因子（与其他任务一致：sec * speed）
         try:
-            speed = float(getattr(app, "get_speed_factor", lambda: 1.0)())
+            return float(getattr(app, "get_speed_factor", lambda: 1.0)())
         except Exception:
-            speed = 1.0
-        log(f"[STEP3] 速度因子 speed={speed:.2f}")
-        def _wait(sec: float) -> bool:
-            return _sleep_check(should_stop, max(0.0, sec) * speed)
+            return 1.0
 
+    def _wait(sec: float) -> bool:
+        return _sleep_check(should_stop, max(0.0, sec) * _speed())
+
+    def _navigate(x: int, y: int) -> bool:
+        """Step 3：前往城镇并输入坐标（加速与速度因子兼容）；返回 True 表示收到停止。"""
+        log(f"[STEP3] 速度因子 speed={_speed():.2f}")
         log("[STEP3] 点击(326,1064) 打开坐标面板")
         _tap(app, serial, 326, 1064)
         if _wait(0.25):  # 原 0.5
-            break
+            return True
         log("[STEP3] 点击(246,618) 聚焦 X 输入框")
         _tap(app, serial, 246, 618)
         if _wait(0.12):  # 原 0.2
-            break
+            return True
         for _ in range(5):
             if should_stop():
-                break
+                return True
             app.adb.input_keyevent(serial, 67)  # DEL
             if _wait(0.05):
-                break
+                return True
         log(f"[STEP3] 输入 X={x}")
         app.adb.input_text(serial, str(x))
         if _wait(0.12):  # 原 0.2
-            break
+            return True
         log("[STEP3] 点击(512,618) 聚焦 Y 输入框")
         _tap(app, serial, 512, 618)
         if _wait(0.12):  # 原 0.2
-            break
+            return True
         for _ in range(5):
             if should_stop():
-                break
+                return True
             app.adb.input_keyevent(serial, 67)
             if _wait(0.05):
-                break
+                return True
         log(f"[STEP3] 输入 Y={y}")
         app.adb.input_text(serial, str(y))
         if _wait(0.12):  # 原 0.2
-            break
+            return True
         # 点击 goto（tap_if_found 内含详细日志）
         _tap_if_found(app, serial, IMG_GOTO, log, "GOTO", threshold=thr)
         if _wait(0.15):  # 原 0.3
-            break
+            return True
         log("[STEP3] 点击(359,558) 展开目标信息面板")
         _tap(app, serial, 359, 558)
-        if _wait(0.15):  # 原 0.3
-            break
+        return _wait(0.15)  # 原 0.3
 
-        # Step 4：第1轮攻击（固定6次）
-        cur_round = 0
-        log("[ROUND1] 开始第1轮（6次）")
+    def _attack_round(label: str) -> bool:
+        """一轮攻击（固定6次：点空地 → 红出征 → 蓝出征）；返回 True 表示收到停止。"""
         for i in range(6):
             if should_stop():
-                break
-            log(f"[ROUND1] {i+1}/6: 点空地(359,558)")
+                return True
+            log(f"[{label}] {i+1}/6: 点空地(359,558)")
             _tap(app, serial, 359, 558)
             if _wait(0.15):  # 原 0.3
-                break
-            if _tap_chuzheng_red(app, serial, log, name=f"ROUND-red[{i+1}/6]", primary_threshold=thr):
+                return True
+            if _tap_chuzheng_red(app, serial, log, name=f"{label}-red[{i+1}/6]", primary_threshold=thr):
                 if _sleep_check_pause(app, should_stop, 0.2):
-                    break
+                    return True
             if _wait(0.15):
-                break
-            _tap_if_found(app, serial, IMG_CHUZHENG_BLUE_2, log, f"ROUND-blue2[{i+1}/6]", threshold=thr)
+                return True
+            _tap_if_found(app, serial, IMG_CHUZHENG_BLUE_2, log, f"{label}-blue2[{i+1}/6]", threshold=thr)
+            if _wait(0.15):
+                return True
+        return False
+
+    coords = list(coords)
+    navigated = 0  # 流水线：已预先导航到的坐标序号
+    for idx, (x, y, name, rounds) in enumerate(coords, start=1):
+        if should_stop():
+            break
+        t_start = time.time()
+        log("=" * 48)
+        log(f"[ATTACK] 第{idx}组：坐标=({x},{y}) 备注={name} 轮数={rounds}")
+
+        if navigated == idx:
+            # 上一坐标行军期间已导航到这里：出征前等队列空出
+            log("[PIPE] 已在上一坐标行军期间导航到本坐标，等待队列空出…")
+            res = wait_until_queue_clears(app, serial, log, should_stop, roi=roi, interval_sec=2.0, threshold=0.95)
+            if res == "stopped":
+                log("[ATTACK] 收到停止信号，终止本任务")
+                return
+            if res == "timeout" and on_timeout == "abort":
+                log("[ATTACK] 等待超时：终止本任务")
+                return
+            # 等待期间界面可能被收起，重新展开目标信息面板
+            _tap(app, serial, 359, 558)
             if _wait(0.15):
                 break
+        else:
+            # Step 1：回到野外
+            if not ensure_wild(app, serial, toast, log, threshold=thr, verbose=verbose):
+                log(f"[ATTACK] 坐标{name}：无法进入野外，跳过")
+                continue
+            if should_stop():
+                break
+            if _navigate(x, y):
+                break
+
+        # Step 4：第1轮攻击（固定6次）
+        cur_round = 0
+        log("[ROUND1] 开始第1轮（6次）")
+        _attack_round("ROUND1")
         # 额外：本轮结束后等待0.2s（受速度因子影响）
         if _wait(0.2):
             break
@@ -356,7 +400,6 @@ def run_attack_resources(app, serial: str,
             log(f"[ROUND1] 检查 goto_search.png 时异常：{e}，继续后续流程")
 
         # Step 5：循环剩余轮数
-        roi = (174, 181, 259, 233)
         while cur_round < rounds:
             log(f"[ATTACK] 等待队列清空…（第{cur_round}/{rounds}轮后）")
             res = wait_until_queue_clears(app, serial, log, should_stop, roi=roi, interval_sec=2.0, threshold=0.95)
@@ -375,27 +418,36 @@ def run_attack_resources(app, serial: str,
                 log("[ATTACK] 等待超时：继续本坐标执行下一轮攻击")
             # 再执行一轮攻击
             log(f"[ATTACK] 执行第{cur_round+1}轮攻击（6次点击）…")
-            for i in range(6):
-                if should_stop():
-                    break
-                log(f"[ROUND{cur_round+1}] {i+1}/6: 点空地(359,558)")
-                _tap(app, serial, 359, 558)
-                if _wait(0.15):
-                    break
-                if _tap_chuzheng_red(app, serial, log, name=f"ROUND-red[{cur_round+1}-{i+1}/6]", primary_threshold=thr):
-                    if _sleep_check_pause(app, should_stop, 0.2):
-                        break
-                if _wait(0.15):
-                    break
-                _tap_if_found(app, serial, IMG_CHUZHENG_BLUE_2, log, f"ROUND-blue2[{cur_round+1}-{i+1}/6]", threshold=thr)
-                if _wait(0.15):
-                    break
+            _attack_round(f"ROUND{cur_round+1}")
             cur_round += 1
 
+        if stats is not None:
+            stats.record(serial, name, time.time() - t_start)
+
+        # Step 6（流水线）：最后一轮行军途中直接导航到下一坐标，归位等待挪到下一坐标出征前
+        if pipeline and more is not None and idx == len(coords) and not should_stop():
+            try:
+                extra = more() or []
+            except Exception as e:
+                log(f"[PIPE] 获取后续坐标失败：{e}")
+                extra = []
+            if extra:
+                log("[PIPE] 接续后续坐标：" + " → ".join(n for (_, _, n, _) in extra))
+                coords.extend(extra)
+        if pipeline and idx < len(coords) and not should_stop():
+            nx, ny, nname, _ = coords[idx]
+            log(f"[PIPE] 行军途中预先导航到下一坐标 {nname}({nx},{ny})")
+            if ensure_wild(app, serial, toast, log, threshold=thr, verbose=verbose):
+                if _navigate(nx, ny):
+                    break
+                navigated = idx + 1
+                continue
+            # 未能预先导航：下一坐标走常规路径（不再等队列），因此在这里补上归位等待
+            log("[PIPE] 无法进入野外，未预先导航；改为先等待军队归位")
+
         # Step 6：在切换到下一个坐标前，确保最后一轮也已“军队归位”
         try:
             log("[ATTACK] 本坐标所有轮次完成，最后等待军队归位后再切换下一坐标…")
-            roi = (174, 181, 259, 233)
             res_final = wait_until_queue_clears(app, serial, log, should_stop, roi=roi, interval_sec=2.0, threshold=0.95)
             if res_final == "stopped":
                 log("[ATTACK] 收到停止信号，终止本任务"); return
@@ -407,6 +459,7 @@ def run_attack_resources(app, serial: str,
         except Exception as e:
             log(f"[ATTACK] 最终等待归位时发生异常：{e}")
 
+    if stats is not None:
+        log(stats.summary(serial))
     toast("打资源已结束")
     log("[ATTACK] 结束：打资源")
-
@@ -69,29 +69,10 @@ def _match_one(png, path, thr):
 def _exist(png, path, thr):
     return matcher.exist(png, path, threshold=thr)
 
-# ROI 检测 all_help：在 (89,1020)-(602,1242) 范围内匹配，减少整屏匹配开销
-# 若裁剪失败则回退为整屏检测
+# ROI 检测 all_help：只在 like.all_help 区域（基准 (89,1020)-(602,1242)）内匹配，减少整屏匹配开销
 def _exist_all_help_roi(png, path, thr) -> bool:
-    try:
-        import cv2 as cv
-        import numpy as np
-        arr = np.frombuffer(png, dtype=np.uint8)
-        img = cv.imdecode(arr, cv.IMREAD_COLOR)
-        if img is None:
-            return matcher.exist(png, path, threshold=thr)
-        x1, y1, x2, y2 = 89, 1020, 602, 1242
-        h, w = img.shape[:2]
-        x1 = max(0, min(w, x1)); x2 = max(0, min(w, x2))
-        y1 = max(0, min(h, y1)); y2 = max(0, min(h, y2))
-        if x2 <= x1 or y2 <= y1:
-            return matcher.exist(png, path, threshold=thr)
-        roi = img[y1:y2, x1:x2]
-        ok, buf = cv.imencode('.png', roi)
-        if not ok:
-            return matcher.exist(png, path, threshold=thr)
-        return matcher.exist(buf.tobytes(), path, threshold=thr)
-    except Exception:
-        return matcher.exist(png, path, threshold=thr)
+    ok, _ = matcher.match_in_range(png, path, "like.all_help", threshold=thr)
+    return ok
 
 
 def _tap(app, serial, x, y):
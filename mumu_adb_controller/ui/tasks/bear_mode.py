@@ -7,7 +7,7 @@ import datetime as _dt
 from dataclasses import dataclass
 from typing import Callable, Dict, List, Optional, Tuple
 
-from ..helpers import matcher
+from ..helpers import matcher, pacing, regions, timing
 from .withdraw_troops import run_withdraw_troops
 from .auto_garrison import run_close_alliance_help
 from .init_to_wild import run_init_to_wild
@@ -28,6 +28,7 @@ except Exception:
 P = lambda n: res_path("pic", n)
 SEAT_CANDIDATES: Tuple[Tuple[int, int], ...] = ((68, 120), (142, 116), (218, 115))
 JOIN_THRESHOLD = 0.97
+DEPART_PRESTAGE_SEC = 8.0      # 发车前提前回野外、点熊并打开出征界面，出征点击按预测延迟对准发车时刻
 
 
 @dataclass
@@ -55,6 +56,9 @@ class BearRuntime:
         self.pause_event = getattr(app, "pause_event", None)
         self._head_templates: Optional[List[str]] = None
         self._seat_index = 0
+        self.depart_deadline: Optional[float] = None  # 当前上车循环的发车截止时刻，供轮询提速
+        self.timing = timing.TimingEngine(serial, log=log, should_stop=should_stop,
+                                          coarse_sleep=self._sleep_with_pause)
 
     # ---------- 通用工具 ----------
     def now(self) -> float:
@@ -73,11 +77,8 @@ class BearRuntime:
         return False
 
     def wait_until(self, target_ts: float, label: str = "") -> bool:
-        while self.now() < target_ts:
-            if self.should_stop():
-                return True
-            remaining = max(0.0, target_ts - self.now())
-            self._sleep_with_pause(min(0.5, remaining))
+        if self.timing.wait_until(target_ts):
+            return True
         if label:
             self.log(f"[BEAR] 到达时间点：{label}")
         return False
@@ -87,7 +88,7 @@ class BearRuntime:
         return data if ok and data else None
 
     def _tap(self, x: int, y: int):
-        self.app.adb.input_tap(self.serial, int(x), int(y))
+        self.timing.timed(lambda: self.app.adb.input_tap(self.serial, int(x), int(y)))
 
     def _swipe(self, x1: int, y1: int, x2: int, y2: int, duration: int = 600):
         self.app.adb.input_swipe(self.serial, x1, y1, x2, y2, duration)
@@ -116,14 +117,8 @@ class BearRuntime:
     def _load_head_templates(self) -> List[str]:
         if self._head_templates is not None:
             return self._head_templates
-        base = res_path("pic", "head")
-        files: List[str] = []
-        if os.path.isdir(base):
-            for name in sorted(os.listdir(base)):
-                if name.lower().endswith(".png"):
-                    files.append(os.path.join(base, name))
-        self._head_templates = files
-        return files
+        self._head_templates = _head_template_paths()
+        return self._head_templates
 
     # ---------- 上车座位选择 ----------
     def pick_seat(self) -> Tuple[int, int]:
@@ -141,20 +136,32 @@ class BearRuntime:
         return seat
 
 
+def _head_template_paths() -> List[str]:
+    base = res_path("pic", "head")
+    files: List[str] = []
+    if os.path.isdir(base):
+        for name in sorted(os.listdir(base)):
+            if name.lower().endswith(".png"):
+                files.append(os.path.join(base, name))
+    return files
+
+
+_REQUIRED_KEYS = (
+    "xiong", "xiong_jijie", "faqijijie", "chuzheng_blue_2", "alliance",
+    "alliance_war", "alliance_war2", "join", "small_join", "jijie_inside", "goto_search",
+)
+
+
+def build_paths() -> Dict[str, object]:
+    """打熊用到的模板路径（冻结安全）；head_list 为车头模板目录下的全部 png。"""
+    paths: Dict[str, object] = {k: P(f"{k}.png") for k in _REQUIRED_KEYS}
+    paths["head_list"] = _head_template_paths()
+    return paths
+
+
 def _check_required_templates(options: BearOptions) -> Tuple[bool, List[str]]:
-    required = [
-        P("xiong.png"),
-        P("xiong_jijie.png"),
-        P("faqijijie.png"),
-        P("chuzheng_blue_2.png"),
-        P("alliance.png"),
-        P("alliance_war.png"),
-        P("alliance_war2.png"),
-        P("join.png"),
-        P("small_join.png"),
-        P("jijie_inside.png"),
-        P("goto_search.png"),
-    ]
+    paths = build_paths()
+    required = [paths[k] for k in _REQUIRED_KEYS]
     missing = [p for p in required if not os.path.isfile(p)]
     return (len(missing) == 0, missing)
 
@@ -165,17 +172,20 @@ def _match_one(png: bytes, path: str, thr: float):
 
 def _wait_for_image(ctx: BearRuntime, path: str, timeout: float, interval: float, label: str) -> Tuple[bool, Tuple[int, int]]:
     deadline = ctx.now() + timeout
-    while ctx.now() <= deadline:
-        if ctx.should_stop():
-            return False, (0, 0)
-        png = ctx._screencap()
-        if png:
-            ok, pos = _match_one(png, path, ctx.threshold)
+    with pacing.poller(ctx.serial, base=interval, priority="high") as pacer:
+        pacer.deadline = ctx.depart_deadline
+        while ctx.now() <= deadline:
+            if ctx.should_stop():
+                return False, (0, 0)
+            with pacer.measure():
+                png = ctx._screencap()
+                ok, pos = _match_one(png, path, ctx.threshold) if png else (False, (0, 0))
             if ok:
                 ctx.log(f"[BEAR] 找到 {label} @ {pos}")
                 return True, pos
-        if ctx._sleep_with_pause(interval):
-            return False, (0, 0)
+            pacer.miss()
+            if ctx._sleep_with_pause(pacer.next_interval()):
+                return False, (0, 0)
     ctx.log(f"[BEAR] 等待 {label} 超时")
     return False, (0, 0)
 
@@ -232,7 +242,13 @@ def _locate_xiong(ctx: BearRuntime, max_attempts: int = 5) -> Optional[Tuple[int
     return None
 
 
-def _execute_send_sequence(ctx: BearRuntime, initial_pos: Optional[Tuple[int, int]] = None) -> bool:
+def _execute_send_sequence(ctx: BearRuntime, at: float,
+                           initial_pos: Optional[Tuple[int, int]] = None) -> bool:
+    """
+    点熊 → 熊集结 → 发起集结 → 出征。
+    前面各步提前做完，停在出征确认界面，出征这一下（真正发出行军）由 run_at 对准 at。
+    各设备按同一时刻各自对准，不经 fleet_sync 汇合（汇合等待会计入注入延迟统计）。
+    """
     pos = initial_pos if initial_pos is not None else _locate_xiong(ctx)
     if pos is None:
         return False
@@ -258,13 +274,21 @@ def _execute_send_sequence(ctx: BearRuntime, initial_pos: Optional[Tuple[int, in
     if not png:
         ctx.log("[BEAR] 出征确认界面截图失败")
         return False
-    if not _click_template(ctx, png, P("chuzheng_blue_2.png"), "出征按钮"):
+    ok, bpos = _match_one(png, P("chuzheng_blue_2.png"), ctx.threshold)
+    if not ok:
         ctx.log("[BEAR] 未找到出征按钮")
         return False
-    return True
+    bx, by = bpos
+    ctx.log(f"[BEAR] 出征按钮 @ ({bx}, {by})，等待发车时刻 {_dt.datetime.fromtimestamp(at).strftime('%H:%M:%S')}")
+    err = ctx.timing.run_at(at, lambda: ctx.app.adb.input_tap(ctx.serial, int(bx), int(by)), label="发车出征")
+    return err is not None
 
 
-def _perform_send_cycle(ctx: BearRuntime, end_ts: float) -> Tuple[str, Optional[float]]:
+def _perform_send_cycle(ctx: BearRuntime, end_ts: float, at: float) -> Tuple[str, Optional[float]]:
+    """
+    提前回野外、点熊并打开出征确认界面，把最后的出征点击对准 at（扣除预测的注入延迟）；
+    因此调用方需在 at 之前至少 DEPART_PRESTAGE_SEC 秒开始。
+    """
     ctx.log("[BEAR] 发车流程启动")
     ctx.ensure_in_wild()
     first_pos = _locate_xiong(ctx)
@@ -277,7 +301,10 @@ def _perform_send_cycle(ctx: BearRuntime, end_ts: float) -> Tuple[str, Optional[
         if attempt > 0:
             ctx.log(f"[BEAR] 发车重试第 {attempt + 1} 次")
             ctx.ensure_in_wild()
-        success = _execute_send_sequence(ctx, initial_pos=first_pos if attempt == 0 else None)
+        success = _execute_send_sequence(ctx, max(at, ctx.now()),
+                                          initial_pos=first_pos if attempt == 0 else None)
+        if ctx.should_stop():
+            return "stopped", None
         if success:
             ctx.log("[BEAR] 发车完成")
             return "success", None
@@ -360,10 +387,9 @@ def _process_head_once(ctx: BearRuntime, depart_deadline: Optional[float]) -> Tu
             ok, (x, y) = _match_one(png, tpl, ctx.threshold)
             if ok:
                 ctx.log(f"[BEAR] 匹配到头部 {os.path.basename(tpl)} @ ({x},{y})")
-                # 在头部附近的 ROI 内（x..x+720, y..y+240）直接裁剪后匹配 join.png
-                roi_x1, roi_y1 = x, y
-                roi_x2, roi_y2 = x + 720, y + 240
-                join_ok, join_pos = matcher.match_in_range(png, P("join.png"), ((roi_x1, roi_y1), (roi_x2, roi_y2)), threshold=join_thr)
+                # 在头部附近的 ROI 内（以头部为原点的 bear.join_near_head，基准 720x240）匹配 join.png
+                join_roi = regions.around((x, y), "bear.join_near_head", regions.png_size(png))
+                join_ok, join_pos = matcher.match_in_range(png, P("join.png"), join_roi, threshold=join_thr)
                 if join_ok:
                     jx, jy = join_pos
                     ctx.log(f"[BEAR] 在头部附近检测到 join.png @ {join_pos}，直接点击")
@@ -413,6 +439,7 @@ def _process_head_once(ctx: BearRuntime, depart_deadline: Optional[float]) -> Tu
 
 
 def _run_join_cycle(ctx: BearRuntime, end_ts: float, depart_deadline: Optional[float]) -> str:
+    ctx.depart_deadline = depart_deadline
     stage = _ensure_alliance_war(ctx, depart_deadline)
     if stage == "depart_due":
         return "depart_due"
@@ -532,6 +559,8 @@ def run_bear_mode(app, serial: str,
 
     if not options.send_car:
         ctx.log("[BEAR] 配置为只上车，提前进入联盟界面")
+    else:
+        ctx.timing.calibrate(app.adb)
     ctx.ensure_in_wild()
 
     end_ts = end_dt.timestamp()
@@ -539,12 +568,15 @@ def run_bear_mode(app, serial: str,
     # 判断是否使用新版固定车头逻辑
     use_new_fixed_logic = (options.head_mode == "fixed")
 
-    if use_new_fixed_logic:
-        ctx.log("[BEAR] 使用新版固定车头逻辑")
-        _run_new_fixed_bear_mode(ctx, target_dt, end_ts, options)
-    else:
-        ctx.log("[BEAR] 使用随机上车逻辑")
-        _run_random_bear_mode(ctx, target_dt, end_ts, options)
+    try:
+        if use_new_fixed_logic:
+            ctx.log("[BEAR] 使用新版固定车头逻辑")
+            _run_new_fixed_bear_mode(ctx, target_dt, end_ts, options)
+        else:
+            ctx.log("[BEAR] 使用随机上车逻辑")
+            _run_random_bear_mode(ctx, target_dt, end_ts, options)
+    finally:
+        ctx.timing.report()
 
     toast("打熊模式已完成")
     log("[BEAR] 打熊模式结束（达到结束时间或收到停止指令）")
@@ -554,12 +586,15 @@ def _run_random_bear_mode(ctx: BearRuntime, target_dt: _dt.datetime, end_ts: flo
     """随机上车模式（原逻辑不变）"""
     depart_deadline = target_dt.timestamp() if options.send_car else None
 
+    def _stage(deadline: Optional[float]) -> Optional[float]:
+        return deadline - DEPART_PRESTAGE_SEC if deadline else None
+
     if options.send_car:
-        if ctx.wait_until(target_dt.timestamp(), label="开打时间"):
+        if ctx.wait_until(_stage(depart_deadline), label="开打前准备发车"):
             return
         if ctx.should_stop():
             return
-        status, wait_next = _perform_send_cycle(ctx, end_ts)
+        status, wait_next = _perform_send_cycle(ctx, end_ts, at=depart_deadline)
         if status == "success":
             depart_deadline = ctx.now() + options.interval_sec
         elif status == "retry":
@@ -570,8 +605,8 @@ def _run_random_bear_mode(ctx: BearRuntime, target_dt: _dt.datetime, end_ts: flo
             return
 
     while not ctx.should_stop() and ctx.now() < end_ts:
-        if options.send_car and depart_deadline and ctx.now() >= depart_deadline:
-            status, wait_next = _perform_send_cycle(ctx, end_ts)
+        if options.send_car and depart_deadline and ctx.now() >= _stage(depart_deadline):
+            status, wait_next = _perform_send_cycle(ctx, end_ts, at=max(depart_deadline, ctx.now()))
             if status == "success":
                 depart_deadline = ctx.now() + options.interval_sec
                 continue
@@ -583,7 +618,7 @@ def _run_random_bear_mode(ctx: BearRuntime, target_dt: _dt.datetime, end_ts: flo
                 continue
             return
 
-        result = _run_join_cycle(ctx, end_ts, depart_deadline)
+        result = _run_join_cycle(ctx, end_ts, _stage(depart_deadline))
         if result == "depart_due":
             continue
         if result == "stopped":
@@ -594,7 +629,7 @@ def _run_random_bear_mode(ctx: BearRuntime, target_dt: _dt.datetime, end_ts: flo
         if result == "idle":
             wait_window = 2.0
             if options.send_car and depart_deadline:
-                wait_window = min(wait_window, max(0.5, depart_deadline - ctx.now()))
+                wait_window = min(wait_window, max(0.5, _stage(depart_deadline) - ctx.now()))
             ctx._sleep_with_pause(wait_window)
 
 
@@ -618,15 +653,16 @@ def _run_new_fixed_bear_mode(ctx: BearRuntime, target_dt: _dt.datetime, end_ts:
     if ctx.wait_until(target_dt.timestamp(), label="开打时间"):
         return
 
-    # 2.1 发车前的上车流程
+    # 2.1 发车前的上车流程（提前 DEPART_PRESTAGE_SEC 秒停止，留给回野外、点熊并打开出征界面）
     ctx.log("[BEAR] 开始发车前上车流程")
-    while not ctx.should_stop() and ctx.now() < first_depart_time:
+    first_stage = first_depart_time - DEPART_PRESTAGE_SEC
+    while not ctx.should_stop() and ctx.now() < first_stage:
         remaining = first_depart_time - ctx.now()
         if remaining <= 0:
             break
 
         ctx.log(f"[BEAR] 距离首次发车还有 {remaining:.1f} 秒")
-        result = _run_fixed_join_cycle(ctx, first_depart_time, first_depart_time)
+        result = _run_fixed_join_cycle(ctx, first_stage, first_stage)
 
         if result == "depart_due":
             ctx.log("[BEAR] 到达首次发车时间，停止上车")
@@ -635,7 +671,7 @@ def _run_new_fixed_bear_mode(ctx: BearRuntime, target_dt: _dt.datetime, end_ts:
             return
         if result == "idle":
             # 等待一小段时间后继续
-            wait_time = min(1.0, first_depart_time - ctx.now())
+            wait_time = min(1.0, first_stage - ctx.now())
             if wait_time > 0:
                 ctx._sleep_with_pause(wait_time)
 
@@ -644,7 +680,7 @@ def _run_new_fixed_bear_mode(ctx: BearRuntime, target_dt: _dt.datetime, end_ts:
         return
 
     ctx.log("[BEAR] 执行首次发车")
-    status, _ = _perform_send_cycle(ctx, end_ts)
+    status, _ = _perform_send_cycle(ctx, end_ts, at=max(first_depart_time, ctx.now()))
 
     if status not in {"success", "skip"}:
         ctx.log("[BEAR] 首次发车失败，继续上车流程")
@@ -656,16 +692,17 @@ def _run_new_fixed_bear_mode(ctx: BearRuntime, target_dt: _dt.datetime, end_ts:
 
     # 2.2 主循环：上车 + 定时发车
     while not ctx.should_stop() and ctx.now() < end_ts:
-        # 检查是否到达发车时间
-        if ctx.now() >= next_depart_deadline:
-            ctx.log("[BEAR] 到达发车时间，执行初始化到野外")
+        # 检查是否到达发车准备时间
+        next_stage = next_depart_deadline - DEPART_PRESTAGE_SEC
+        if ctx.now() >= next_stage:
+            ctx.log("[BEAR] 到达发车准备时间，执行初始化到野外")
             ctx.ensure_in_wild()
 
             if ctx.should_stop() or ctx.now() >= end_ts:
                 return
 
             ctx.log("[BEAR] 执行定时发车")
-            status, _ = _perform_send_cycle(ctx, end_ts)
+            status, _ = _perform_send_cycle(ctx, end_ts, at=max(next_depart_deadline, ctx.now()))
 
             # 更新下次发车时间
             last_depart_time = ctx.now()
@@ -674,7 +711,7 @@ def _run_new_fixed_bear_mode(ctx: BearRuntime, target_dt: _dt.datetime, end_ts:
             continue
 
         # 执行上车流程
-        result = _run_fixed_join_cycle(ctx, end_ts, next_depart_deadline)
+        result = _run_fixed_join_cycle(ctx, end_ts, next_stage)
 
         if result == "depart_due":
             # 到达发车时间，回到循环开始处理发车
@@ -683,7 +720,7 @@ def _run_new_fixed_bear_mode(ctx: BearRuntime, target_dt: _dt.datetime, end_ts:
             return
         if result == "idle":
             # 等待一小段时间后继续
-            wait_time = min(1.0, next_depart_deadline - ctx.now())
+            wait_time = min(1.0, next_stage - ctx.now())
             if wait_time > 0:
                 ctx._sleep_with_pause(wait_time)
 
@@ -828,6 +865,14 @@ def _run_fixed_join_cycle(ctx: BearRuntime, end_ts: float, depart_deadline: Opti
 
     返回: "depart_due" | "stopped" | "processed" | "idle"
     """
+    ctx.depart_deadline = depart_deadline
+    with pacing.poller(ctx.serial, base=0.5, priority="high", min_interval=0.2) as pacer:
+        pacer.deadline = depart_deadline
+        return _fixed_join_loop(ctx, end_ts, depart_deadline, pacer)
+
+
+def _fixed_join_loop(ctx: BearRuntime, end_ts: float, depart_deadline: Optional[float],
+                     pacer: "pacing.Poller") -> str:
     # 2.2.1 初始化
     status = _init_to_alliance_war_list(ctx, depart_deadline)
     if status == "depart_due":
@@ -855,7 +900,8 @@ def _run_fixed_join_cycle(ctx: BearRuntime, end_ts: float, depart_deadline: Opti
             last_scroll_time = ctx.now()
 
         # 2.2.3 查找车头并上车
-        status, joined = _find_head_and_join(ctx, depart_deadline)
+        with pacer.measure():
+            status, joined = _find_head_and_join(ctx, depart_deadline)
 
         if status == "depart_due":
             return "depart_due"
@@ -863,6 +909,7 @@ def _run_fixed_join_cycle(ctx: BearRuntime, end_ts: float, depart_deadline: Opti
             return "stopped"
         if status == "joined":
             processed = True
+            pacer.hit()
             # 2.2.5 返回出征列表最底端
             # 等待界面返回到出征列表（点击出征确认后有动画）
             ctx.log("[BEAR] 等待返回出征列表...")
@@ -898,8 +945,9 @@ def _run_fixed_join_cycle(ctx: BearRuntime, end_ts: float, depart_deadline: Opti
             ctx.log("[BEAR] 不在出征列表界面，重新初始化")
             return "idle"
         if status == "no_head":
-            # 未找到车头，等待一小段时间后继续
-            if ctx._sleep_with_pause(0.5):
+            # 未找到车头，等待一小段时间后继续（临近发车加快，空等较久时放慢）
+            pacer.miss()
+            if ctx._sleep_with_pause(pacer.next_interval()):
                 return "stopped"
             continue
 
@@ -56,54 +56,9 @@ def _tap(app, serial, x, y):
     app.adb.input_tap(serial, int(x), int(y))
 
 
-def _exist_roi(png, path, thr, x1, y1, x2, y2) -> bool:
-    try:
-        import cv2 as cv
-        import numpy as np
-        arr = np.frombuffer(png, dtype=np.uint8)
-        img = cv.imdecode(arr, cv.IMREAD_COLOR)
-        if img is None:
-            return matcher.exist(png, path, threshold=thr)
-        h, w = img.shape[:2]
-        x1c, x2c = max(0, min(w, x1)), max(0, min(w, x2))
-        y1c, y2c = max(0, min(h, y1)), max(0, min(h, y2))
-        if x2c <= x1c or y2c <= y1c:
-            return matcher.exist(png, path, threshold=thr)
-        roi = img[y1c:y2c, x1c:x2c]
-        ok, buf = cv.imencode('.png', roi)
-        if not ok:
-            return matcher.exist(png, path, threshold=thr)
-        return matcher.exist(buf.tobytes(), path, threshold=thr)
-    except Exception:
-        return matcher.exist(png, path, threshold=thr)
-
-
-def _match_one_roi(png, path, thr, x1, y1, x2, y2):
-    """在指定 ROI 内进行 match_one，返回 (ok, (x,y))，x,y 是相对于整张图的坐标。"""
-    try:
-        import cv2 as cv
-        import numpy as np
-        arr = np.frombuffer(png, dtype=np.uint8)
-        img = cv.imdecode(arr, cv.IMREAD_COLOR)
-        if img is None:
-            return matcher.match_one(png, path, threshold=thr)
-        h, w = img.shape[:2]
-        x1c, x2c = max(0, min(w, x1)), max(0, min(w, x2))
-        y1c, y2c = max(0, min(h, y1)), max(0, min(h, y2))
-        if x2c <= x1c or y2c <= y1c:
-            return matcher.match_one(png, path, threshold=thr)
-        roi = img[y1c:y2c, x1c:x2c]
-        ok, buf = cv.imencode('.png', roi)
-        if not ok:
-            return matcher.match_one(png, path, threshold=thr)
-        okm, pos = matcher.match_one(buf.tobytes(), path, threshold=thr)
-        if not okm:
-            return False, (0, 0)
-        # pos is relative to ROI; map to full image coords
-        rx, ry = pos
-        return True, (int(rx + x1c), int(ry + y1c))
-    except Exception:
-        return matcher.match_one(png, path, threshold=thr)
+def _match_one_roi(png, path, thr, region):
+    """在指定 ROI（regions 区域名或坐标元组）内进行 match_one，返回 (ok, (x,y))，x,y 是相对于整张图的坐标。"""
+    return matcher.match_in_range(png, path, region, threshold=thr)
 
 
 def run_build_flag(app, serial: str, toast: Callable, log: Callable,
@@ -154,9 +109,8 @@ def run_build_flag(app, serial: str, toast: Callable, log: Callable,
                 _sleep(app, 1.0)
             continue
 
-        # 在 ROI (133,970)-(582,1131) 检测 lianmengqizhi（直接裁剪 ROI 后匹配）
-        roi_x1, roi_y1, roi_x2, roi_y2 = 133, 970, 582, 1131
-        ok, pos = _match_one_roi(png, paths["lianmengqizhi"], thr, roi_x1, roi_y1, roi_x2, roi_y2)
+        # 在 ROI flag.lianmengqizhi（基准 (133,970)-(582,1131)）内检测 lianmengqizhi
+        ok, pos = _match_one_roi(png, paths["lianmengqizhi"], thr, "flag.lianmengqizhi")
         if ok:
             log("[BUILD_FLAG] 在 ROI 内匹配到 lianmengqizhi，尝试点击")
             _tap(app, serial, *pos)
@@ -1,7 +1,7 @@
 # mumu_adb_controller/ui/tasks/fast_join_rally.py
 import os, sys, time
 from typing import Callable, Optional
-from ..helpers import matcher
+from ..helpers import fleet_sync, matcher, pacing
 
 # ---------- 冻结安全的资源定位 ----------
 try:
@@ -30,6 +30,8 @@ BACK_KEY_INTERVAL = 0.40  # 第一阶段：返回键间隔（秒）
 STEP2_INTERVAL = 5.0      # 第二阶段：检测aim的周期
 STEP3_INTERVAL = 5.0      # 第三阶段：检测join的周期
 TIMEOUT_2MIN = 120.0
+JOIN_GROUP = "rally.join"   # 全局模式 + sync_departure 时各设备“出征”同步点击
+JOIN_SYNC_WINDOW = 1.0
 
 
 def _screencap(app, serial):
@@ -43,14 +45,20 @@ def _match_one(png_bytes, img_path, threshold=None):
     thr = matcher.THRESH if threshold is None else threshold
     return matcher.match_one(png_bytes, img_path, threshold=thr)
 
-def _tap_if_found(app, serial, img_path, log, name: str, threshold=None):
+def _tap_if_found(app, serial, img_path, log, name: str, threshold=None, sync_group: Optional[str] = None,
+                  should_stop: Optional[Callable[[], bool]] = None):
     png = _screencap(app, serial)
     if png is None:
         log(f"[{name}] 截图失败")
         return False
     ok, (x, y) = _match_one(png, img_path, threshold=threshold)
     if ok:
-        _tap(app, serial, x, y)
+        if sync_group:
+            if not fleet_sync.tap_together(app, sync_group, serial, x, y, log=log, window=JOIN_SYNC_WINDOW,
+                                           should_stop=should_stop):
+                return False
+        else:
+            _tap(app, serial, x, y)
         log(f"[{name}] 点击 {os.path.basename(img_path)} → ({x},{y})")
         return True
     return False
@@ -68,7 +76,17 @@ def run_fast_join_rally(app, serial: str, toast: Callable[[str], None], log: Cal
     """
     log("[FAST-JOIN] 启动：秒进集结")
     toast("秒进集结启动")
+    fleet_sync.enroll(app, JOIN_GROUP, serial)
+    try:
+        _join_loop(app, serial, toast, log, should_stop, threshold)
+    finally:
+        fleet_sync.leave(app, JOIN_GROUP, serial)
+    toast("秒进集结已停止")
+    log("[FAST-JOIN] 结束")
 
+
+def _join_loop(app, serial: str, toast: Callable[[str], None], log: Callable[[str], None],
+               should_stop: Callable[[], bool], threshold: Optional[float]):
     def _sleep_check(seconds: float):
         end = time.time() + seconds
         while time.time() < end:
@@ -138,15 +156,20 @@ def run_fast_join_rally(app, serial: str, toast: Callable[[str], None], log: Cal
         log("[STEP2] 每5秒检测 pic/aim.png 或 pic/aim2.png（≤2分钟，任一命中即进入第三步）…")
         t0 = time.time()
         hit_aim = False
-        while not should_stop() and (time.time() - t0) < TIMEOUT_2MIN:
-            if (
-                _tap_if_found(app, serial, IMG_AIM, log, "STEP2-aim", threshold=threshold)
-                or _tap_if_found(app, serial, IMG_AIM2, log, "STEP2-aim2", threshold=threshold)
-            ):
-                hit_aim = True
-                break
-            if _sleep_check(STEP2_INTERVAL):
-                return
+        with pacing.poller(serial, base=STEP2_INTERVAL, priority="normal",
+                           min_interval=1.0, max_interval=STEP2_INTERVAL * 2) as pacer:
+            while not should_stop() and (time.time() - t0) < TIMEOUT_2MIN:
+                with pacer.measure():
+                    found = (
+                        _tap_if_found(app, serial, IMG_AIM, log, "STEP2-aim", threshold=threshold)
+                        or _tap_if_found(app, serial, IMG_AIM2, log, "STEP2-aim2", threshold=threshold)
+                    )
+                if found:
+                    hit_aim = True
+                    break
+                pacer.miss()
+                if _sleep_check(pacer.next_interval()):
+                    return
         if not hit_aim:
             log("[STEP2] 2分钟未发现 aim/aim2 → 回到第一步")
             continue
@@ -170,7 +193,8 @@ def run_fast_join_rally(app, serial: str, toast: Callable[[str], None], log: Cal
                 if _sleep_check(1.0):
                     return
                 # 无论是否存在都尝试点击一次
-                _tap_if_found(app, serial, IMG_CHUZHENG_BLUE_2, log, "STEP3-chuzheng_blue_2", threshold=threshold)
+                _tap_if_found(app, serial, IMG_CHUZHENG_BLUE_2, log, "STEP3-chuzheng_blue_2", threshold=threshold,
+                              sync_group=JOIN_GROUP, should_stop=should_stop)
                 if _sleep_check(1.0):
                     return
                 # 连续发送返回键，直到检测到 cancel 并点击（最多5次）
@@ -208,6 +232,3 @@ def run_fast_join_rally(app, serial: str, toast: Callable[[str], None], log: Cal
         continue
         # 继续下一轮，从第二步开始
 
-    toast("秒进集结已停止")
-    log("[FAST-JOIN] 结束")
-
@@ -19,7 +19,8 @@ import time
 import concurrent.futures as futures
 from typing import Callable, Dict, Tuple, Optional
 
-from ..helpers import matcher
+from ..helpers import desktop, matcher
+from ...common import cancel
 
 # 冻结安全的资源定位
 try:
@@ -33,13 +34,23 @@ except Exception:
         return os.path.join(_app_base_dir(), *parts)
 
 THR = matcher.THRESH
+DETECT_WORKERS = 6   # 掉线检测并发截图路数（adb 截图为子进程，主要耗在 IO）
+REPAIR_WORKERS = 8   # 并发修复的组数上限
 
-# 可选：Windows 桌面点击（依赖 pyautogui）
-try:
-    import pyautogui  # type: ignore
-    _HAS_PYAUTO = True
-except Exception:
-    _HAS_PYAUTO = False
+# 可选：Windows 桌面点击（依赖 pyautogui）；首次桌面点击时才导入，避免拖慢启动
+pyautogui = None
+_HAS_PYAUTO: Optional[bool] = None
+
+def _ensure_pyautogui() -> bool:
+    global pyautogui, _HAS_PYAUTO
+    if _HAS_PYAUTO is None:
+        try:
+            import pyautogui as _pag  # type: ignore
+            pyautogui = _pag
+            _HAS_PYAUTO = True
+        except Exception:
+            _HAS_PYAUTO = False
+    return _HAS_PYAUTO
 # DPI 处理：Windows 缩放感知与比例查询，便于匹配前做缩放补偿
 _IS_WIN = (os.name == "nt")
 _DPI_AWARED = False
@@ -241,7 +252,7 @@ def _activate_window_and_click(image_name: str, log: Callable[[str], None], titl
     """
     if should_stop and should_stop():
         return
-    if not _HAS_PYAUTO:
+    if not _ensure_pyautogui():
         log("[OFFMON] 未安装 pyautogui，无法进行桌面点击：" + image_name)
         return
 
@@ -305,52 +316,25 @@ def _try_activate_and_click_once(image_name: str, log: Callable[[str], None], ti
             log(f"[OFFMON] 缺少桌面点击图：{', '.join(candidates)}")
             return False
 
-        # DPI：依据系统缩放调整模板尺寸（将模板按当前缩放倍数放大/缩小）
+        # DPI：依据系统缩放调整模板尺寸（缩放后的模板按倍数缓存，只做一次）
         scale = _get_scale_factor()
 
-        def _prepare_template(pth: str):
-            try:
-                from PIL import Image
-                img = Image.open(pth).convert("RGB")
-                if abs(scale - 1.0) > 0.01:
-                    img = img.resize((max(1, int(round(img.width * scale))),
-                                      max(1, int(round(img.height * scale)))), Image.LANCZOS)
-                return img
-            except Exception:
-                return pth  # 回退为路径
-
-        # 依次尝试候选图片；总时长上限 4s，每个候选图尝试 ~2s
-        overall_deadline = time.time() + 4.0
-        loc = None
-        hit_name = None
-        for idx, pth in enumerate(cand_paths):
+        # 每次轮询只截一次窗口区域，全部候选图在同一帧上匹配；总时长上限 4s
+        t0 = time.perf_counter()
+        hit, (lx, ly), best = desktop.locate(cand_paths, region=region, scale=scale, confidence=0.80,
+                                             timeout=4.0, should_stop=should_stop)
+        cost_ms = (time.perf_counter() - t0) * 1000.0
+        scope = "窗口内" if region else "全屏"
+        if hit is None:
             if should_stop and should_stop():
                 return False
-            tpl = _prepare_template(pth)
-            per_deadline = overall_deadline if idx == len(cand_paths) - 1 else time.time() + 2.0
-            while time.time() < per_deadline and not (should_stop and should_stop()):
-                try:
-                    loc = pyautogui.locateCenterOnScreen(tpl, confidence=0.80, grayscale=True,
-                                                          region=region)
-                except Exception as ee:
-                    log(f"[OFFMON] locateCenterOnScreen 异常：{type(ee).__name__}: {ee!r}")
-                    break
-                if loc:
-                    hit_name = os.path.basename(pth)
-                    break
-                time.sleep(0.18)
-            if loc:
-                break
-
-        if not loc:
-            scope = "窗口内" if region else "全屏"
-            log(f"[OFFMON] 未在{scope}找到候选：{', '.join([os.path.basename(x) for x in cand_paths])}（缩放 {scale:.2f}x）")
+            log(f"[OFFMON] 未在{scope}找到候选：{', '.join([os.path.basename(x) for x in cand_paths])}"
+                f"（缩放 {scale:.2f}x，最高分 {best:.2f}，耗时 {cost_ms:.0f}ms）")
             return False
 
-        pyautogui.moveTo(loc.x, loc.y, duration=0.1)
+        pyautogui.moveTo(lx, ly, duration=0.1)
         pyautogui.click()
-        scope = "窗口内" if region else "全屏"
-        log(f"[OFFMON] 桌面点击（{scope}）：{hit_name} at ({loc.x},{loc.y}) [DPI {scale:.2f}]")
+        log(f"[OFFMON] 桌面点击（{scope}）：{os.path.basename(hit)} at ({lx},{ly}) [DPI {scale:.2f}，找图 {cost_ms:.0f}ms]")
         return True  # 成功点击
     except Exception as e:
         import traceback
@@ -429,6 +413,96 @@ def run_offline_monitor(app,
                 pass
         log(s)
 
+    def _group_job(gi: int, a_ser: Optional[str], b_ser: Optional[str], a_off: bool, b_off: bool):
+        """按一组 A/B 的掉线判定生成修复任务；无需修复返回 None。"""
+        if not a_off and not b_off:
+            _logv(log, f"第{gi}组 A/B 均未掉线", verbose)
+            return None  # 情况3
+
+        # 仅一台在线设备的特殊处理：
+        # - 若该机器未掉线：通过
+        # - 若检测到掉线：直接点击 diaoxian.png（纳入并发任务），不做 pause/continue（全局统一做）
+        only_one = (a_ser is not None) ^ (b_ser is not None)
+        if only_one:
+            single_ser = a_ser if a_ser else b_ser
+            single_off = a_off if a_ser else b_off
+            if not single_off:
+                _logv(log, f"第{gi}组：仅一台在线（{single_ser}），未检测到掉线，跳过", verbose)
+                return None
+            def _job_one(serial=single_ser, gi_=gi):
+                if should_stop():
+                    return
+                info(f"[OFFMON] 第{gi_}组：仅一台在线且检测到掉线，在{_label(serial)}上直接点击 diaoxian")
+                _tap_img(app, serial, paths["diaoxian"], thr, log, name="diaoxian.png", wait_s=0.5, should_stop=should_stop)
+            return _job_one
+
+        # 通用情形：构造该组的修复序列任务（选择 → confirm → diaoxian）
+        def _make_job(gi_=gi, a_off_=a_off, b_off_=b_off, a_ser_=a_ser, b_ser_=b_ser):
+            def _job():
+                if should_stop():
+                    return
+                # 选择执行在哪台：情况1在A；情况2在未掉线那台
+                target_for_select: Optional[str] = None
+                if a_off_ and b_off_:
+                    target_for_select = a_ser_
+                    info(f"[OFFMON] 第{gi_}组：A/B均掉线，在{_label(a_ser_)}上执行掉线选人")
+                else:
+                    if a_off_ and b_ser_:
+                        target_for_select = b_ser_
+                        info(f"[OFFMON] 第{gi_}组：A掉线B正常，在{_label(b_ser_)}上执行掉线选人")
+                    elif b_off_ and a_ser_:
+                        target_for_select = a_ser_
+                        info(f"[OFFMON] 第{gi_}组：B掉线A正常，在{_label(a_ser_)}上执行掉线选人")
+                if target_for_select and not should_stop():
+                    _drop_line_selection(app, target_for_select, log, thr, verbose, should_stop)
+                if should_stop():
+                    return
+                # confirm 目标：情况1 A；情况2 未掉线那台
+                target_for_confirm: Optional[str] = None
+                if a_off_ and b_off_:
+                    target_for_confirm = a_ser_
+                else:
+                    if a_off_:
+                        target_for_confirm = b_ser_
+                    elif b_off_:
+                        target_for_confirm = a_ser_
+                if target_for_confirm and not should_stop():
+                    info(f"[OFFMON] aaaaaaaaaaaaaaaaaaaaaaaaaaa开始在{_label(target_for_confirm)}上执行 confirm")
+                    _tap_img(app, target_for_confirm, paths["confirm"], thr, log, name="confirm.png", wait_s=0.5, should_stop=should_stop)
+                if should_stop():
+                    return
+                # diaoxian 目标：情况1 B；情况2 掉线那台
+                target_for_diaoxian: Optional[str] = None
+                if a_off_ and b_off_:
+                    target_for_diaoxian = b_ser_
+                else:
+                    target_for_diaoxian = a_ser_ if a_off_ else b_ser_ if b_off_ else None
+                if target_for_diaoxian and not should_stop():
+                    info(f"[OFFMON] 开始在{_label(target_for_diaoxian)}上执行 diaoxian")
+                    _tap_img(app, target_for_diaoxian, paths["diaoxian"], thr, log, name="diaoxian.png", wait_s=0.5, should_stop=should_stop)
+            return _job
+        return _make_job()
+
+    def _begin_repairs() -> bool:
+        """首个修复任务出现时：暂停其他任务并全局点击 pause，等待 10 秒。返回 True 表示期间被停止。"""
+        # 离线监控修复开始：无条件暂停其他所有任务
+        try:
+            if hasattr(app, "_suspend_all_tasks_for_offmon"):
+                app._suspend_all_tasks_for_offmon()
+        except Exception:
+            pass
+        # 全局一次 pause（首次决定日志聚焦到“主日志”）
+        try:
+            if hasattr(app, "_select_log_tab"):
+                app._select_log_tab("main")
+        except Exception:
+            pass
+        _activate_window_and_click("pause.png", log, title_keyword="护肝神器", should_stop=should_stop)
+        if _sleep_until(should_stop, 10.0):
+            return True
+        info("[OFFMON] 已暂停，开始并发修复（其余组边检测边提交）…")
+        return False
+
     info("[OFFMON] 启动监控，立即进行第一次掉线检测…")
     while not should_stop():
         try:
@@ -442,94 +516,79 @@ def run_offline_monitor(app,
 
             info("[OFFMON] 开始一轮掉线巡检…")
 
-            # 收集本轮需要修复的任务（并发执行），仅在开始前全局点击一次 pause，全部完成后全局点击一次 continue
-            jobs: list[tuple[int, Callable[[], None]]] = []  # (组号, 任务函数)
-
+            # 本轮在线的组：组号 -> (A, B)，无在线设备的组跳过
+            online: Dict[int, Tuple[Optional[str], Optional[str]]] = {}
             for gi in range(1, 21):
-                if should_stop():
-                    break
                 a_port, b_port = groups[gi]
                 a_ser = port2serial.get(a_port)
                 b_ser = port2serial.get(b_port)
                 if not a_ser and not b_ser:
                     _logv(log, f"第{gi}组无在线设备，跳过", verbose)
                     continue
+                online[gi] = (a_ser, b_ser)
+
+            # 检测与修复流水线：全部在线设备并发截图判定（最多 DETECT_WORKERS 路）；
+            # 某组两台都有结果即生成修复任务并立刻提交，不等整轮检测结束。
+            # 全局 pause 仍只做一次（出现第一个修复任务时），全部完成后全局 continue 一次。
+            offline: Dict[str, bool] = {}
+            pending = dict(online)
+            serials = [s for pair in online.values() for s in pair if s]
+            repair_futs: list = []
+            paused = False
+            stopped = False
+            detect_ex = futures.ThreadPoolExecutor(max_workers=max(1, min(DETECT_WORKERS, len(serials))),
+                                                   thread_name_prefix="offmon-detect")
+            repair_ex = futures.ThreadPoolExecutor(max_workers=REPAIR_WORKERS, thread_name_prefix="offmon-repair")
+            fut2ser = {}
+            # 线程池中的 adb 调用沿用本任务的取消令牌，“停止所有”时一并结束
+            exist = cancel.bind(_exist)
+            try:
+                fut2ser = {detect_ex.submit(exist, app, s, paths["diaoxian"], thr): s for s in serials}
+                for f in futures.as_completed(fut2ser):
+                    if should_stop():
+                        stopped = True
+                        break
+                    s = fut2ser[f]
+                    try:
+                        offline[s] = bool(f.result())
+                    except Exception as e:
+                        log(f"[OFFMON] 掉线检测异常 {_label(s)}：{e}")
+                        offline[s] = False
+                    for gi, (a_ser, b_ser) in list(pending.items()):
+                        if (a_ser and a_ser not in offline) or (b_ser and b_ser not in offline):
+                            continue
+                        del pending[gi]
+                        job = _group_job(gi, a_ser, b_ser, offline.get(a_ser, False), offline.get(b_ser, False))
+                        if job is None:
+                            continue
+                        if not paused:
+                            paused = True
+                            if _begin_repairs():
+                                stopped = True
+                                break
+                        repair_futs.append(repair_ex.submit(cancel.bind(job)))
+                    if stopped:
+                        break
+                if repair_futs and not stopped:
+                    info(f"[OFFMON] 本轮检测完成，共 {len(repair_futs)} 组需修复，等待修复结束…")
+                for f in repair_futs:
+                    try:
+                        f.result()
+                    except Exception as e:
+                        log(f"[OFFMON] 某组修复异常：{e}")
+                    if should_stop():
+                        break
+            finally:
+                for f in fut2ser:
+                    f.cancel()
+                detect_ex.shutdown(wait=False)
+                repair_ex.shutdown(wait=True)
 
-                # 判定是否掉线
-                a_off = _exist(app, a_ser, paths["diaoxian"], thr) if a_ser else False
-                b_off = _exist(app, b_ser, paths["diaoxian"], thr) if b_ser else False
-
-                if not a_off and not b_off:
-                    _logv(log, f"第{gi}组 A/B 均未掉线", verbose)
-                    continue  # 情况3
-
-                # 仅一台在线设备的特殊处理：
-                # - 若该机器未掉线：通过
-                # - 若检测到掉线：直接点击 diaoxian.png（纳入并发任务），不做 pause/continue（全局统一做）
-                only_one = (a_ser is not None) ^ (b_ser is not None)
-                if only_one:
-                    single_ser = a_ser if a_ser else b_ser
-                    single_off = a_off if a_ser else b_off
-                    if not single_off:
-                        _logv(log, f"第{gi}组：仅一台在线（{single_ser}），未检测到掉线，跳过", verbose)
-                        continue
-                    def _job_one(serial=single_ser, gi_=gi):
-                        if should_stop():
-                            return
-                        info(f"[OFFMON] 第{gi_}组：仅一台在线且检测到掉线，在{_label(serial)}上直接点击 diaoxian")
-                        _tap_img(app, serial, paths["diaoxian"], thr, log, name="diaoxian.png", wait_s=0.5, should_stop=should_stop)
-                    jobs.append((gi, _job_one))
-                    continue
-
-                # 通用情形：构造该组的修复序列任务（选择 → confirm → diaoxian）
-                def _make_job(gi_=gi, a_off_=a_off, b_off_=b_off, a_ser_=a_ser, b_ser_=b_ser):
-                    def _job():
-                        if should_stop():
-                            return
-                        # 选择执行在哪台：情况1在A；情况2在未掉线那台
-                        target_for_select: Optional[str] = None
-                        if a_off_ and b_off_:
-                            target_for_select = a_ser_
-                            info(f"[OFFMON] 第{gi_}组：A/B均掉线，在{_label(a_ser_)}上执行掉线选人")
-                        else:
-                            if a_off_ and b_ser_:
-                                target_for_select = b_ser_
-                                info(f"[OFFMON] 第{gi_}组：A掉线B正常，在{_label(b_ser_)}上执行掉线选人")
-                            elif b_off_ and a_ser_:
-                                target_for_select = a_ser_
-                                info(f"[OFFMON] 第{gi_}组：B掉线A正常，在{_label(a_ser_)}上执行掉线选人")
-                        if target_for_select and not should_stop():
-                            _drop_line_selection(app, target_for_select, log, thr, verbose, should_stop)
-                        if should_stop():
-                            return
-                        # confirm 目标：情况1 A；情况2 未掉线那台
-                        target_for_confirm: Optional[str] = None
-                        if a_off_ and b_off_:
-                            target_for_confirm = a_ser_
-                        else:
-                            if a_off_:
-                                target_for_confirm = b_ser_
-                            elif b_off_:
-                                target_for_confirm = a_ser_
-                        if target_for_confirm and not should_stop():
-                            info(f"[OFFMON] aaaaaaaaaaaaaaaaaaaaaaaaaaa开始在{_label(target_for_confirm)}上执行 confirm")
-                            _tap_img(app, target_for_confirm, paths["confirm"], thr, log, name="confirm.png", wait_s=0.5, should_stop=should_stop)
-                        if should_stop():
-                            return
-                        # diaoxian 目标：情况1 B；情况2 掉线那台
-                        target_for_diaoxian: Optional[str] = None
-                        if a_off_ and b_off_:
-                            target_for_diaoxian = b_ser_
-                        else:
-                            target_for_diaoxian = a_ser_ if a_off_ else b_ser_ if b_off_ else None
-                        if target_for_diaoxian and not should_stop():
-                            info(f"[OFFMON] 开始在{_label(target_for_diaoxian)}上执行 diaoxian")
-                            _tap_img(app, target_for_diaoxian, paths["diaoxian"], thr, log, name="diaoxian.png", wait_s=0.5, should_stop=should_stop)
-                    return _job
-                jobs.append((gi, _make_job()))
+            if stopped or should_stop():
+                break
 
             # 若无任务，直接进入下轮等待
-            if not jobs:
+            if not paused:
                 total = max(1, int(interval_minutes)) * 60
                 info(f"[OFFMON] 本轮无修复任务，等待 {total} 秒后进入下一轮…（可停止）")
                 for _ in range(total):
@@ -538,37 +597,6 @@ def run_offline_monitor(app,
                     time.sleep(1.0)
                 continue
 
-            # 全局一次 pause（首次决定日志聚焦到“主日志”）
-            # 离线监控修复开始：无条件暂停其他所有任务
-            try:
-                if hasattr(app, "_suspend_all_tasks_for_offmon"):
-                    app._suspend_all_tasks_for_offmon()
-            except Exception:
-                pass
-
-            try:
-                if hasattr(app, "_select_log_tab"):
-                    app._select_log_tab("main")
-            except Exception:
-                pass
-            _activate_window_and_click("pause.png", log, title_keyword="护肝神器", should_stop=should_stop)
-            if _sleep_until(should_stop, 10.0):
-                break
-
-            # 并发执行各组修复
-            info(f"[OFFMON] 本轮需修复 {len(jobs)} 组，开始并发处理…")
-            with futures.ThreadPoolExecutor(max_workers=min(8, len(jobs))) as ex:
-                futs = [ex.submit(job) for _, job in jobs]
-                for f in futs:
-                    try:
-                        f.result()
-                    except Exception as e:
-                        log(f"[OFFMON] 某组修复异常：{e}")
-                    if should_stop():
-                        break
-
-            if should_stop():
-                break
             # 全局一次 continue（前置 10 秒等待）；结束时维持主日志聚焦，无需频繁切换
             if _sleep_until(should_stop, 10.0):
                 break
@@ -85,42 +85,7 @@ def _back(app, serial: str):
 
 def _match_in_region(png_bytes, img_path, region, threshold):
     """在指定区域内匹配图片"""
-    try:
-        import cv2
-        import numpy as np
-
-        # 解码图片
-        screen_arr = np.frombuffer(png_bytes, dtype=np.uint8)
-        scr = cv2.imdecode(screen_arr, cv2.IMREAD_COLOR)
-        if scr is None:
-            return False, (0, 0)
-
-        # 裁剪区域
-        (x1, y1), (x2, y2) = region
-        h, w = scr.shape[:2]
-        x1 = max(0, min(x1, w))
-        y1 = max(0, min(y1, h))
-        x2 = max(0, min(x2, w))
-        y2 = max(0, min(y2, h))
-
-        if x2 <= x1 or y2 <= y1:
-            return False, (0, 0)
-
-        cropped = scr[y1:y2, x1:x2]
-
-        # 编码为PNG
-        _, cropped_png = cv2.imencode('.png', cropped)
-        cropped_bytes = cropped_png.tobytes()
-
-        # 在裁剪区域内匹配
-        ok, (rx, ry) = matcher.match_one(cropped_bytes, img_path, threshold=threshold)
-
-        if ok:
-            # 转换回原图坐标
-            return True, (x1 + rx, y1 + ry)
-        return False, (0, 0)
-    except Exception:
-        return False, (0, 0)
+    return matcher.match_in_range(png_bytes, img_path, region, threshold=threshold)
 
 
 def _ensure_initial_state(app, serial: str, paths: dict, thr: float, log: Callable, should_stop: Callable) -> bool:
@@ -204,7 +169,7 @@ def _check_full_queue(app, serial: str, paths: dict, log: Callable) -> bool:
     if not scr:
         return False
     
-    region = ((14, 146), (298, 311))
+    region = "queue.full"
     
     # 检查full_queue6
     ok6, pos6 = _match_in_region(scr, paths["full_queue6"], region, 0.96)
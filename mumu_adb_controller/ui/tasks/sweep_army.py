@@ -2,7 +2,8 @@
 import os
 import sys
 import time
-from ..helpers import matcher
+from ..helpers import atlas, matcher
+from ..helpers.burst import tap_for
 from .init_to_wild import run_init_to_wild
 
 # ---------- 冻结安全的资源定位 ----------
@@ -116,17 +117,25 @@ def _double_tap_img_any(app, serial, img_paths, threshold, log, verbose, shangbi
     if missing_files:
         log(f"[WARN] 以下图片文件不存在: {[os.path.basename(f) for f in missing_files]}")
 
-    for p in img_paths:
-        if os.path.isfile(p):
-            # 伤兵图标使用专用阈值
-            use_threshold = shangbing_threshold if shangbing_threshold is not None else threshold
-            _logv(log, f"尝试匹配 {os.path.basename(p)}，阈值={use_threshold}", verbose)
-            ok, pos = _double_tap_img(app, serial, p, use_threshold, log, verbose)
-            if ok:
-                log(f"[SUCCESS] 匹配成功: {os.path.basename(p)}，坐标={pos}")
-                return (True, (p, pos))
-            else:
-                _logv(log, f"匹配失败: {os.path.basename(p)}", verbose)
+    present = [p for p in img_paths if os.path.isfile(p)]
+    if not present:
+        return (False, ("", (0, 0)))
+    # 伤兵图标使用专用阈值
+    use_threshold = shangbing_threshold if shangbing_threshold is not None else threshold
+    png = _screencap(app, serial)
+    if png is None:
+        _logv(log, "screencap failed in _double_tap_img_any", verbose)
+        return (False, ("", (0, 0)))
+    # 同一帧一次匹配整组模板（图集），按列表顺序取第一个命中
+    res = atlas.match_group(png, present, threshold=use_threshold)
+    for p in present:
+        ok, pos, score = res[p]
+        _logv(log, f"尝试匹配 {os.path.basename(p)}，阈值={use_threshold} -> {ok} score={score:.3f}", verbose)
+        if ok:
+            _double_tap(app, serial, pos[0], pos[1])
+            log(f"[SUCCESS] 匹配成功: {os.path.basename(p)}，坐标={pos}")
+            return (True, (p, pos))
+        _logv(log, f"匹配失败: {os.path.basename(p)}", verbose)
     return (False, ("", (0, 0)))
 
 def _ensure_wild(app, serial, toast, log, paths, should_stop, step_delay: float, threshold, verbose):
@@ -323,16 +332,11 @@ def _single_cycle(app, serial, seconds, log, paths, should_stop, step_delay: flo
 
     # 11. 连续点击 P11
     log(f"[STEP 11] 连续点击坐标 P11={P11}，时长 {int(seconds)} 秒（点击频率约 ~16 次/秒）")
-    end_t = time.time() + max(0, int(seconds))
-    click_count = 0
-    while time.time() < end_t:
-        if should_stop():
-            log("[STEP 11] 停止指令收到（点击阶段），中断本次循环")
-            break
-        app.adb.input_tap(serial, *P11)
-        click_count += 1
-        _sleep_pause(app, CLICK_RATE_SLEEP)
-    log(f"[STEP 11] 完成，共点击 {click_count} 次")
+    stats = tap_for(app, serial, *P11, rate_hz=1.0 / CLICK_RATE_SLEEP, duration_s=max(0, int(seconds)),
+                    should_stop=should_stop)
+    if stats["stopped"]:
+        log("[STEP 11] 停止指令收到（点击阶段），中断本次循环")
+    log(f"[STEP 11] 完成，共点击 {stats['taps']} 次（实际 {stats['rate']:.1f} 次/秒，{stats['mode']}）")
     _delay_step(app, step_delay)
 
     return (True, False)  # (success=True, need_restart=False)
@@ -6,7 +6,8 @@
 import os
 import sys
 import time
-from ..helpers import matcher
+from ..helpers import atlas, matcher
+from ..helpers.burst import tap_for
 from .init_to_wild import run_init_to_wild
 
 # ---------- 冻结安全的资源定位 ----------
@@ -47,8 +48,8 @@ TARGET_NAMES = {
     "sun": "太阳城",
 }
 
-# 检测区域
-DETECT_REGION = ((220, 1029), (519, 1109))
+# 检测区域（区域坐标统一登记在 helpers/regions.py，按截图分辨率自动缩放）
+DETECT_REGION = "city.detect"
 
 # 出征按钮尝试坐标（仅保留第1坐标）
 ATTACK_CENTER_COORDS = [
@@ -62,12 +63,12 @@ TEAM_COORDS = [
 ]
 
 # 出征蓝按钮检测区域（扩大范围以确保能找到蓝按钮）
-BLUE_BUTTON_REGION = ((200, 1000), (800, 1280))
+BLUE_BUTTON_REGION = "city.blue_button"
 # 出征红按钮检测区域（王城/太阳城时使用，区域加宽以提高命中率）
-RED_BUTTON_REGION = ((0, 900), (1000, 1280))
+RED_BUTTON_REGION = "city.red_button"
 
 # 伤兵检测区域
-SOLDIER_REGION = ((461, 773), (615, 1085))
+SOLDIER_REGION = "city.soldier"
 
 # 治疗按钮坐标
 HEAL_BUTTON = (581, 935)
@@ -133,47 +134,18 @@ def _input_text(app, serial, text: str):
     app.adb.input_text(serial, str(text))
 
 def _match_in_region(png_bytes, img_path, region, threshold):
-    """在指定区域内匹配图片"""
-    try:
-        import cv2
-        import numpy as np
-
-        # 解码图片
-        screen_arr = np.frombuffer(png_bytes, dtype=np.uint8)
-        scr = cv2.imdecode(screen_arr, cv2.IMREAD_COLOR)
-        if scr is None:
-            return False, (0, 0)
-
-        # 裁剪区域
-        (x1, y1), (x2, y2) = region
-        h, w = scr.shape[:2]
-        x1 = max(0, min(x1, w))
-        y1 = max(0, min(y1, h))
-        x2 = max(0, min(x2, w))
-        y2 = max(0, min(y2, h))
-
-        if x2 <= x1 or y2 <= y1:
-            return False, (0, 0)
-
-        cropped = scr[y1:y2, x1:x2]
-
-        # 编码为PNG
-        _, cropped_png = cv2.imencode('.png', cropped)
-        cropped_bytes = cropped_png.tobytes()
-
-        # 在裁剪区域内匹配
-        ok, (rx, ry) = matcher.match_one(cropped_bytes, img_path, threshold=threshold)
-
-        if ok:
-            # 转换回原图坐标
-            return True, (x1 + rx, y1 + ry)
-        return False, (0, 0)
-    except Exception:
-        return False, (0, 0)
-
-def _click_if_found_in_region(app, serial, png_bytes, img_path, region, threshold, log, double=False):
-    """在区域内查找并点击"""
-    ok, (x, y) = _match_in_region(png_bytes, img_path, region, threshold)
+    """在指定区域内匹配图片（region 为 regions 中的区域名或坐标元组）"""
+    return matcher.match_in_range(png_bytes, img_path, region, threshold=threshold)
+
+def _click_if_found_in_region(app, serial, png_bytes, img_path, region, threshold, log, double=False, matched=None):
+    """在区域内查找并点击；matched 为 atlas.match_group 的结果时直接复用其得分"""
+    def _match(thr):
+        if matched is not None and img_path in matched:
+            _, pos, score = matched[img_path]
+            return (True, pos) if score >= thr else (False, (0, 0))
+        return _match_in_region(png_bytes, img_path, region, thr)
+
+    ok, (x, y) = _match(threshold)
     if ok:
         if double:
             _double_tap(app, serial, x, y)
@@ -185,7 +157,7 @@ def _click_if_found_in_region(app, serial, png_bytes, img_path, region, threshol
     else:
         # 如果未找到，尝试降低置信度重新匹配
         lower_threshold = max(0.7, threshold - 0.15)
-        ok, (x, y) = _match_in_region(png_bytes, img_path, region, lower_threshold)
+        ok, (x, y) = _match(lower_threshold)
         if ok:
             log(f"[CITY] 使用降低的置信度({lower_threshold})找到 {os.path.basename(img_path)} @ ({x},{y})")
             if double:
@@ -221,11 +193,11 @@ def _wait_for_soldier_entry(app, serial, paths, threshold, log, should_stop,
         if png is None:
             log(f"[CITY] 出征后等待：第{attempt}次截图失败，退避{delay:.2f}s")
         else:
-            for img_path in paths["soldiers"]:
-                ok, (x, y) = _match_in_region(png, img_path, SOLDIER_REGION, soldier_thr)
-                if ok:
-                    log(f"[CITY] 出征后等待：检测到伤兵入口 {os.path.basename(img_path)} @ ({x},{y})，进入治疗")
-                    return True
+            # 三个伤兵模板共用一个区域：一次区域 DFT 出全部得分（图集）
+            hit, (x, y), _ = atlas.first_hit(png, paths["soldiers"], threshold=soldier_thr, roi=SOLDIER_REGION)
+            if hit:
+                log(f"[CITY] 出征后等待：检测到伤兵入口 {os.path.basename(hit)} @ ({x},{y})，进入治疗")
+                return True
             log(f"[CITY] 出征后等待：未检测到伤兵入口（第{attempt}次），退避{delay:.2f}s")
 
         remaining = hard_cap - (time.time() - start)
@@ -378,9 +350,13 @@ def _attack_expedition(app, serial, target, paths, threshold, log, should_stop,
             return False, team_toggle_state
 
         log(f"[CITY] 在区域 {RED_BUTTON_REGION} 内查找红按钮(red1/red2)，置信度: {threshold}")
-        if _click_if_found_in_region(app, serial, png, paths["red1"], RED_BUTTON_REGION, threshold, log, double=False):
+        # red1/red2 同区域一次出分（图集），降阈值重试直接复用得分
+        matched = atlas.match_group(png, [paths["red1"], paths["red2"]], threshold=threshold, roi=RED_BUTTON_REGION)
+        if _click_if_found_in_region(app, serial, png, paths["red1"], RED_BUTTON_REGION, threshold, log,
+                                     double=False, matched=matched):
             _sleep_pause(app, 0.3)
-        elif _click_if_found_in_region(app, serial, png, paths["red2"], RED_BUTTON_REGION, threshold, log, double=False):
+        elif _click_if_found_in_region(app, serial, png, paths["red2"], RED_BUTTON_REGION, threshold, log,
+                                       double=False, matched=matched):
             _sleep_pause(app, 0.3)
         else:
             # 兜底：图片失效时仍可尝试固定坐标，避免卡死
@@ -433,17 +409,12 @@ def _heal_soldiers(app, serial, paths, threshold, heal_seconds, wait_seconds, lo
     
     # 连续点击治疗按钮
     log(f"[CITY] 连续点击治疗按钮，时长 {heal_seconds} 秒（{CLICK_RATE}次/秒）")
-    end_time = time.time() + heal_seconds
-    click_count = 0
-    while time.time() < end_time:
-        if should_stop():
-            log("[CITY] 收到停止指令，中断治疗")
-            break
-        _tap(app, serial, *HEAL_BUTTON)
-        click_count += 1
-        _sleep_pause(app, CLICK_INTERVAL)
+    stats = tap_for(app, serial, *HEAL_BUTTON, rate_hz=CLICK_RATE, duration_s=heal_seconds,
+                    should_stop=should_stop)
+    if stats["stopped"]:
+        log("[CITY] 收到停止指令，中断治疗")
     
-    log(f"[CITY] 治疗完成，共点击 {click_count} 次")
+    log(f"[CITY] 治疗完成，共点击 {stats['taps']} 次（实际 {stats['rate']:.1f} 次/秒，{stats['mode']}）")
     
     # 等待时长
     if wait_seconds > 0:
@@ -2,7 +2,8 @@
 import os
 import sys
 import time
-from ..helpers import matcher
+from ..helpers import atlas, matcher
+from ..helpers.burst import tap_for
 from .init_to_wild import run_init_to_wild
 
 # ---------- 冻结安全的资源定位 ----------
@@ -113,14 +114,15 @@ def _double_tap_img_any(app, serial, img_paths, log, step_delay: float, threshol
     if png is None:
         log("[FORT] 截图失败（_double_tap_img_any）")
         return False, ("", (0, 0))
-    for p in img_paths:
-        if os.path.isfile(p):
-            ok, (x, y) = _match_one(png, p, threshold=threshold)
-            _logv(log, f"match-any {os.path.basename(p)} -> {ok} pos=({x},{y})", verbose)
-            if ok:
-                _double_tap(app, serial, x, y)
-                _delay(app, step_delay)
-                return True, (p, (x, y))
+    present = [p for p in img_paths if os.path.isfile(p)]
+    res = atlas.match_group(png, present, threshold=threshold) if present else {}
+    for p in present:
+        ok, (x, y), _ = res[p]
+        _logv(log, f"match-any {os.path.basename(p)} -> {ok} pos=({x},{y})", verbose)
+        if ok:
+            _double_tap(app, serial, x, y)
+            _delay(app, step_delay)
+            return True, (p, (x, y))
     _delay(app, step_delay)
     # 所有图片都不匹配时返回默认值
     return False, ("", (0, 0))
@@ -135,16 +137,17 @@ def _double_tap_red_with_fallback(app, serial, paths, log, step_delay: float, th
     if png is None:
         log("[FORT] 截图失败（_double_tap_red_with_fallback）")
         return False, (0, 0), 'none'
+    thr2 = 0.84
+    res = atlas.match_group(png, [paths["red"], paths["red2"]], threshold=[threshold, thr2])
     # 主模板
-    ok1, pos1, sc1 = matcher.match_one_detail(png, paths["red"], threshold=threshold)
+    ok1, pos1, sc1 = res[paths["red"]]
     if ok1:
         _double_tap(app, serial, pos1[0], pos1[1])
         _delay(app, step_delay)
         log(f"[FORT] 命中 red score={sc1:.3f}>=thr={threshold:.2f} → 双击({pos1[0]},{pos1[1]})")
         return True, (pos1[0], pos1[1]), 'red'
     # 备选模板 0.84
-    thr2 = 0.84
-    ok2, pos2, sc2 = matcher.match_one_detail(png, paths["red2"], threshold=thr2)
+    ok2, pos2, sc2 = res[paths["red2"]]
     if ok2:
         _double_tap(app, serial, pos2[0], pos2[1])
         _delay(app, step_delay)
@@ -260,13 +263,12 @@ def _single_cycle(app, serial, mode: str, seconds: int, log, paths, should_stop,
 
     # 10 连续点击治疗
     log(f"[STEP 10] 连续点击 {P10}，时长 {int(seconds)} 秒（高频连点）")
-    end_t = time.time() + max(0, int(seconds))
-    while time.time() < end_t:
-        if should_stop():
-            log("[STEP 10] 停止指令收到（点击阶段），中断本次循环")
-            break
-        app.adb.input_tap(serial, *P10)
-        _sleep_pause(app, CLICK_RATE_SLEEP)
+    stats = tap_for(app, serial, *P10, rate_hz=1.0 / CLICK_RATE_SLEEP, duration_s=max(0, int(seconds)),
+                    should_stop=should_stop)
+    if stats["stopped"]:
+        log("[STEP 10] 停止指令收到（点击阶段），中断本次循环")
+    elif verbose:
+        log(f"[STEP 10] 共点击 {stats['taps']} 次（实际 {stats['rate']:.1f} 次/秒，{stats['mode']}）")
     _delay(app, step_delay)
 
 def run_sweep_fort(app, serial: str, seconds: int, mode: str,
@@ -129,8 +129,8 @@ def run_withdraw_troops(app, serial: str, toast, log,
             return
     else:
         info("已在野外初始化状态")
-    # 野外状态：在 ROI (0,178)-(71,238) 内检测 fold_marching（直接裁剪 ROI 后匹配）
-    ok, pos = matcher.match_in_range(scr, paths["fold_marching"], ((0, 178), (71, 238)), threshold=0.90)
+    # 野外状态：在 ROI withdraw.fold_marching（基准 (0,178)-(71,238)）内检测 fold_marching
+    ok, pos = matcher.match_in_range(scr, paths["fold_marching"], "withdraw.fold_marching", threshold=0.90)
     info(f"[WITHDRAW] fold_marching in_roi={ok} pos={pos}")
     if ok:
         x, y = pos
@@ -1,4 +1,5 @@
-import base64, tkinter as tk
+import base64, time, threading, tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import ttk
 try:
     from PIL import Image, ImageTk
@@ -6,9 +7,28 @@ try:
 except Exception:
     _HAS_PIL = False
 
-from .constants import THUMB_W, THUMB_H, THUMB_REFRESH_MS
+from .constants import THUMB_W, THUMB_H, THUMB_REFRESH_MS, THUMB_REUSE_SEC, THUMB_WORKERS
+
+
+def _scale_to_thumb(img):
+    """先整数倍 reduce（盒式下采样，很快）再小幅 resize 到缩略图尺寸。"""
+    k = max(1, min(img.width // THUMB_W, img.height // THUMB_H))
+    if k > 1:
+        img = img.reduce(k)
+    if img.size != (THUMB_W, THUMB_H):
+        img = img.resize((THUMB_W, THUMB_H), Image.BILINEAR)
+    return img
+
 
 class ThumbGrid(ttk.Frame):
+    """
+    设备缩略图网格。刷新策略：
+    - 只刷新当前可见（滚动视口内、且网格已显示）的卡片；滚动停下后补刷过期的卡片；
+    - 任务 THUMB_REUSE_SEC 秒内刚截过图则直接复用，不再占用 adb；
+    - 有 PIL 时走无压缩截图（省去设备端 PNG 编码），截图与解码缩放在 THUMB_WORKERS 个线程中完成，
+      UI 线程只负责生成 PhotoImage 并绘制；同一设备同一时间最多一个请求。
+    """
+
     def __init__(self, master, app, get_devices, on_click_serial):
         super().__init__(master)
         self.app = app
@@ -20,6 +40,11 @@ class ThumbGrid(ttk.Frame):
         self._relayout_job = None
         self._pending_width = None
         self._relayout_force = False
+        self._pool = ThreadPoolExecutor(max_workers=THUMB_WORKERS, thread_name_prefix="Thumb")
+        self._inflight = set()
+        self._inflight_lock = threading.Lock()
+        self._last_drawn = {}  # serial -> time.monotonic()
+        self._scroll_job = None
 
         # 创建主容器
         self.main_frame = ttk.Frame(self)
@@ -43,8 +68,8 @@ class ThumbGrid(ttk.Frame):
         # 创建画布窗口
         self.canvas_window = self.canvas.create_window((0, 0), window=self.inner, anchor="nw")
         
-        # 配置滚动条
-        self.canvas.configure(yscrollcommand=self.vbar.set)
+        # 配置滚动条（滚动后补刷新进入视口的卡片）
+        self.canvas.configure(yscrollcommand=self._on_yscroll)
         
         # 布局：滚动条在右侧，画布占据剩余空间
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
@@ -60,6 +85,15 @@ class ThumbGrid(ttk.Frame):
         # 绑定鼠标拖动事件
         self._bind_mouse_drag()
 
+    def _on_yscroll(self, first, last):
+        self.vbar.set(first, last)
+        if self._scroll_job is not None:
+            try:
+                self.after_cancel(self._scroll_job)
+            except Exception:
+                pass
+        self._scroll_job = self.after(200, self._refresh_stale_visible)
+
     def _on_inner_configure(self, event=None):
         """内部框架配置时更新滚动区域"""
         self.canvas.configure(scrollregion=self.canvas.bbox("all"))
@@ -219,32 +253,100 @@ class ThumbGrid(ttk.Frame):
             w = max(1, tkimg.width()); factor = max(1, int(round(w / THUMB_W)))
             return tkimg.subsample(factor, factor)
 
-    def refresh_all_async(self):
+    def _thumb_canvases(self):
         for child in self.inner.winfo_children():
             for w in child.winfo_children():
                 if isinstance(w, tk.Canvas) and hasattr(w, "_serial"):
-                    serial = w._serial
-                    if serial in self.app.workers:
-                        self.app.workers[serial].submit(lambda s=serial, cv=w: self._capture_and_draw(s, cv))
+                    yield child, w
+
+    def _visible_canvases(self):
+        """滚动视口内的缩略图画布；网格未显示（如处于列表模式）时为空。"""
+        try:
+            if not self.winfo_ismapped():
+                return []
+            top = self.canvas.canvasy(0)
+            bottom = top + self.canvas.winfo_height()
+        except tk.TclError:
+            return []
+        out = []
+        for card, cv in self._thumb_canvases():
+            y, h = card.winfo_y(), card.winfo_height()
+            if y + h >= top and y <= bottom:
+                out.append(cv)
+        return out
+
+    def refresh_all_async(self):
+        for cv in self._visible_canvases():
+            self._request(cv._serial, cv)
         self._schedule_next()
 
+    def _refresh_stale_visible(self):
+        self._scroll_job = None
+        now = time.monotonic()
+        for cv in self._visible_canvases():
+            if now - self._last_drawn.get(cv._serial, float("-inf")) >= THUMB_REFRESH_MS / 1000.0:
+                self._request(cv._serial, cv)
+
     def refresh_one_async(self, serial: str):
-        for child in self.inner.winfo_children():
-            for w in child.winfo_children():
-                if isinstance(w, tk.Canvas) and getattr(w, "_serial", None) == serial:
-                    if serial in self.app.workers:
-                        self.app.workers[serial].submit(lambda s=serial, cv=w: self._capture_and_draw(s, cv))
-                    return
+        for _card, w in self._thumb_canvases():
+            if w._serial == serial:
+                self._request(serial, w)
+                return
+
+    def _request(self, serial: str, canvas: tk.Canvas):
+        if serial not in self.app.workers:
+            return
+        with self._inflight_lock:
+            if serial in self._inflight:
+                return
+            self._inflight.add(serial)
+        try:
+            self._pool.submit(self._capture_and_draw, serial, canvas)
+        except RuntimeError:
+            # 线程池已关闭
+            with self._inflight_lock:
+                self._inflight.discard(serial)
+
+    def _load(self, serial: str):
+        """后台线程：取帧并缩放。返回 PIL Image（有 PIL）或 PNG bytes（无 PIL）；失败返回 None。"""
+        adb = self.app.adb
+        png = adb.recent_png(serial, THUMB_REUSE_SEC) if hasattr(adb, "recent_png") else None
+        if _HAS_PIL:
+            from io import BytesIO
+            if png is None and hasattr(adb, "screencap_raw"):
+                ok, frame = adb.screencap_raw(serial)
+                if ok and frame:
+                    w, h, buf = frame
+                    img = Image.frombuffer("RGBA", (w, h), buf, "raw", "RGBA", 0, 1)
+                    return _scale_to_thumb(img)
+            if png is None:
+                ok, png = adb.screencap(serial)
+                if not ok or not png:
+                    return None
+            return _scale_to_thumb(Image.open(BytesIO(png)).convert("RGBA"))
+        if png is None:
+            ok, png = adb.screencap(serial)
+            if not ok or not png:
+                return None
+        return png
 
     def _capture_and_draw(self, serial: str, canvas: tk.Canvas):
-        ok, data = self.app.adb.screencap(serial)
+        try:
+            data = self._load(serial)
+        except Exception:
+            data = None
+        finally:
+            with self._inflight_lock:
+                self._inflight.discard(serial)
+        ok = data is not None
         def draw():
             try:
                 # 检查画布是否仍然存在
                 canvas.winfo_exists()
                 canvas.delete("all")
                 if ok and data:
-                    tkimg = self._draw_image(data)
+                    tkimg = ImageTk.PhotoImage(data) if _HAS_PIL else self._draw_image(data)
+                    self._last_drawn[serial] = time.monotonic()
                     self._thumb_imgs[canvas._img_key] = tkimg
                     x = max(0, (THUMB_W - tkimg.width()) // 2)
                     y = max(0, (THUMB_H - tkimg.height()) // 2)
@@ -257,14 +359,31 @@ class ThumbGrid(ttk.Frame):
         self.app.after(0, draw)
 
     def _schedule_next(self):
-        self.cancel_timer()
+        self.cancel_timer(keep_captures=True)
+        self._keep_captures(THUMB_REUSE_SEC)
         self._timer = self.after(THUMB_REFRESH_MS, self.refresh_all_async)
 
-    def cancel_timer(self):
+    def cancel_timer(self, keep_captures: bool = False):
         if self._timer:
             try: self.after_cancel(self._timer)
             except Exception: pass
             self._timer = None
+        if not keep_captures:
+            # 网格不再刷新：不再保留任务截图，释放已缓存的整屏 PNG
+            self._keep_captures(0)
+
+    def _keep_captures(self, seconds: float):
+        adb = getattr(self.app, "adb", None)
+        if adb is not None and hasattr(adb, "keep_recent_png"):
+            adb.keep_recent_png(seconds)
+
+    def close(self):
+        """停止刷新并关闭后台线程池（退出时调用）。"""
+        self.cancel_timer()
+        try:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        except TypeError:
+            self._pool.shutdown(wait=False)
 
     def _bind_mouse_wheel(self):
         """绑定鼠标滚轮事件到画布和滚动条"""
@@ -19,15 +19,19 @@ from PySide6.QtWidgets import (
     QGroupBox, QInputDialog, QScrollArea, QTabBar
 )
 
+from ..common import cancel, startup, logstore
+from ..common.jobqueue import FleetQueue
 from ..common.config import AppConfig
+from ..common.executor import default_pool, ui_pool
 from ..common.logger import Logger
+from ..core import health
 from ..core.adb import AdbClient
 from ..common.worker import DeviceWorker
 from .device_tab_qt import DeviceTabQt
+from .log_view import LogFlusher, LogPane
 
-
-class _LogEmitter(QObject):
-    text_appended = Signal(str)
+STOP_ALL_TIMEOUT = 1.5  # “停止所有”等待任务收尾的上限（秒）
+_HEALTH_TAGS = {health.DEGRADED: "[慢]", health.UNRESPONSIVE: "[无响应]"}
 
 
 class _UiInvoker(QObject):
@@ -58,10 +62,26 @@ class AppQt(QMainWindow):
         self.config_mgr = AppConfig(app_name="MuMuADBController")
         self.cfg: Dict = self.config_mgr.load() or {}
 
+        # 日志：任意线程写入环形缓冲，UI 定时器批量渲染（上限可由 log_max_lines 配置）
+        try:
+            max_lines = int(self.cfg.get("log_max_lines", logstore.DEFAULT_MAX_LINES))
+        except Exception:
+            max_lines = logstore.DEFAULT_MAX_LINES
+        self.log_store = logstore.LogStore(max_lines)
         self.logger = Logger()
-        self._emitter = _LogEmitter()
-        self._emitter.text_appended.connect(self._append_main_log)
-        self.logger.set_sink(self._emitter.text_appended.emit)
+        self.logger.set_sink(self._append_main_log)
+        self.logger.add_record_sink(self._on_device_record)
+        # 文件日志：配置目录下 logs/（main.log + 每设备 <serial>.log，可选 events.jsonl）
+        try:
+            if bool(self.cfg.get("log_files", True)):
+                self.logger.enable_files(
+                    os.path.join(os.path.dirname(self.config_mgr.file), "logs"),
+                    max_bytes=int(self.cfg.get("log_file_max_kb", 2048)) * 1024,
+                    backups=int(self.cfg.get("log_file_backups", 3)),
+                    jsonl=bool(self.cfg.get("log_jsonl", False)),
+                )
+        except Exception:
+            pass
         self._ui_invoker = _UiInvoker()
 
         self.workers: Dict[str, DeviceWorker] = {}
@@ -69,6 +89,36 @@ class AppQt(QMainWindow):
         self._detached_windows: Dict[str, QMainWindow] = {}
 
         self.adb = AdbClient(adb_path=self.cfg.get("adb_path"), logger=self.logger)
+        # 分辨率归一化：截图缩放到 720x1280、点击坐标按设备分辨率换算；此时模板匹配无需多尺度补搜
+        try:
+            if bool(self.cfg.get("normalize_captures", False)):
+                self.adb.set_normalize(True)
+                from ..ui.helpers import matcher
+                matcher.SCALES = [1.0]
+        except Exception:
+            pass
+        # 设备任务线程池：运行中的设备任务总有线程，worker_pool_idle 只限制保留的空闲线程数；
+        # 预览/连接走独立的 UI 小池
+        try:
+            pool = default_pool()
+            pool.logger = self.logger
+            ui_pool().logger = self.logger
+            if self.cfg.get("worker_pool_idle") is not None:
+                pool.set_max_idle(int(self.cfg["worker_pool_idle"]))
+        except Exception:
+            pass
+        # 设备健康度变化：写日志并刷新设备列表标记
+        health.monitor().subscribe(self._on_device_health)
+        # 多设备共享任务队列：投递一次，由先空闲的设备领取（无响应的设备不领取）
+        self.job_queue = FleetQueue(self.workers, self.logger,
+                                    available=lambda s: health.monitor().state(s) != health.UNRESPONSIVE)
+        # 截图轮询的主机 CPU 预算（CPU 秒/秒，缺省为 60% 核数）
+        try:
+            if self.cfg.get("capture_cpu_budget"):
+                from ..ui.helpers import pacing
+                pacing.controller().set_budget(float(self.cfg["capture_cpu_budget"]))
+        except Exception:
+            pass
 
         # 构建 UI
         self._build_ui()
@@ -316,6 +366,13 @@ class AppQt(QMainWindow):
         self.device_log = QPlainTextEdit(); self.device_log.setReadOnly(True)
         self.log_tabs.addTab(self.main_log, "全局日志")
         self.log_tabs.addTab(self.device_log, "设备日志")
+        self._log_flusher = LogFlusher(self, self._log_pane_visible)
+        self._main_pane = self._log_flusher.add(LogPane(self.log_store, logstore.MAIN, self.main_log))
+        self._device_pane = self._log_flusher.add(LogPane(self.log_store, logstore.DEVICES, self.device_log))
+        self.log_tabs.currentChanged.connect(
+            lambda _i: self._log_flusher.show_now(
+                self._main_pane if self.log_tabs.currentWidget() is self.main_log else self._device_pane))
+        self._log_flusher.start()
 
         # 顶部内容 + 底部日志使用垂直分割器，支持高度调节
         self.right_splitter = QSplitter(Qt.Vertical)
@@ -383,13 +440,27 @@ class AppQt(QMainWindow):
 
     # ---------------- 设备日志 ----------------
     def append_device_log(self, serial: str, line: str) -> None:
+        """线程安全、不阻塞：交给日志线程写文件并转入缓冲，由日志定时器批量渲染。"""
         try:
-            self.device_log.appendPlainText(f"[{serial}] {line}")
-            sb = self.device_log.verticalScrollBar()
-            sb.setValue(sb.maximum())
+            self.logger.device(serial, line)
         except Exception:
             pass
 
+    def _on_device_record(self, rec) -> None:
+        """日志线程回调：设备记录写入设备日志缓冲（DEBUG 需 log_show_debug）。"""
+        if rec.serial is None:
+            return
+        if rec.level == "DEBUG" and not bool(self.cfg.get("log_show_debug", False)):
+            return
+        self.log_store.append_device(rec.serial, rec.msg)
+
+    def _log_pane_visible(self, pane: LogPane) -> bool:
+        """只渲染当前显示的日志页；窗口最小化时全部跳过。"""
+        try:
+            return (not self.isMinimized()) and self.log_tabs.currentWidget() is pane.view
+        except Exception:
+            return False
+
     # ---------------- 设备管理 ----------------
     def refresh_devices(self) -> None:
         try:
@@ -404,6 +475,7 @@ class AppQt(QMainWindow):
             w.start()
             self.workers[s] = w
             self.logger.info(f"创建工作线程：{s}")
+            self.job_queue.kick(s)
         # 离线设备
         for s in sorted(current - incoming):
             try:
@@ -411,6 +483,7 @@ class AppQt(QMainWindow):
             except Exception:
                 pass
             self.workers.pop(s, None)
+            self.job_queue.forget(s)
             self.logger.warn(f"设备离线，停止工作线程：{s}")
             self._close_tab(s)
         # 确保标签
@@ -436,12 +509,38 @@ class AppQt(QMainWindow):
             display = serial
             if ":" in serial and serial.startswith("127.0.0.1:"):
                 display = serial.split(":", 1)[1]
-            if note:
-                return f"{note}  ({display})"
-            return display
+            text = f"{note}  ({display})" if note else display
+            tag = _HEALTH_TAGS.get(health.monitor().state(serial))
+            return f"{text}  {tag}" if tag else text
         except Exception:
             return serial
 
+    def _on_device_health(self, serial: str, state: str, snap: dict) -> None:
+        """健康度状态变化（任意线程回调）。"""
+        try:
+            detail = (f"截图 {snap['capture_ms']:.0f}ms，输入 {snap['input_ms']:.0f}ms，"
+                      f"失败率 {snap['fail_rate'] * 100:.0f}%")
+            if state == health.HEALTHY:
+                self.logger.info(f"[{serial}] 设备已恢复正常（{detail}）")
+            else:
+                label = "响应变慢" if state == health.DEGRADED else "无响应"
+                self.logger.warn(f"[{serial}] 设备{label}（{detail}）")
+        except Exception:
+            pass
+        self._post_to_ui(lambda: self._apply_device_health(serial))
+        if state != health.UNRESPONSIVE:
+            self.job_queue.kick(serial)
+
+    def _apply_device_health(self, serial: str) -> None:
+        try:
+            for i in range(self.device_list.count()):
+                it = self.device_list.item(i)
+                if it.data(Qt.UserRole) == serial:
+                    it.setText(self._format_device_item_text(serial))
+                    break
+        except Exception:
+            pass
+
     def _refresh_device_list(self, devices: list[str]) -> None:
         try:
             if hasattr(self, "device_list") and self.device_list is not None:
@@ -508,7 +607,8 @@ class AppQt(QMainWindow):
                     self.logger.error(f"预览线程错误: {e}")
                     import traceback
                     traceback.print_exc()
-            threading.Thread(target=_run, daemon=True).start()
+            # 同一设备的预览串行执行，连续点击不会并发截图；走 UI 小线程池，不受设备长任务占满影响
+            ui_pool().submit(f"preview:{serial}", _run)
         except Exception as e:
             self.logger.error(f"预览设备失败: {e}")
             import traceback
@@ -529,7 +629,7 @@ class AppQt(QMainWindow):
                 QTimer.singleShot(0, lambda: self._on_one_connected(ipport))
             else:
                 self.logger.error(out or f"连接失败 {ipport}")
-        threading.Thread(target=_run, daemon=True).start()
+        ui_pool().submit(f"connect:{ipport}", _run)
 
     def toggle_auto_connect_on_start(self, checked: bool) -> None:
         try:
@@ -546,6 +646,7 @@ class AppQt(QMainWindow):
                 w.start()
                 self.workers[serial] = w
                 self.logger.info(f"创建工作线程：{serial}")
+                self.job_queue.kick(serial)
                 self._create_or_update_tab(serial)
             except Exception as e:
                 self.logger.error(f"创建设备线程失败 {serial}: {e}")
@@ -678,7 +779,7 @@ class AppQt(QMainWindow):
             pass
 
     def stop_all_now(self) -> None:
-        """停止所有任务并立刻重启程序（无需确认）"""
+        """停止所有任务（进程内协作式取消，不再重启程序）"""
         try:
             # 禁用停止按钮，防止重复点击
             self.btn_stop_all.setEnabled(False)
@@ -688,45 +789,76 @@ class AppQt(QMainWindow):
             self._toast("正在停止所有任务...")
             self.logger.info("[停止所有] 用户触发停止所有任务")
 
-            # 在后台线程中执行停止和重启
-            def _stop_and_restart():
+            # 在后台线程中执行停止，UI 线程不阻塞
+            def _soft_stop():
+                t0 = time.perf_counter()
                 try:
-                    # 1. 强制停止所有设备的任务（不等待）
-                    for tab in list(self.device_tabs.values()):
+                    # 1. 丢弃各设备排队中、尚未开始的任务，再置位所有设备任务的停止事件
+                    queued = 0
+                    for w in list(self.workers.values()):
                         try:
-                            tab.stop_all_tasks_immediately()
+                            queued += w.clear()
                         except Exception:
                             pass
-
-                    # 2. 强制停止所有worker线程（不等待）
-                    for serial, worker in list(self.workers.items()):
+                    if queued:
+                        self.logger.info(f"[停止所有] 已丢弃 {queued} 个排队中的设备任务")
+                    for tab in list(self.device_tabs.values()):
                         try:
-                            worker.stop()
+                            tab.stop_all_tasks_immediately()
                         except Exception:
                             pass
 
-                    # 3. 快速保存配置（不等待清理）
+                    # 2. 丢弃共享队列中未开始的任务，通知运行中的共享任务停止；
+                    #    被丢弃的领取票不会再执行，清除登记以便之后重新派票
                     try:
-                        self.config_mgr.save(self.cfg)
+                        dropped = self.job_queue.stop_all()
+                        for s in list(self.workers):
+                            self.job_queue.forget(s)
+                        if dropped:
+                            self.logger.info(f"[停止所有] 共享任务队列：已取消 {dropped} 个任务")
                     except Exception:
                         pass
 
-                    # 4. 立刻重启程序（不等待）
-                    self.logger.info("[停止所有] 立刻重启程序...")
-                    from ..common.restart_helper import RestartHelper
-                    RestartHelper.restart_and_exit(delay=0.1)
+                    # 3. 停止掉线监控
+                    try:
+                        if hasattr(self, "_offline_watch_stop"):
+                            self._offline_watch_stop.set()
+                    except Exception:
+                        pass
 
-                except Exception as e:
-                    self.logger.error(f"[停止所有] 停止失败: {e}")
-                    # 如果失败，强制退出
+                    # 4. 取消全部任务令牌：结束其正在运行的 adb 子进程，并限时等待任务收尾
+                    n, left = cancel.cancel_all(timeout=STOP_ALL_TIMEOUT)
+                    cost = (time.perf_counter() - t0) * 1000
+                    self.logger.info(f"[停止所有] 已停止 {n - len(left)}/{n} 个任务，用时 {cost:.0f}ms")
+                    if left:
+                        self.logger.warn(f"[停止所有] {len(left)} 个任务未在 {STOP_ALL_TIMEOUT:.1f}s 内结束，"
+                                         f"将在下一个检查点退出：{', '.join(left)}")
                     try:
-                        from ..common.restart_helper import RestartHelper
-                        RestartHelper.restart_and_exit(delay=0.1)
+                        default_pool().report()
+                        ui_pool().report()
                     except Exception:
-                        sys.exit(0)
+                        pass
+
+                    # 5. 保存配置
+                    try:
+                        self.config_mgr.save(self.cfg)
+                        self.config_mgr.flush()
+                    except Exception:
+                        pass
+                except Exception as e:
+                    self.logger.error(f"[停止所有] 停止失败: {e}")
+                finally:
+                    def _restore():
+                        try:
+                            self.btn_stop_all.setEnabled(True)
+                            self.btn_stop_all.setText("停止所有")
+                        except Exception:
+                            pass
+                    self._post_to_ui(_restore)
+                    self._post_to_ui(lambda: self._toast("已停止所有任务"))
 
             # 启动后台线程
-            stop_thread = threading.Thread(target=_stop_and_restart, daemon=True)
+            stop_thread = threading.Thread(target=_soft_stop, daemon=True)
             stop_thread.start()
 
         except Exception as e:
@@ -915,20 +1047,24 @@ class AppQt(QMainWindow):
                 def should_stop():
                     return self._offline_watch_stop.is_set()
 
+                token = cancel.register(cancel.CancelToken("offline_watch", self._offline_watch_stop))
+
                 def runner():
                     try:
-                        run_offline_monitor(
-                            app=self,
-                            interval_minutes=interval_minutes,
-                            should_stop=should_stop,
-                            toast=self._toast,
-                            log=self.logger.info,
-                            threshold=None,
-                            verbose=False,
-                        )
+                        with cancel.scope(token):
+                            run_offline_monitor(
+                                app=self,
+                                interval_minutes=interval_minutes,
+                                should_stop=should_stop,
+                                toast=self._toast,
+                                log=self.logger.info,
+                                threshold=None,
+                                verbose=False,
+                            )
                     except Exception as e:
                         self.logger.error(f"[OFFMON] 运行异常：{e}")
                     finally:
+                        cancel.unregister(token)
                         self._offline_watch_running = False
                         # 取消勾选按钮
                         self._post_to_ui(lambda: self._uncheck_offline_watch_button())
@@ -1405,11 +1541,15 @@ class AppQt(QMainWindow):
 
     # ---------------- 日志 ----------------
     def _append_main_log(self, line: str) -> None:
-        self.main_log.appendPlainText(line)
-        self.main_log.verticalScrollBar().setValue(self.main_log.verticalScrollBar().maximum())
+        """Logger 输出（任意线程）：写入全局日志缓冲。"""
+        self.log_store.append(logstore.MAIN, line)
 
     # ---------------- 关闭 ----------------
     def closeEvent(self, event) -> None:  # type: ignore[override]
+        try:
+            health.monitor().unsubscribe(self._on_device_health)
+        except Exception:
+            pass
         try:
             # 停止所有设备工作线程
             for w in list(self.workers.values()):
@@ -1419,6 +1559,11 @@ class AppQt(QMainWindow):
                     pass
         except Exception:
             pass
+        try:
+            from ..ui.helpers import fleet_sync
+            fleet_sync.shutdown(self)
+        except Exception:
+            pass
         try:
             # 保存分割器高度与窗口几何
             if hasattr(self, 'right_splitter'):
@@ -1435,11 +1580,46 @@ class AppQt(QMainWindow):
             self.apply_adb_path()
         except Exception:
             pass
+        try:
+            self.config_mgr.close()
+        except Exception:
+            pass
+        try:
+            self.logger.close()
+        except Exception:
+            pass
         super().closeEvent(event)
 
 
+    # ---------------- 启动耗时 ----------------
+    def _report_startup(self) -> None:
+        """首个事件循环周期后输出启动耗时（阶段 + 可选导入明细）。"""
+        try:
+            startup.mark("首帧")
+            startup.uninstall_import_timer()
+            for line in startup.report_lines():
+                self.logger.info(line)
+        except Exception:
+            pass
+
+    def _start_template_warmup(self) -> None:
+        """窗口显示后在后台预热模板（可用配置 template_warmup=false 关闭）。"""
+        try:
+            if not bool(self.cfg.get("template_warmup", True)):
+                return
+            from ..ui.helpers import warmup
+            warmup.start_background(log=self.logger.info)
+        except Exception as e:
+            self.logger.error(f"[预热] 启动失败：{e}")
+
+
 def launch() -> None:
     app = QApplication(sys.argv or ["app"])
+    startup.mark("QApplication")
     w = AppQt()
+    startup.mark("构建主窗口")
     w.show()
+    startup.mark("显示主窗口")
+    QTimer.singleShot(0, w._report_startup)
+    QTimer.singleShot(300, w._start_template_warmup)
     sys.exit(app.exec())
@@ -9,16 +9,14 @@ from PySide6.QtWidgets import (
     QGroupBox, QRadioButton, QGridLayout, QComboBox, QDialog, QSplitter, QSizePolicy
 )
 
+from ..common import cancel
 from ..common.logger import Logger
 from ..common.worker import DeviceWorker
 from ..core.adb import AdbClient
 
-# 业务任务（沿用 v1.14 的实现）
-from ..ui.tasks.sweep_army import run_sweep_army
-from ..ui.tasks.sweep_fort import run_sweep_fort
-from ..ui.tasks.auto_garrison import run_auto_garrison
-from ..ui.tasks.emergency_heal import run_emergency_heal
-from ..ui.tasks.init_heal import run_init_heal
+# 业务任务（沿用 v1.14 的实现；注册表按需导入，构建页签时不加载任务模块）
+from ..ui import tasks
+from ..ui.helpers import matcher
 
 # 扩展面板（联盟、打熊、打野、工具）
 from .device_tab_extras_qt import HuntBox, BearModeBox, AllianceBox, ToolsBox, ResourcesBox
@@ -372,13 +370,16 @@ class DeviceTabQt(QWidget):
             pass
         button.clicked.connect(_stop)
 
-        # 记录正在运行任务
+        # 记录正在运行任务；取消令牌共用 stop_event，“停止所有”时可结束其 adb 子进程
         self._running_tasks.add(task_id)
+        token = cancel.register(cancel.CancelToken(f"{self.serial}:{task_id}", stop_event))
 
         def task_wrapper():
             try:
-                runner(should_stop)
+                with cancel.scope(token), matcher.device_scope(self.serial):
+                    runner(should_stop)
             finally:
+                cancel.unregister(token)
                 # 回到主线程恢复按钮
                 self._sig.reset_button.emit(button, original_text)
 
@@ -388,11 +389,18 @@ class DeviceTabQt(QWidget):
             print(f"[ERROR] Worker 不存在: {self.serial}")
             print(f"[DEBUG] app.workers 内容: {list(self.app.workers.keys())}")
             self._toast(f"错误：设备 {self.serial} 的工作线程不存在")
+            cancel.unregister(token)
             self._sig.reset_button.emit(button, original_text)
             return
 
+        def dropped():
+            # 排队中被“停止所有”丢弃：释放令牌并恢复按钮
+            cancel.unregister(token)
+            self._sig.reset_button.emit(button, original_text)
+
         print(f"[DEBUG] 提交任务到 worker: {self.serial}, task_id={task_id}")
-        worker.submit(task_wrapper)
+        if not worker.submit(task_wrapper, on_drop=dropped):
+            self._toast("设备线程池已满，任务已排队，等其他任务结束后开始")
 
     def _on_reset_button(self, button: QPushButton, original_text: str):
         try:
@@ -506,7 +514,7 @@ class DeviceTabQt(QWidget):
 
         def make_runner(tab: "DeviceTabQt"):
             def runner(should_stop):
-                run_sweep_army(
+                tasks.run_sweep_army(
                     self.app, tab.serial, secs,
                     toast=tab._toast, log=tab.device_log,
                     loop_count=loops,
@@ -604,7 +612,7 @@ class DeviceTabQt(QWidget):
         mode = "joy" if raw in ("乔伊", "joy") else "harvest"
         def make_runner(tab: "DeviceTabQt"):
             def runner(should_stop):
-                run_auto_garrison(
+                tasks.run_auto_garrison(
                     self.app, tab.serial, mode,
                     toast=tab._toast, log=tab.device_log,
                     should_stop=should_stop,
@@ -622,7 +630,7 @@ class DeviceTabQt(QWidget):
         def make_runner(tab: "DeviceTabQt"):
 
             def runner(should_stop):
-                run_emergency_heal(
+                tasks.run_emergency_heal(
                     self.app, tab.serial,
                     toast=tab._toast, log=tab.device_log,
                     should_stop=should_stop,
@@ -645,7 +653,7 @@ class DeviceTabQt(QWidget):
 
         def make_runner(tab: "DeviceTabQt"):
             def runner(should_stop):
-                run_init_heal(
+                tasks.run_init_heal(
                     self.app, tab.serial, heal_count,
                     toast=tab._toast, log=tab.device_log,
                     should_stop=should_stop,
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from typing import Callable, List, Optional
+
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import QPlainTextEdit
+
+from ..common.logstore import LogStore
+
+FLUSH_INTERVAL_MS = 100
+
+
+class LogPane:
+    """
+    把一个只读 QPlainTextEdit 绑定到 LogStore 的某个通道：
+    - flush() 增量取新行，一次 appendPlainText 整块追加；
+    - 控件行数上限与缓冲一致（setMaximumBlockCount），超出自动丢弃最旧行；
+    - 仅当用户停留在底部时才自动滚动，翻看历史时不被新日志拽走。
+    """
+
+    def __init__(self, store: LogStore, key: str, view: QPlainTextEdit):
+        self.store = store
+        self.key = key
+        self.view = view
+        self._seq = 0
+        view.setMaximumBlockCount(store.max_lines)
+
+    def flush(self) -> int:
+        """渲染积压的新行，返回本次追加的行数。"""
+        lines, seq, reset = self.store.since(self.key, self._seq)
+        self._seq = seq
+        if not lines and not reset:
+            return 0
+        sb = self.view.verticalScrollBar()
+        at_bottom = sb.value() >= sb.maximum() - 2
+        if reset:
+            self.view.setPlainText("\n".join(lines))
+        else:
+            self.view.appendPlainText("\n".join(lines))
+        if at_bottom or reset:
+            sb.setValue(sb.maximum())
+        return len(lines)
+
+    def set_max_lines(self, n: int) -> None:
+        self.view.setMaximumBlockCount(n)
+
+
+class LogFlusher:
+    """
+    UI 线程定时器：每 FLUSH_INTERVAL_MS 只刷新当前可见的 LogPane；
+    不可见的视图不做任何排版，切换到它时（show_now）再一次性补齐。
+    """
+
+    def __init__(self, parent, is_visible: Callable[[LogPane], bool],
+                 interval_ms: int = FLUSH_INTERVAL_MS):
+        self._panes: List[LogPane] = []
+        self._is_visible = is_visible
+        self._timer = QTimer(parent)
+        self._timer.setInterval(max(16, int(interval_ms)))
+        self._timer.timeout.connect(self.flush_visible)
+
+    def add(self, pane: LogPane) -> LogPane:
+        self._panes.append(pane)
+        return pane
+
+    def start(self) -> None:
+        self._timer.start()
+
+    def stop(self) -> None:
+        self._timer.stop()
+
+    def flush_visible(self) -> None:
+        for pane in self._panes:
+            try:
+                if self._is_visible(pane):
+                    pane.flush()
+            except Exception:
+                pass
+
+    def show_now(self, pane: Optional[LogPane]) -> None:
+        if pane is not None:
+            try:
+                pane.flush()
+            except Exception:
+                pass
+
+    def set_max_lines(self, n: int) -> None:
+        for pane in self._panes:
+            pane.set_max_lines(n)
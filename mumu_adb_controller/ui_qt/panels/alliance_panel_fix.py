@@ -9,11 +9,7 @@ from PySide6.QtWidgets import (
 )
 
 from .base_panel import BasePanel
-from ...ui.tasks.auto_like import run_auto_like
-from ...ui.tasks.fast_join_rally import run_fast_join_rally
-from ...ui.tasks.promote_rank4 import run_promote_rank4
-from ...ui.tasks.auto_garrison import run_close_alliance_help, run_open_alliance_help
-from ...ui.tasks.build_flag import run_build_flag
+from ...ui import tasks
 
 if TYPE_CHECKING:
     from ..device_tab_qt import DeviceTabQt
@@ -66,7 +62,7 @@ class AlliancePanel(BasePanel):
     def _on_close_help(self):
         def make_task(tab: "DeviceTabQt"):
             def task():
-                run_close_alliance_help(
+                tasks.run_close_alliance_help(
                     self.app, tab.serial,
                     toast=tab._toast,
                     log=lambda m: tab._sig.device_log.emit(m),
@@ -84,7 +80,7 @@ class AlliancePanel(BasePanel):
     def _on_open_help(self):
         def make_task(tab: "DeviceTabQt"):
             def task():
-                run_open_alliance_help(
+                tasks.run_open_alliance_help(
                     self.app, tab.serial,
                     toast=tab._toast,
                     log=lambda m: tab._sig.device_log.emit(m),
@@ -103,7 +99,7 @@ class AlliancePanel(BasePanel):
     def _on_like(self):
         def make_runner(tab: "DeviceTabQt"):
             def runner(should_stop):
-                run_auto_like(
+                tasks.run_auto_like(
                     self.app, tab.serial,
                     toast=tab._toast,
                     log=lambda m: tab._sig.device_log.emit(m),
@@ -123,7 +119,7 @@ class AlliancePanel(BasePanel):
     def _on_fast_join(self):
         def make_runner(tab: "DeviceTabQt"):
             def runner(should_stop):
-                run_fast_join_rally(
+                tasks.run_fast_join_rally(
                     self.app, tab.serial,
                     toast=tab._toast,
                     log=lambda m: tab._sig.device_log.emit(m),
@@ -142,7 +138,7 @@ class AlliancePanel(BasePanel):
     # ---- 一键四阶（按你的要求：仅当前设备） ----
     def _on_rank4(self):
         def runner(should_stop):
-            run_promote_rank4(
+            tasks.run_promote_rank4(
                 self.app, self.serial,
                 toast=self._toast, log=self._log,
                 should_stop=should_stop,
@@ -153,7 +149,7 @@ class AlliancePanel(BasePanel):
     # ---- 建旗子（支持当前设备） ----
     def _on_build_flag(self):
         def runner(should_stop):
-            run_build_flag(
+            tasks.run_build_flag(
                 self.app, self.serial,
                 toast=self._toast, log=self._log,
                 should_stop=should_stop,
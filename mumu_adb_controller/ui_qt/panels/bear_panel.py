@@ -11,7 +11,7 @@ from PySide6.QtWidgets import (
 )
 
 from .base_panel import BasePanel
-from ...ui.tasks.bear_mode import run_bear_mode, BearOptions
+from ...ui import tasks
 
 if TYPE_CHECKING:
     from ..device_tab_qt import DeviceTabQt
@@ -106,7 +106,7 @@ class BearPanel(BasePanel):
         except Exception:
             pass
 
-    def _save_defaults(self, options: BearOptions, time_raw: str):
+    def _save_defaults(self, options: tasks.BearOptions, time_raw: str):
         try:
             cfg = getattr(self.app, "cfg", {}) or {}
             cfg.setdefault("bear_options", {})
@@ -133,7 +133,7 @@ class BearPanel(BasePanel):
         if not (0 <= hh < 24 and 0 <= mm < 60 and 0 <= ss < 60):
             self._toast("打熊时间超出有效范围")
             return
-        options = BearOptions(
+        options = tasks.BearOptions(
             target_time=_dt.time(hour=hh, minute=mm, second=ss),
             day_mode=self.day_map.get(self.cb_day.currentText(), "both"),
             send_car=bool(self.ck_send.isChecked()),
@@ -144,7 +144,7 @@ class BearPanel(BasePanel):
         self._save_defaults(options, raw)
 
         def runner(should_stop):
-            run_bear_mode(
+            tasks.run_bear_mode(
                 self.app, self.serial, toast=self._toast, log=self._log,
                 should_stop=should_stop, options=options,
                 threshold=None, verbose=False,
@@ -156,7 +156,7 @@ class BearPanel(BasePanel):
                 if box and hasattr(box, "btn"):
                     def make_runner(tt: "DeviceTabQt"):
                         def r(should_stop):
-                            run_bear_mode(
+                            tasks.run_bear_mode(
                                 self.app, tt.serial,
                                 toast=tt._toast,
                                 log=lambda m: tt._sig.device_log.emit(m),
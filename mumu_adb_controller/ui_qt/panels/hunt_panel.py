@@ -10,7 +10,7 @@ from PySide6.QtWidgets import (
 )
 
 from .base_panel import BasePanel
-from ...ui.tasks.sweep_hunt import run_sweep_hunt
+from ...ui import tasks
 
 if TYPE_CHECKING:
     from ..device_tab_qt import DeviceTabQt
@@ -171,7 +171,7 @@ class HuntPanel(BasePanel):
             return
 
         def runner(should_stop):
-            run_sweep_hunt(
+            tasks.run_sweep_hunt(
                 self.app, self.serial, hunt_type,
                 beast_levels=beast_levels,
                 monster_levels=monster_levels,
@@ -189,7 +189,7 @@ class HuntPanel(BasePanel):
                     # 复用当前参数，但面向各自设备执行
                     def make_runner(tt: "DeviceTabQt"):
                         def r(should_stop):
-                            run_sweep_hunt(
+                            tasks.run_sweep_hunt(
                                 self.app, tt.serial, hunt_type,
                                 beast_levels=beast_levels,
                                 monster_levels=monster_levels,
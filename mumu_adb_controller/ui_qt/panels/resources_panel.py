@@ -2,6 +2,7 @@
 资源面板
 """
 from __future__ import annotations
+import threading
 from typing import TYPE_CHECKING
 
 from PySide6.QtWidgets import (
@@ -35,8 +36,11 @@ class ResourcesPanel(BasePanel):
         attack_box.setLayout(row)
         self.btn_edit_coords = QPushButton("编辑资源坐标")
         self.attack_btn = QPushButton("打资源")
+        self.attack_fleet_btn = QPushButton("分配到所有设备")
+        self.attack_fleet_btn.setToolTip("把本设备的坐标列表按轮次均分给所有在线设备，各自按最短路线执行；先做完的设备接手其余设备未开始的坐标")
         row.addWidget(self.btn_edit_coords)
         row.addWidget(self.attack_btn)
+        row.addWidget(self.attack_fleet_btn)
 
         # 超时处理：中文显示 <-> 英文码
         self.attack_timeout_display_map = {
@@ -75,6 +79,7 @@ class ResourcesPanel(BasePanel):
         self.btn_edit_coords.clicked.connect(self._on_edit_coords)
         self.attack_btn._qt_start_handler = self._on_attack
         self.attack_btn.clicked.connect(self._on_attack)
+        self.attack_fleet_btn.clicked.connect(self._on_attack_fleet)
 
         # 预加载 coords 文本
         try:
@@ -108,6 +113,160 @@ class ResourcesPanel(BasePanel):
                 pass
             self._toast("已保存资源坐标（已持久化）")
 
+    def _current_on_timeout(self) -> str:
+        try:
+            sel_label = self.attack_timeout_cb.currentText()
+            return self.attack_timeout_reverse_map.get(
+                sel_label,
+                self.app.cfg.get("attack_on_timeout", "continue")
+            )
+        except Exception:
+            return self.app.cfg.get("attack_on_timeout", "continue")
+
+    def _on_attack_fleet(self):
+        """多设备打资源：本设备的坐标列表分配到所有在线设备，经共享任务队列执行；再次点击停止本批任务。"""
+        jobs = getattr(self, "_fleet_jobs", None) or []
+        if any(not j.done.is_set() for j in jobs):
+            n = self.app.job_queue.cancel(jobs)
+            self._fleet_finished()
+            self._toast(f"已停止分配任务（{n} 段未完成）")
+            return
+        self._fleet_finished()  # 上一批已结束（含被“停止所有”取消）
+        from mumu_adb_controller.ui.tasks.attack_resources import parse_coords_text
+        from mumu_adb_controller.ui.tasks.attack_planner import parse_origin, plan_targets
+        coords = parse_coords_text(getattr(self, "attack_coords_text", ""))
+        if not coords:
+            self._toast("请先点击'编辑资源坐标'并填写坐标\n每行：x:y:备注名:攻击轮次")
+            return
+        tabs = [t for t in self.app.device_tabs.values() if t.serial in self.app.workers]
+        if not tabs:
+            self._toast("没有在线设备")
+            return
+        # 可选：各设备主城坐标 attack_origins = {serial: "x:y"}，用于就近分配与路线起点
+        origins = {}
+        try:
+            for s, v in (self.app.cfg.get("attack_origins", {}) or {}).items():
+                o = parse_origin(v)
+                if o is not None:
+                    origins[s] = o
+        except Exception:
+            pass
+        serials = [t.serial for t in tabs]
+        on_timeout = self._current_on_timeout()
+
+        # 规划（分配 + 路线 2-opt）在后台线程计算，完成后回到 UI 线程启动各设备任务
+        def _plan():
+            try:
+                plan = plan_targets(coords, serials, origins)
+            except Exception as e:
+                msg = f"坐标分配失败：{e}"
+                self.app._post_to_ui(lambda: self._toast(msg))
+                return
+            self.app._post_to_ui(lambda: self._start_fleet_plan(coords, tabs, plan, on_timeout))
+
+        self._toast(f"正在为 {len(tabs)} 台设备分配 {len(coords)} 个坐标…")
+        threading.Thread(target=_plan, name="attack-plan", daemon=True).start()
+
+    def _start_fleet_plan(self, coords, tabs, plan, on_timeout):
+        """
+        把规划结果按路线切成小段投递到共享任务队列：每段首选规划到的设备，
+        设备做完自己的段后从队尾接手其他设备未开始的段（空闲设备不再闲置）。
+        """
+        from mumu_adb_controller.ui.tasks.attack_planner import AttackStats
+        stats = AttackStats()
+        chunk = max(1, int(self.app.cfg.get("attack_chunk", 2) or 2))
+        serials = [t.serial for t in tabs if t.serial in self.app.workers]
+        items, parts = [], []
+        left = {"n": 0}
+        lock = threading.Lock()
+
+        def _done():
+            with lock:
+                left["n"] -= 1
+                finished = left["n"] == 0
+            if finished:
+                self.app.job_queue.report(self._log)
+                self._log(stats.summary(self.serial))
+                self.app._post_to_ui(self._fleet_finished)
+
+        for tab in tabs:
+            targets = plan.get(tab.serial) or []
+            if not targets:
+                continue
+            if tab.serial not in self.app.workers:
+                tab.device_log(f"[PLAN] 设备已离线，{len(targets)} 个坐标交给其他设备")
+            else:
+                tab.device_log(f"[PLAN] 分配 {len(targets)} 个坐标：" + " → ".join(n for (_, _, n, _) in targets))
+            for i in range(0, len(targets), chunk):
+                part = targets[i:i + chunk]
+                name = "+".join(n for (_, _, n, _) in part)
+                batch = {}
+                job = self._fleet_attack_job(part, tab.serial, on_timeout, stats, _done, batch)
+                items.append((f"attack:{name}", job, tab.serial))
+                parts.append((part, tab.serial, batch))
+        if not items or not serials:
+            self._toast("没有可执行的坐标或在线设备")
+            return
+        left["n"] = len(items)
+        jobs = self.app.job_queue.post_many(items, eligible=serials)
+        # 各段互相可见：设备打完一段时可就地接续同一批的下一段（流水线不中断）
+        by_id = {j.id: p for j, p in zip(jobs, parts)}
+        for _, _, batch in parts:
+            batch["jobs"] = jobs
+            batch["parts"] = by_id
+        self._fleet_jobs = jobs
+        self.attack_fleet_btn.setText("停止分配任务")
+        self._toast(f"已将 {len(coords)} 个坐标分成 {len(items)} 段投递到 {len(serials)} 台设备")
+
+    def _fleet_attack_job(self, targets, planned, on_timeout, stats, done, batch):
+        """
+        一段坐标的共享任务。batch 在投递后填入 {"jobs": 同批任务, "parts": id -> (坐标, 首选设备, batch)}，
+        本段打完时经 job_queue.claim_next 就地接续同批的下一段，省去段间的归位等待与重新回野外。
+        """
+        from mumu_adb_controller.ui.tasks.attack_resources import run_attack_resources
+
+        def _job(serial, should_stop):
+            tab = self.app.device_tabs.get(serial)
+            log = tab.device_log if tab is not None else self._log
+            toast = tab._toast if tab is not None else (lambda _m: None)
+            if serial != planned:
+                log(f"[PLAN] 接手 {planned} 的坐标：" + " → ".join(n for (_, _, n, _) in targets))
+            chained = []
+
+            def _more():
+                nxt = self.app.job_queue.claim_next(serial, batch.get("jobs") or [])
+                if nxt is None:
+                    return None
+                chained.append(nxt)
+                part, owner, _ = batch["parts"][nxt.id]
+                if owner != serial:
+                    log(f"[PLAN] 接手 {owner} 的坐标：" + " → ".join(n for (_, _, n, _) in part))
+                return part
+
+            try:
+                run_attack_resources(
+                    self.app, serial, targets,
+                    toast=toast, log=log,
+                    should_stop=should_stop,
+                    threshold=None, verbose=False,
+                    on_timeout=on_timeout,
+                    pipeline=True, stats=stats,
+                    more=_more
+                )
+            finally:
+                for j in chained:
+                    self.app.job_queue.finish(j)
+                    done()
+                done()
+        return _job
+
+    def _fleet_finished(self):
+        self._fleet_jobs = []
+        try:
+            self.attack_fleet_btn.setText("分配到所有设备")
+        except Exception:
+            pass
+
     def _on_attack(self):
         from mumu_adb_controller.ui.tasks.attack_resources import parse_coords_text, run_attack_resources
         coords = parse_coords_text(getattr(self, "attack_coords_text", ""))
@@ -126,14 +285,7 @@ class ResourcesPanel(BasePanel):
         self._toast("将执行'打资源'：\n  - " + "\n  - ".join(names))
 
         def runner(should_stop):
-            try:
-                sel_label = self.attack_timeout_cb.currentText()
-                on_timeout = self.attack_timeout_reverse_map.get(
-                    sel_label,
-                    self.app.cfg.get("attack_on_timeout", "continue")
-                )
-            except Exception:
-                on_timeout = self.app.cfg.get("attack_on_timeout", "continue")
+            on_timeout = self._current_on_timeout()
             run_attack_resources(
                 self.app, self.serial, coords,
                 toast=self._toast, log=self._log,
@@ -9,8 +9,9 @@ from PySide6.QtWidgets import (
 )
 
 from .base_panel import BasePanel
-from ...ui.tasks.init_to_wild import run_init_to_wild
-from ...ui.tasks.withdraw_troops import run_withdraw_troops
+from ...common import cancel
+from ...ui import tasks
+from ...ui.helpers import matcher
 from ...ui.helpers.tool_launcher import launch_ui_cropper
 
 if TYPE_CHECKING:
@@ -57,7 +58,7 @@ class ToolsPanel(BasePanel):
     def _on_init(self):
         """初始化到野外（支持全局操作模式）"""
         def task():
-            run_init_to_wild(
+            tasks.run_init_to_wild(
                 self.app, self.serial,
                 toast=self._toast, log=self._log,
                 threshold=None, verbose=False
@@ -74,7 +75,7 @@ class ToolsPanel(BasePanel):
                     continue
                 def make_task(t):
                     def t_task():
-                        run_init_to_wild(
+                        tasks.run_init_to_wild(
                             self.app, t.serial,
                             toast=t._toast,
                             log=lambda m: t._sig.device_log.emit(m),
@@ -86,7 +87,7 @@ class ToolsPanel(BasePanel):
     def _on_withdraw(self):
         """一键撤军（支持全局操作模式）"""
         def runner(should_stop):
-            run_withdraw_troops(
+            tasks.run_withdraw_troops(
                 self.app, self.serial,
                 toast=self._toast, log=self._log,
                 should_stop=should_stop,
@@ -103,7 +104,7 @@ class ToolsPanel(BasePanel):
                     continue
                 def make_runner(t):
                     def r(should_stop):
-                        run_withdraw_troops(
+                        tasks.run_withdraw_troops(
                             self.app, t.serial,
                             toast=t._toast,
                             log=lambda m: t._sig.device_log.emit(m),
@@ -123,5 +124,15 @@ class ToolsPanel(BasePanel):
                 def should_stop_fn(ev=stop_ev):
                     return ev.is_set()
 
-                self.app.workers[tab.serial].submit(lambda r=make_runner(tab): r(should_stop_fn))
+                token = cancel.register(cancel.CancelToken(f"{tab.serial}:withdraw_global", stop_ev))
+
+                def job(r=make_runner(tab), should_stop=should_stop_fn, token=token, serial=tab.serial):
+                    try:
+                        with cancel.scope(token), matcher.device_scope(serial):
+                            r(should_stop)
+                    finally:
+                        cancel.unregister(token)
+
+                # 停止全部时排队中的任务被丢弃，job 不会执行：在这里注销令牌
+                self.app.workers[tab.serial].submit(job, on_drop=lambda t=token: cancel.unregister(t))
 